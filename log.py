@@ -1,13 +1,13 @@
-from modules.object.log import Log, insert
+from modules.object.log import Log, log_writer
 
 def record_status(msg: str) -> None:
     item = Log(log_type='status', code=None, msg=msg)
-    insert(item)
+    log_writer.submit(item)
 
 def record_notice(msg: str) -> None:
     item = Log(log_type='notice', code=None, msg=msg)
-    insert(item)
+    log_writer.submit(item)
 
 def record_error(msg: str, code: str | int | None = None) -> None:
     item = Log(log_type='error', code=code, msg=msg)
-    insert(item)
\ No newline at end of file
+    log_writer.submit(item)
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 from decimal import Decimal, ROUND_DOWN, ROUND_UP
 from typing import List
@@ -6,37 +7,141 @@ from dataclasses import dataclass
 from datetime import date, timedelta
 from modules.bt.object import fund, fund_holding
 from modules.bt.calc.model_fund import getStrategyFromJson, FundHolding
+from modules.bt.calc.price_store import PriceStore
+from modules.bt.calc.account_state import AccountState
+from modules.bt.calc.benchmark_series import BenchmarkSeries
+from modules.bt.calc.schedule import Schedule
+from modules.bt.calc import snapshot, cents
 from modules.bt.object import account, account_holding as ah, account_cash_ledger as acl, account_trade as at, account_performance as ap, account_benchmark_comparison as abc
 from modules.bt.object import benchmark_value as bv
 from modules.bt.object import interest_config, ticker_value, ticker_dividend_history
 
 DRIFT_THRESHOLD = 0.05   # 5%
+INTEGER_CENTS = False    # trade in int cents and whole shares (calc/cents.py) instead of Decimal; same trades to the cent
+
+# ── price lookups: the in-memory store when the run has one, the DB otherwise ──
+
+def _latest_price_date(symbol: str, as_of: date, prices: PriceStore | None) -> date | None:
+    if prices is not None:
+        return prices.latest_price_date(symbol, as_of)
+    return ticker_value.fetch_latest_price_date_for_ticker(symbol, as_of)
+
+def _price_on(symbol: str, on: date, prices: PriceStore | None) -> float | None:
+    if prices is not None:
+        return prices.price_on(symbol, on)
+    tv = ticker_value.fetch_ticker_on_date(symbol, on)
+    return float(tv.stock_price) if tv and tv.stock_price is not None else None
+
+def _as_of_prices(symbols: List[str], as_of: date, prices: PriceStore | None) -> np.ndarray:
+    """Price on each symbol's latest row on or before as_of; NaN where there is none or it is NULL."""
+    if prices is not None:
+        prices.ensure(symbols)
+        return prices.as_of_prices(np.array([prices.index_of(s) for s in symbols], dtype=np.int64), as_of)
+    latest = ticker_value.fetch_latest_prices(symbols, as_of)
+    return np.array([np.nan if latest.get(s) is None else latest[s] for s in symbols], dtype=np.float64)
+
+def _latest_nonzero_price(symbol: str, as_of: date, prices: PriceStore | None) -> float | None:
+    if prices is not None:
+        return prices.latest_nonzero_price(symbol, as_of)
+    return ticker_value.fetch_latest_nonzero_price(symbol, as_of)
+
+
+def _benchmark_return(symbol: str, on: date, benchmarks: BenchmarkSeries | None) -> Decimal | None:
+    if benchmarks is not None:
+        return benchmarks.daily_return(symbol, on)
+    today_bench = bv.fetch_benchmark_price(symbol, on)
+    prev_bench = bv.fetch_latest_benchmark_price_before(symbol, on)
+    if not today_bench or not prev_bench:
+        return None
+    return (today_bench.price / prev_bench.price) - 1
+
+
+# ── account books: the in-memory state when the run has one, the account_* tables otherwise ──
+
+def _cash_balance(account_id: int, before: date, state: AccountState | None) -> Decimal:
+    if state is not None:
+        return state.cash_balance(before)
+    return acl.get_cash_balance(account_id, before)
+
+def _record_cash(entry: acl.AccountCashLedger, state: AccountState | None) -> None:
+    if state is not None:
+        state.record_cash(entry)
+    else:
+        acl.record_cash_transaction(entry)
+
+def _latest_common_date(account_id: int, symbol: str, as_of: date, prices: PriceStore | None, state: AccountState | None) -> date | None:
+    """Latest date on or before as_of with both a price row and a holding row for the symbol."""
+    if state is None:
+        return ah.fetch_latest_common_date_for_ticker(account_id, symbol, as_of)
+    for d in state.holding_dates(symbol, as_of):
+        if prices is not None:
+            if prices.has_row(symbol, d):
+                return d
+        elif ticker_value.fetch_ticker_on_date(symbol, d) is not None:
+            return d
+    return None
+
+def _as_of_quotes(account_id: int, symbols: List[str], held: List[str], as_of: date, prices: PriceStore | None, state: AccountState | None) -> List[ah.AsOfQuote]:
+    """Sync date, price, last non-zero price and held quantity per symbol: one query, or in-memory lookups."""
+    if prices is None and state is None:
+        return ah.fetch_as_of_quotes(account_id, symbols, held, as_of)
+
+    quotes = []
+    for symbol in symbols:
+        is_held = symbol in held
+        sync_date = _latest_common_date(account_id, symbol, as_of, prices, state) if is_held else _latest_price_date(symbol, as_of, prices)
+        holding = None
+        if is_held and sync_date:
+            holding = state.holding_on(symbol, sync_date) if state is not None else ah.fetch_account_holding_on_date(account_id, symbol, sync_date)
+        quotes.append(ah.AsOfQuote(
+            symbol=symbol,
+            sync_date=sync_date,
+            stock_price=_price_on(symbol, sync_date, prices) if sync_date else None,
+            last_nonzero_price=_latest_nonzero_price(symbol, as_of, prices),
+            quantity=holding.quantity if holding else None,
+        ))
+    return quotes
 
-def process_daily_interest(account_id: int, eval_date: date) -> None:
-    balance = acl.get_cash_balance(account_id, eval_date + timedelta(days=1))
+def process_daily_interest(account_id: int, eval_date: date, state: AccountState | None = None, schedule: Schedule | None = None) -> None:
+    balance = _cash_balance(account_id, eval_date + timedelta(days=1), state)
     if balance > 0:
-        rate_cfg = interest_config.get_latest_interest_rate(eval_date)
-        if rate_cfg:
-            daily_int = (balance * (rate_cfg.annual_rate / Decimal('100') / Decimal('365'))).quantize(Decimal('0.01'))
-            acl.record_cash_transaction(acl.AccountCashLedger(
-                account_id=account_id,
-                transaction_date=eval_date,
-                amount=daily_int,
-                entry_type='INTEREST',
-                description=f"Interest on {balance:,.2f}"
-            ))
-
-def process_daily_dividends(account_id: int, eval_date: date) -> None:
-    divs = ticker_dividend_history.fetch_dividends_for_holdings(account_id, eval_date)
+        rate_cfg = schedule.rate_on(eval_date) if schedule is not None else interest_config.get_latest_interest_rate(eval_date)
+        record_interest(account_id, eval_date, balance, rate_cfg, state)
+
+def record_interest(account_id: int, eval_date: date, balance: Decimal, rate_cfg: interest_config.InterestRateConfig | None, state: AccountState | None = None) -> None:
+    if rate_cfg:
+        daily_int = (balance * (rate_cfg.annual_rate / Decimal('100') / Decimal('365'))).quantize(Decimal('0.01'))
+        _record_cash(acl.AccountCashLedger(
+            account_id=account_id,
+            transaction_date=eval_date,
+            amount=daily_int,
+            entry_type='INTEREST',
+            description=f"Interest on {balance:,.2f}"
+        ), state)
+
+def process_daily_dividends(account_id: int, eval_date: date, state: AccountState | None = None, schedule: Schedule | None = None) -> None:
+    if state is not None:
+        held = state.current_snapshot(eval_date)
+        if schedule is not None:
+            schedule.ensure(h.symbol for h in held)
+            amounts = schedule.dividends_on(eval_date)
+        else:
+            amounts = ticker_dividend_history.fetch_dividends_on_date([h.symbol for h in held], eval_date) if held else {}
+        divs = [{'symbol': h.symbol, 'quantity': h.quantity, 'amount_per_share': amounts[h.symbol]} for h in held if h.symbol in amounts]
+    else:
+        divs = ticker_dividend_history.fetch_dividends_for_holdings(account_id, eval_date)
+    record_dividends(account_id, eval_date, divs, state)
+
+def record_dividends(account_id: int, eval_date: date, divs: list[dict], state: AccountState | None = None) -> None:
     for d in divs:
         total = (d['quantity'] * d['amount_per_share']).quantize(Decimal('0.01'))
-        acl.record_cash_transaction(acl.AccountCashLedger(
+        _record_cash(acl.AccountCashLedger(
             account_id=account_id,
             transaction_date=eval_date,
             amount=total,
             entry_type='DIVIDEND',
             description=f"Div: {d['symbol']} ({d['quantity']} shares)"
-        ))
+        ), state)
 
 @dataclass
 class TradeCandidate:
@@ -190,6 +295,8 @@ def execute_minimal_rebalance(
     symbol_weights: dict[str, float],
     rebalance_mode: str = 'on_change',
     is_fund_update_day: bool = False,
+    prices: PriceStore | None = None,
+    state: AccountState | None = None,
 ) -> List[at.AccountTrade]:
 
     if not candidates:
@@ -197,48 +304,47 @@ def execute_minimal_rebalance(
    
     # --- FETCH LATEST INDIVIDUAL PRICE DATA ---
     all_syms = list(set([h.symbol for h in account_holdings] + [c.symbol for c in candidates]))
-    prices = {}
+    if prices is not None:
+        prices.ensure(all_syms)
+    symbol_prices = {}
     quantities = {}
     sync_dates = {}
 
-    for symbol in all_syms:
-
-        # Determine if we already hold this (to decide which date logic to use)
-        is_held = any(h.symbol == symbol and h.quantity > 0 for h in account_holdings)
-
-        if is_held:
-            # 1. EXISTING: Must have a common date to safely Sell/Rebalance
-            sync_date = ah.fetch_latest_common_date_for_ticker(account_id, symbol, eval_date)
-        else:
-            # 2. NEW BUY: Only needs the latest available price date
-            sync_date = ticker_value.fetch_latest_price_date_for_ticker(symbol, eval_date)
-
+    # Held symbols must have a common price/holding date to safely Sell/Rebalance; new buys only need the latest price date
+    held = list({h.symbol for h in account_holdings if h.quantity > 0})
+    for q in _as_of_quotes(account_id, all_syms, held, eval_date, prices, state):
         price = 0.0
-        qty = 0.0
-
-        if sync_date:
-            tv = ticker_value.fetch_ticker_on_date(symbol, sync_date)
-            holding_at_date = ah.fetch_account_holding_on_date(account_id, symbol, sync_date) if is_held else None
-
-            if tv and tv.stock_price and float(tv.stock_price) > 0:
-                price = float(tv.stock_price)
-            qty = float(holding_at_date.quantity) if holding_at_date else 0.0
-
+        if q.sync_date and q.stock_price and q.stock_price > 0:
+            price = float(q.stock_price)
         if price <= 0:
-            price = ticker_value.fetch_latest_nonzero_price(symbol, eval_date) or 0.0
-
-        prices[symbol] = price
-        quantities[symbol] = qty
-        sync_dates[symbol] = sync_date
+            price = float(q.last_nonzero_price or 0.0)
+
+        symbol_prices[q.symbol] = price
+        quantities[q.symbol] = float(q.quantity) if q.quantity else 0.0
+        sync_dates[q.symbol] = q.sync_date
+
+    if INTEGER_CENTS:
+        trades, cash_ledger_entries = cents.rebalance(
+            account_id, eval_date, all_syms,
+            qty_held=np.array([quantities[s] for s in all_syms], dtype=np.float64),
+            price=np.array([symbol_prices[s] for s in all_syms], dtype=np.float64),
+            cash=_cash_balance(account_id, eval_date, state),
+            candidates=candidates,
+            symbol_weights=symbol_weights,
+            rebalance_mode=rebalance_mode,
+            is_fund_update_day=is_fund_update_day,
+            drift_threshold=DRIFT_THRESHOLD,
+        )
+        return _commit_trades(trades, cash_ledger_entries, state)
 
     # --- BUILD DATAFRAME ---
     df = pd.DataFrame({'symbol': all_syms})
     df['qty_held'] = df['symbol'].map(quantities).fillna(0.0)
-    df['price'] = df['symbol'].map(prices).fillna(0.0)
+    df['price'] = df['symbol'].map(symbol_prices).fillna(0.0)
     df['sync_date'] = df['symbol'].map(sync_dates)
     df['current_val'] = df['qty_held'] * df['price']
 
-    cash_val = float(acl.get_cash_balance(account_id, eval_date))
+    cash_val = float(_cash_balance(account_id, eval_date, state))
     tpv = cash_val + df['current_val'].sum()
 
     # --- TARGET LOGIC ---
@@ -447,7 +553,13 @@ def execute_minimal_rebalance(
                                 f"Drift rebalance BUY {qty} {row['symbol']}"
                             )
 
-    # --- COMMIT ---
+    return _commit_trades(trades, cash_ledger_entries, state)
+
+def _commit_trades(trades: List[at.AccountTrade], cash_ledger_entries: List[acl.AccountCashLedger], state: AccountState | None) -> List[at.AccountTrade]:
+    if state is not None:
+        state.record_trades(trades, cash_ledger_entries)
+        return trades
+
     for trade in trades:
         at.record_trade(trade)
 
@@ -460,162 +572,34 @@ def create_daily_snapshot(
     account_id: int, 
     eval_date: date, 
     previous_holdings: List[ah.AccountHolding], # Already in memory
-    today_trades: List[at.AccountTrade]         # Returned from rebalance
+    today_trades: List[at.AccountTrade],        # Returned from rebalance
+    prices: PriceStore | None = None,
+    state: AccountState | None = None
 ) -> tuple[Decimal, List[ah.AccountHolding]] :
     
-    # 1. Load data into DataFrames
-    df_prev = pd.DataFrame([vars(h) for h in previous_holdings])
-    if df_prev.empty:
-        df_prev = pd.DataFrame(columns=['symbol', 'quantity', 'cost_basis'])
-    
-    # Convert to float immediately
-    df_prev['quantity'] = df_prev['quantity'].astype(float)
-    df_prev['cost_basis'] = df_prev['cost_basis'].astype(float)
-
-
-    # --- APPLY SPLITS TO PREVIOUS HOLDINGS ---
-    # We must adjust the "carried over" shares to match today's post-split reality
-    # BEFORE we merge with today's trades.
-    
-    # # Fetch split factors for all currently held symbols on this specific date
-    # # Returns a dict: {'AAPL': 4.0, 'TSLA': 3.0} for a 4:1 and 3:1 split
-    # split_map = ticker_split_history.fetch_split_factors_on_date(df_prev['symbol'].tolist(), eval_date)
-    
-    # if split_map:
-    #     def apply_split(row):
-    #         symbol = row['symbol']
-    #         factor = split_map.get(symbol, 1.0)
-            
-    #         if factor != 1.0:
-    #             # Quantity increases (or decreases) by the factor
-    #             # Total Cost Basis remains UNCHANGED (your investment value didn't change)
-    #             return row['quantity'] * factor
-    #         return row['quantity']
-
-    #     df_prev['quantity'] = df_prev.apply(apply_split, axis=1)
-        
-    #     # Optional: Log the adjustment for debugging
-    #     for sym, factor in split_map.items():
-    #         print(f"Applied {factor}:1 split adjustment to {sym} holdings on {eval_date}")
-
-
-    df_trades = pd.DataFrame([vars(t) for t in today_trades])
-
-    # 2. Process Trades (Aggregate by Symbol)
-    if not df_trades.empty:
-
-        df_trades['quantity'] = df_trades['quantity'].astype(float)
-        df_trades['total_amount'] = df_trades['total_amount'].astype(float)
-        df_trades['commission'] = df_trades['commission'].astype(float)
-
-        # Net Quantity: BUY is +, SELL is -
-        df_trades['qty_delta'] = df_trades.apply(
-            lambda x: float(x['quantity']) if x['side'] == 'BUY' else -float(x['quantity']), axis=1
-        )
-        # Cost Basis Delta: Only BUYS increase cost basis (Price + Fee)
-        df_trades['cost_delta'] = df_trades.apply(
-            lambda x: float(x['total_amount'] + x['commission']) if x['side'] == 'BUY' else 0.0, axis=1
-        )
-        # Track total quantity sold for pro-rata cost reduction
-        df_trades['qty_sold'] = df_trades.apply(
-            lambda x: float(x['quantity']) if x['side'] == 'SELL' else 0.0, axis=1
-        )
-        
-        trade_summary = df_trades.groupby('symbol').agg({
-            'qty_delta': 'sum',
-            'cost_delta': 'sum',
-            'qty_sold': 'sum'
-        }).reset_index()
-    else:
-        trade_summary = pd.DataFrame(columns=['symbol', 'qty_delta', 'cost_delta', 'qty_sold'])
-
-    # 3. Merge Yesterday and Today
-    df = pd.merge(
-        df_prev[['symbol', 'quantity', 'cost_basis']], 
-        trade_summary, 
-        on='symbol', 
-        how='outer'
+    # Split adjustment of the carried-over quantities is disabled (ticker_split_history.fetch_split_factors_on_date)
+    eod_cash = float(_cash_balance(account_id, eval_date + timedelta(days=1), state))
+    snapshots = snapshot.build(
+        account_id, eval_date, previous_holdings, today_trades,
+        as_of_prices=lambda symbols: _as_of_prices(symbols, eval_date, prices),
+        eod_cash=eod_cash,
     )
-    df = df.infer_objects()
-    num_cols = ['quantity', 'cost_basis', 'qty_delta', 'cost_delta', 'qty_sold']
-    for col in num_cols:
-        if col in df.columns:
-            df[col] = df[col].fillna(0.0).astype(float)
-            
-    # 4. Calculate New Quantity
-    df['new_qty'] = df['quantity'] + df['qty_delta']
-    
-    # 5. Calculate Adjusted Cost Basis
-    # For Sells: Reduce cost basis by the % of the position sold
-    def calculate_new_cost(row):
-        old_qty = float(row['quantity'])
-        old_cost = float(row['cost_basis'])
-        qty_sold = float(row['qty_sold'])
-        
-        if old_qty > 0 and qty_sold > 0:
-            sell_pct = min(1.0, qty_sold / old_qty)
-            old_cost = old_cost * (1.0 - sell_pct)
-            
-        return old_cost + row['cost_delta']
-
-    df['new_cost'] = df.apply(calculate_new_cost, axis=1)
-    
-    # Filter for active holdings (remove positions closed today)
-    df = df[df['new_qty'] > 1e-8].copy()
-    if df.empty: 
+    if not snapshots:
         return Decimal(0.0), []
 
-    # 6. Market Value & Weights
-    price_map = {}
-    for symbol in df['symbol'].unique():
-        latest_date = ticker_value.fetch_latest_price_date_for_ticker(symbol, eval_date)
-        if latest_date:
-            tv = ticker_value.fetch_ticker_on_date(symbol, latest_date)
-            if tv and tv.stock_price:
-                price_map[symbol] = float(tv.stock_price)
-    
-    # Map latest available prices
-    df['price'] = df['symbol'].map(price_map)
-
-    # Fallback logic: If today's price is missing/zero, use previous day's implied price
-    # We calculate implied_prev_price from the previous holdings we already have in df_prev
-    if not df_prev.empty:
-        # Avoid division by zero for symbols that had 0 qty yesterday
-        df_prev['prev_price'] = df_prev.apply(
-            lambda x: float(x['market_value']) / float(x['quantity']) if float(x['quantity']) > 0 else 0.0, axis=1
-        )
-        prev_price_map = dict(zip(df_prev['symbol'], df_prev['prev_price']))
-        # Fill only the NaNs (where today's price was 0 or missing)
-        df['price'] = df['price'].fillna(df['symbol'].map(prev_price_map))
+    # 7. Record into database (or the in-memory books, flushed later)
+    if state is not None:
+        state.record_holdings(snapshots)
+        perf = ap.calculate_daily_performance(account_id, eval_date, Decimal(round(eod_cash,2)), snapshots, state.total_value)
+        state.record_performance(perf)
+        return perf.daily_return, snapshots
 
-    # Final fallback to 0.0 for entirely new symbols with no history and no current price
-    df['price'] = df['price'].fillna(0.0)
-    df['mkt_val'] = df['new_qty'] * df['price']
-
-    # Cash at End of Day
-    eod_cash = float(acl.get_cash_balance(account_id, eval_date + timedelta(days=1)))
-    tpv = df['mkt_val'].sum() + eod_cash
-    df['weight'] = df['mkt_val'] / tpv if tpv > 0 else 0.0
-
-    snapshots = [
-        ah.AccountHolding(
-            account_id=account_id,
-            holding_date=eval_date,
-            symbol=row['symbol'],
-            quantity=Decimal(str(round(row['new_qty'], 0))),
-            cost_basis=Decimal(str(round(row['new_cost'], 2))),
-            market_value=Decimal(str(round(row['mkt_val'], 2))),
-            weight_percentage=Decimal(str(round(row['weight'], 6)))
-        ) for _, row in df.iterrows()
-    ]
-
-    # 7. Record into database
     ah.record_account_holdings(snapshots)
     daily_return = ap.record_daily_performance(account_id=account_id, eval_date=eval_date, cash_balance=Decimal(round(eod_cash,2)), snapshots=snapshots)
 
     return daily_return, snapshots
 
-def benchmark_comparison(account_id: int, fund_id: int, eval_date: date, daily_return: Decimal, snapshots: List[ah.AccountHolding], fund_data=None):
+def benchmark_comparison(account_id: int, fund_id: int, eval_date: date, daily_return: Decimal, snapshots: List[ah.AccountHolding], fund_data=None, state: AccountState | None = None, benchmarks: BenchmarkSeries | None = None):
     if fund_data is None:
         fund_data = fund.fetch_fund(fund_id)
 
@@ -628,55 +612,67 @@ def benchmark_comparison(account_id: int, fund_id: int, eval_date: date, daily_r
         return
 
     for symbol in strategy.benchmarks:
-        # Get Benchmark Prices
-        today_bench = bv.fetch_benchmark_price(symbol, eval_date)
-        prev_bench = bv.fetch_latest_benchmark_price_before(symbol, eval_date)
-
-        if not today_bench or not prev_bench:
+        # Benchmark return since its previous price
+        bench_return = _benchmark_return(symbol, eval_date, benchmarks)
+        if bench_return is None:
             continue
 
         # Calculate Benchmark Metrics
-        bench_return = (today_bench.price / prev_bench.price) - 1
         alpha = daily_return - bench_return
 
         # Calculate Indexed Growth ($1.00 starting value)
-        prev_strat_idx, prev_bench_idx = abc.fetch_previous_comparison_values(account_id, symbol, eval_date)
+        if state is not None:
+            prev_strat_idx, prev_bench_idx = state.previous_indexes(symbol)
+        else:
+            prev_strat_idx, prev_bench_idx = abc.fetch_previous_comparison_values(account_id, symbol, eval_date)
         
         new_strat_idx = (prev_strat_idx * (1 + daily_return)).quantize(Decimal('0.000001'))
         new_bench_idx = (prev_bench_idx * (1 + bench_return)).quantize(Decimal('0.000001'))
 
         # Save Comparison
-        abc.record_benchmark_comparison(abc.AccountBenchmarkComparison(
+        comparison = abc.AccountBenchmarkComparison(
             account_id=account_id,
             benchmark_symbol=symbol,
             performance_date=eval_date,
             strategy_indexed_value=new_strat_idx,
             benchmark_indexed_value=new_bench_idx,
             daily_alpha=alpha.quantize(Decimal('0.000001'))
-        ))
+        )
+        if state is not None:
+            state.record_comparison(comparison)
+        else:
+            abc.record_benchmark_comparison(comparison)
 
-def get_account_holdings(account_id: int, eval_date: date) -> list[ah.AccountHolding]:
-    account_holdings = ah.fetch_current_account_snapshot(account_id, eval_date)
+def get_account_holdings(account_id: int, eval_date: date, prices: PriceStore | None = None, state: AccountState | None = None) -> list[ah.AccountHolding]:
+    if state is not None:
+        account_holdings = state.current_snapshot(eval_date)
+    else:
+        account_holdings = ah.fetch_current_account_snapshot(account_id, eval_date)
 
     # Verify price availability status for holdings for this date
     held_symbols = list([h.symbol for h in account_holdings])
-    current_ticker_data = ticker_value.fetch_tickers_by_symbols_on_date(held_symbols, eval_date)
-    symbols_with_prices = {t.symbol for t in current_ticker_data if t.stock_price}
+    if prices is not None:
+        prices.ensure(held_symbols)
+        symbols_with_prices = prices.symbols_priced_on(held_symbols, eval_date)
+    else:
+        current_ticker_data = ticker_value.fetch_tickers_by_symbols_on_date(held_symbols, eval_date)
+        symbols_with_prices = {t.symbol for t in current_ticker_data if t.stock_price}
     missing_prices = [s for s in held_symbols if s not in symbols_with_prices]
     if len(missing_prices) != 0 and len(missing_prices) != len(held_symbols):
         print(f"** Missing pricing on {eval_date} for {len(missing_prices)} out of {len(held_symbols)} - {', '.join(missing_prices)} - will use most recently available")
 
     return account_holdings
 
-def daily_actions(account: account.Account, sim_date: date):
+def daily_actions(account: account.Account, sim_date: date, prices: PriceStore | None = None, state: AccountState | None = None, benchmarks: BenchmarkSeries | None = None,
+                  schedule: Schedule | None = None):
     if account.id is None:
         raise Exception('Account ID not specified')
     
     # Update Cash: Apply dividends 
-    process_daily_dividends(account_id=account.id, eval_date=sim_date)   
+    process_daily_dividends(account_id=account.id, eval_date=sim_date, state=state, schedule=schedule)   
 
     if sim_date.weekday() < 5: # Monday -> Friday
-        account_holdings = get_account_holdings(account_id=account.id, eval_date=sim_date)
+        account_holdings = get_account_holdings(account_id=account.id, eval_date=sim_date, prices=prices, state=state)
 
         # Fetch target fund holdings once; derive both candidates and weights from them
         target_fund_holdings = fund_holding.fetch_funds_holdings(fund_id=account.strategy_fund_id, eval_date=sim_date)
@@ -706,16 +702,18 @@ def daily_actions(account: account.Account, sim_date: date):
             symbol_weights=symbol_weights,
             rebalance_mode=rebalance_mode,
             is_fund_update_day=is_fund_update_day,
+            prices=prices,
+            state=state,
         )
 
         # Create Today's Snapshot
-        daily_return, snapshots = create_daily_snapshot(account_id=account.id, eval_date=sim_date, previous_holdings=account_holdings, today_trades=today_trades)
+        daily_return, snapshots = create_daily_snapshot(account_id=account.id, eval_date=sim_date, previous_holdings=account_holdings, today_trades=today_trades, prices=prices, state=state)
 
         # Record Performance
-        benchmark_comparison(account_id=account.id, fund_id=account.strategy_fund_id, eval_date=sim_date, daily_return=daily_return, snapshots=snapshots, fund_data=fund_data)
+        benchmark_comparison(account_id=account.id, fund_id=account.strategy_fund_id, eval_date=sim_date, daily_return=daily_return, snapshots=snapshots, fund_data=fund_data, state=state, benchmarks=benchmarks)
  
     # Update interest on end of day cash 
-    process_daily_interest(account_id=account.id, eval_date=sim_date)    
+    process_daily_interest(account_id=account.id, eval_date=sim_date, state=state, schedule=schedule)    
    
 
 
@@ -1,4 +1,5 @@
 import log
+import pandas as pd
 from datetime import date, timedelta
 from typing import List
 from modules.bt.object import best_idea, fund, fund_holding, fund_holding_change
@@ -19,16 +20,7 @@ def run(today: date) -> List[model_fund.FundChangesResult]:
         #     + all_best_ideas_df.to_string(index=False) + "\n"
         # )
 
-        canonical_rows = all_best_ideas_df[
-            all_best_ideas_df['symbol'] == all_best_ideas_df['canonical_symbol']
-        ]
-        mc_map = (
-            canonical_rows[['canonical_symbol', 'market_cap']]
-            .dropna(subset=['market_cap'])
-            .drop_duplicates(subset='canonical_symbol')
-            .set_index('canonical_symbol')['market_cap']
-            .to_dict()
-        )
+        mc_map = market_cap_map(all_best_ideas_df)
 
         all_results: List[model_fund.FundChangesResult] = []
         for f in funds:
@@ -52,3 +44,17 @@ def run(today: date) -> List[model_fund.FundChangesResult]:
     except Exception as e:
         log.record_error(f"Error in fund update run: {e}")
         raise e
+
+
+def market_cap_map(all_best_ideas_df: pd.DataFrame) -> dict:
+    """canonical_symbol -> market_cap, from the canonical rows of the resolved best ideas."""
+    canonical_rows = all_best_ideas_df[
+        all_best_ideas_df['symbol'] == all_best_ideas_df['canonical_symbol']
+    ]
+    return (
+        canonical_rows[['canonical_symbol', 'market_cap']]
+        .dropna(subset=['market_cap'])
+        .drop_duplicates(subset='canonical_symbol')
+        .set_index('canonical_symbol')['market_cap']
+        .to_dict()
+    )
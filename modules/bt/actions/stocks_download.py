@@ -4,7 +4,7 @@ import math
 import re
 from decimal import Decimal
 from typing import List
-from datetime import date, timedelta
+from datetime import date
 from concurrent.futures import ThreadPoolExecutor
 from modules.core.api_stocks import get_stock_profile, get_stock_historic_prices, get_stock_historic_dividend, get_stock_historic_splits, get_stock_historic_market_cap, fetch_esg_data
 from modules.calc import esg
@@ -13,6 +13,7 @@ from modules.bt.object import account, ticker_split_history
 from modules.bt.object import fund
 from modules.bt.object.provider_etf_holding import fetch_tickers_for_etfs
 from modules.bt.object import ticker, ticker_value, ticker_dividend_history
+from modules.bt.calc.trading_calendar import weekday_count
 
 REMOVE_ETFS_AND_FUNDS = r'\b(ETF|fund)\b'
 
@@ -173,15 +174,6 @@ def process_symbol(s: str, start_date: date, end_date: date) -> tuple[bool, str,
         log.record_error(f"Error processing symbol {s}: {e}")
         return False, s, str(e)
 
-def weekday_count(start: date, end: date) -> int:
-    days = (end - start).days + 1
-    weeks, remainder = divmod(days, 7)
-    count = weeks * 5
-    for i in range(remainder):
-        if (start + timedelta(days=weeks * 7 + i)).weekday() < 5:
-            count += 1
-    return count
-
 def run(symbols: list[str], start_date: date, end_date: date) -> tuple[int, int, int]:
     try:
         missing_symbols = []
@@ -0,0 +1,131 @@
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal
+from typing import List, Tuple
+from modules.bt.object import account_cash_ledger as acl, account_trade as at, account_holding as ah
+from modules.bt.object import account_performance as ap, account_benchmark_comparison as abc
+
+# In-memory account books for the back-test: what account_update reads back from the account_* tables
+# (cash balance, latest snapshot, previous total value and benchmark indexes) is kept here instead,
+# and the rows it would have written are held until flush() writes them with one bulk call per table.
+
+
+@dataclass
+class AccountState:
+    account_id: int
+    cash: Decimal = Decimal('0')                      # every ledger entry so far
+    _day: date | None = None                          # latest transaction_date in the ledger
+    _day_cash: Decimal = Decimal('0')                 # sum of the entries on _day
+    _ledger_dates: List[date] = field(default_factory=list)
+    _ledger_amounts: List[Decimal] = field(default_factory=list)
+
+    snapshot: List[ah.AccountHolding] = field(default_factory=list)   # latest non-empty snapshot
+    snapshot_date: date | None = None
+    history: dict[str, List[Tuple[date, ah.AccountHolding]]] = field(default_factory=dict)  # per symbol, date order
+    total_value: Decimal = Decimal('0')               # latest account_performance_daily.total_value
+    indexes: dict[str, Tuple[Decimal, Decimal]] = field(default_factory=dict)  # benchmark -> (strategy, benchmark) index
+
+    pending_ledger: List[acl.AccountCashLedger] = field(default_factory=list)
+    pending_trades: List[at.AccountTrade] = field(default_factory=list)
+    pending_holdings: List[ah.AccountHolding] = field(default_factory=list)
+    pending_performance: List[ap.AccountPerformance] = field(default_factory=list)
+    pending_comparisons: List[abc.AccountBenchmarkComparison] = field(default_factory=list)
+
+    @classmethod
+    def load(cls, account_id: int) -> "AccountState":
+        """Start from the ledger entries reset_accounts keeps (the deposits), whatever else the tables hold."""
+        state = cls(account_id=account_id)
+        for entry in acl.fetch_entries(account_id):
+            if entry.entry_type == 'DEPOSIT':
+                state._post(entry.transaction_date, Decimal(entry.amount))
+        return state
+
+    # ── cash ──
+
+    def _post(self, on: date, amount: Decimal) -> None:
+        self.cash += amount
+        if self._day is None or on > self._day:
+            self._day, self._day_cash = on, Decimal('0')
+        if on == self._day:
+            self._day_cash += amount
+        self._ledger_dates.append(on)
+        self._ledger_amounts.append(amount)
+
+    def cash_balance(self, before: date) -> Decimal:
+        """Sum of the entries dated before `before` (acl.get_cash_balance)."""
+        if self._day is None or before > self._day:
+            return self.cash
+        if before == self._day:
+            return self.cash - self._day_cash
+        # Back-dated read: not on the simulation's path, so a plain scan is enough
+        return sum((a for d, a in zip(self._ledger_dates, self._ledger_amounts) if d < before), Decimal('0'))
+
+    def record_cash(self, entry: acl.AccountCashLedger) -> None:
+        self._post(entry.transaction_date, entry.amount)
+        self.pending_ledger.append(entry)
+
+    def record_trades(self, trades: List[at.AccountTrade], entries: List[acl.AccountCashLedger]) -> None:
+        self.pending_trades.extend(trades)
+        for entry in entries:
+            self.record_cash(entry)
+
+    # ── holdings ──
+
+    def current_snapshot(self, as_of: date) -> List[ah.AccountHolding]:
+        """Latest snapshot dated on or before as_of (ah.fetch_current_account_snapshot)."""
+        if self.snapshot_date is None or self.snapshot_date > as_of:
+            return []
+        return list(self.snapshot)
+
+    def record_holdings(self, holdings: List[ah.AccountHolding]) -> None:
+        if not holdings:
+            return
+        self.snapshot = list(holdings)
+        self.snapshot_date = holdings[0].holding_date
+        for h in holdings:
+            self.history.setdefault(h.symbol, []).append((h.holding_date, h))
+        self.pending_holdings.extend(holdings)
+
+    def holding_on(self, symbol: str, on: date) -> ah.AccountHolding | None:
+        """The symbol's snapshot row on exactly that date (ah.fetch_account_holding_on_date)."""
+        rows = self.history.get(symbol, [])
+        i = bisect_left(rows, on, key=lambda r: r[0])
+        return rows[i][1] if i < len(rows) and rows[i][0] == on else None
+
+    def holding_dates(self, symbol: str, as_of: date) -> List[date]:
+        """Dates on or before as_of with a snapshot row for the symbol, latest first."""
+        rows = self.history.get(symbol, [])
+        i = bisect_left(rows, as_of, key=lambda r: r[0])
+        if i < len(rows) and rows[i][0] == as_of:
+            i += 1
+        return [d for d, _ in reversed(rows[:i])]
+
+    # ── performance ──
+
+    def record_performance(self, perf: ap.AccountPerformance) -> None:
+        self.total_value = perf.total_value
+        self.pending_performance.append(perf)
+
+    def previous_indexes(self, benchmark_symbol: str) -> Tuple[Decimal, Decimal]:
+        """(abc.fetch_previous_comparison_values)"""
+        return self.indexes.get(benchmark_symbol, (Decimal('1.0'), Decimal('1.0')))
+
+    def record_comparison(self, entry: abc.AccountBenchmarkComparison) -> None:
+        self.indexes[entry.benchmark_symbol] = (entry.strategy_indexed_value, entry.benchmark_indexed_value)
+        self.pending_comparisons.append(entry)
+
+    # ── persistence ──
+
+    def flush(self) -> int:
+        """Write everything recorded since the last flush, one bulk call per table. Returns the number of rows written."""
+        written = (len(self.pending_ledger) + len(self.pending_trades) + len(self.pending_holdings)
+                   + len(self.pending_performance) + len(self.pending_comparisons))
+        acl.insert_bulk(self.pending_ledger)
+        at.insert_bulk(self.pending_trades)
+        ah.upsert_bulk(self.pending_holdings)
+        ap.upsert_bulk(self.pending_performance)
+        abc.upsert_bulk(self.pending_comparisons)
+        self.pending_ledger, self.pending_trades, self.pending_holdings = [], [], []
+        self.pending_performance, self.pending_comparisons = [], []
+        return written
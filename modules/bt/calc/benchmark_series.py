@@ -0,0 +1,33 @@
+from datetime import date
+from decimal import Decimal
+from typing import Iterable
+from modules.bt.object import benchmark_value as bv
+
+# benchmark_value for the back-test, loaded once per symbol and shared by every account on that benchmark.
+# A day's return is its price over the latest price before it, as benchmark_comparison computed it from
+# fetch_benchmark_price and fetch_latest_benchmark_price_before; the indexed values stay in the account books.
+
+
+class BenchmarkSeries:
+
+    def __init__(self, end: date) -> None:
+        self.end = end
+        self.returns: dict[str, dict[date, Decimal]] = {}
+
+    def ensure(self, symbols: Iterable[str]) -> None:
+        """Load the symbols not in the series yet (one query for all of them)."""
+        missing = sorted({s for s in symbols if s not in self.returns})
+        if not missing:
+            return
+        for symbol in missing:
+            self.returns[symbol] = {}
+        previous: bv.BenchmarkValue | None = None
+        for value in bv.fetch_series(missing, self.end):
+            if previous is not None and previous.symbol == value.symbol:
+                self.returns[value.symbol][value.value_date] = (value.price / previous.price) - 1
+            previous = value
+
+    def daily_return(self, symbol: str, on: date) -> Decimal | None:
+        """None when the benchmark has no price on that day or none before it."""
+        self.ensure([symbol])
+        return self.returns[symbol].get(on)
@@ -0,0 +1,194 @@
+import math
+import numpy as np
+from datetime import date
+from decimal import Decimal
+from typing import List, Sequence
+from modules.bt.object import account_trade as at, account_cash_ledger as acl
+
+# execute_minimal_rebalance's trading in integer arithmetic: money in int cents, quantities in whole shares,
+# valuations (targets, deltas) in float as in the Decimal path. Decimals are only made for the trade and
+# ledger rows it returns. Rounding follows the Decimal path (half-even cents, whole shares rounded down), so
+# the trades agree to the cent. tests/test_cents.py checks that on generated books without a database, and
+# scripts/_reconcile_integer_cents.py compares the two over a real run.
+#
+# Exactness: prices are converted through micro-dollars, exact for up to 6 decimals; a target value is compared
+# and divided as a float, which only differs from the Decimal path within ~1e-9 of a whole share.
+
+FEE_HALF_CENTS_PER_SHARE = 1  # calculate_commission: $0.005 per share
+
+
+def to_cents(value: float) -> int:
+    """to_price in cents: Decimal(str(value)).quantize(Decimal('0.01')), half-even."""
+    q, r = divmod(round(value * 1_000_000), 10_000)
+    if r > 5_000 or (r == 5_000 and q % 2):
+        q += 1
+    return q
+
+
+def commission(qty: int) -> int:
+    """calculate_commission in cents: half a cent per share, half-even."""
+    q, r = divmod(qty * FEE_HALF_CENTS_PER_SHARE, 2)
+    if r and q % 2:
+        q += 1
+    return max(q, 0)
+
+
+def to_decimal(cents: int) -> Decimal:
+    return Decimal(cents).scaleb(-2)
+
+
+def _shares(value: float | int, price: int) -> int:
+    """Whole shares value (cents) buys at price (cents), rounded down."""
+    return value // price if isinstance(value, int) else math.floor(value / price)
+
+
+class _Book:
+    """The day's trades and cash, as execute_trade keeps them."""
+
+    def __init__(self, cash: int) -> None:
+        self.cash = cash
+        self.fills: List[tuple[str, str, int, int, int, int, str]] = []   # side, symbol, qty, price, commission, gross, description
+
+    def trade(self, side: str, symbol: str, qty: int, price: int, description: str) -> None:
+        if qty <= 0 or price <= 0:
+            return
+        gross = qty * price
+        fee = commission(qty)
+        if side == "BUY":
+            if gross + fee > self.cash:
+                return
+            self.cash -= gross + fee
+        else:
+            self.cash += gross - fee
+        self.fills.append((side, symbol, qty, price, fee, gross, description))
+
+    def records(self, account_id: int, trade_date: date) -> tuple[List[at.AccountTrade], List[acl.AccountCashLedger]]:
+        trades, entries = [], []
+        for side, symbol, qty, price, fee, gross, description in self.fills:
+            trades.append(at.AccountTrade(
+                account_id=account_id,
+                symbol=symbol,
+                trade_date=trade_date,
+                side=side,
+                quantity=Decimal(qty),
+                price=to_decimal(price),
+                commission=to_decimal(fee),
+                total_amount=to_decimal(gross)
+            ))
+            entries.append(acl.AccountCashLedger(
+                account_id=account_id,
+                transaction_date=trade_date,
+                amount=to_decimal(-(gross + fee) if side == "BUY" else gross - fee),
+                entry_type='TRADE_BUY' if side == "BUY" else 'TRADE_SELL',
+                description=description
+            ))
+        return trades, entries
+
+
+def rebalance(
+    account_id: int,
+    eval_date: date,
+    symbols: Sequence[str],
+    qty_held: np.ndarray,
+    price: np.ndarray,
+    cash: Decimal,
+    candidates: list,
+    symbol_weights: dict[str, float],
+    rebalance_mode: str,
+    is_fund_update_day: bool,
+    drift_threshold: float,
+) -> tuple[List[at.AccountTrade], List[acl.AccountCashLedger]]:
+    """The trading part of execute_minimal_rebalance, on its resolved quantities and prices (float arrays in symbols order)."""
+    n = len(symbols)
+    actions = {c.symbol: c.action for c in candidates}
+    priorities = {c.symbol: c.priority for c in candidates if c.action == "ENTER"}
+    sym = np.array(symbols)
+    is_exit = np.array([actions.get(s) == "EXIT" for s in symbols], dtype=bool)
+    is_enter = np.array([s in priorities for s in symbols], dtype=bool)
+    in_candidates = np.array([s in actions for s in symbols], dtype=bool)
+    priority = np.array([priorities.get(s, np.inf) for s in symbols], dtype=np.float64)
+    weight = np.array([symbol_weights.get(s, 0.0) for s in symbols], dtype=np.float64)
+
+    price_cents = np.array([to_cents(p) for p in price.tolist()], dtype=np.int64)
+    held_shares = np.trunc(qty_held).astype(np.int64)
+    current_val = qty_held * price
+
+    def valuation(cash_val: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        tpv = cash_val + current_val.sum()
+        target = np.where(is_exit, 0.0, tpv * weight)
+        delta = current_val - target
+        # ENTER candidates by priority, then everything else by size of the gap and symbol
+        order = np.lexsort((sym, -np.abs(delta), priority, ~is_enter)) if n else np.empty(0, dtype=np.int64)
+        return target, delta, order
+
+    book = _Book(to_cents(float(cash)))
+    target, delta, order = valuation(float(cash))
+
+    # --- SELLS FIRST (EXIT POSITIONS) ---
+    for i in order[is_exit[order]]:
+        book.trade("SELL", symbols[i], int(held_shares[i]), int(price_cents[i]), f"Sold {held_shares[i]} units of {symbols[i]}")
+
+    # --- BUYS SECOND (ENTER POSITIONS) ---
+    for i in order[is_enter[order]]:
+        p = int(price_cents[i])
+        target_cents = float(target[i]) * 100
+        if target_cents <= 5_000:
+            continue
+        gross_target = target_cents if target_cents <= book.cash else book.cash
+        if gross_target <= 0:
+            break
+        gross_qty = _shares(gross_target, p)
+        if gross_qty <= 0:
+            continue
+        net_target = gross_target - commission(gross_qty)
+        if net_target <= 0:
+            continue
+        qty = _shares(net_target, p)
+        if qty <= 0:
+            continue
+        book.trade("BUY", symbols[i], qty, p, f"Bought {qty} units of {symbols[i]}")
+
+    # --- DRIFT REBALANCE ---
+    has_composition_change = any(c.action in ('ENTER', 'EXIT') for c in candidates)
+    do_full_rebalance = (rebalance_mode == 'full' and is_fund_update_day)
+    if rebalance_mode == 'none' or not (has_composition_change or do_full_rebalance):
+        return book.records(account_id, eval_date)
+
+    target, delta, order = valuation(book.cash / 100)
+    drift_pct = np.divide(np.abs(delta), target, out=np.zeros(n), where=target > 0)
+    drift = order[~in_candidates[order] & (do_full_rebalance | (drift_pct[order] > drift_threshold))]
+    drift = drift[np.argsort(-np.abs(delta[drift]), kind='stable')]
+
+    # SELL overweight positions
+    if do_full_rebalance or book.cash < 0:
+        for i in drift[delta[drift] > 0]:
+            p = int(price_cents[i])
+            surplus = float(delta[i]) * 100
+            if do_full_rebalance:
+                qty = _shares(surplus, p)
+            else:
+                if book.cash >= 0:
+                    break
+                qty = min(_shares(surplus, p), -(book.cash // p))   # shares needed to cover the deficit, rounded up
+            qty = max(0, min(qty, int(held_shares[i])))
+            book.trade("SELL", symbols[i], qty, p, f"Drift rebalance SELL {qty} {symbols[i]}")
+
+    # BUY underweight positions
+    elif do_full_rebalance or book.cash > 100_000:
+        for i in drift[delta[drift] < 0]:
+            if book.cash <= 10_000:
+                break
+            p = int(price_cents[i])
+            gap = abs(float(delta[i])) * 100
+            # max affordable = (cash - $1.00) / 1.001, kept as the fraction affordable / 1001 to stay exact
+            affordable = (book.cash - 100) * 1000
+            if gap * 1001 <= affordable:
+                net_target = gap - commission(_shares(gap, p))
+                qty = _shares(net_target, p) if net_target > 0 else 0
+            else:
+                net_affordable = affordable - 1001 * commission(affordable // (1001 * p))
+                qty = net_affordable // (1001 * p) if net_affordable > 0 else 0
+            if qty > 0:
+                book.trade("BUY", symbols[i], qty, p, f"Drift rebalance BUY {qty} {symbols[i]}")
+
+    return book.records(account_id, eval_date)
@@ -0,0 +1,70 @@
+import glob
+import hashlib
+import json
+import os
+import pickle
+from dataclasses import dataclass
+from datetime import date
+from modules.bt.object import data_version
+from modules.bt.calc.account_state import AccountState
+
+# Engine state saved at period boundaries, so a re-run can resume instead of starting over from START_DATE.
+# A checkpoint is found by the hash of the run configuration (END_DATE excluded, so extending the range resumes)
+# and is only used while the input data up to its date is unchanged. Accounts carry their own key, so an
+# account that was added or re-pointed to another fund restarts on its own.
+
+CHECKPOINT_DIR = os.environ.get("BT_CHECKPOINT_DIR", ".checkpoints")
+CHECKPOINTS_KEPT = 3
+
+
+@dataclass
+class Checkpoint:
+    as_of: date                          # last simulated day included
+    config_key: str
+    data_version: str
+    account_keys: dict[int, str]         # account_id -> account_key when saved
+    states: dict[int, AccountState]      # flushed: nothing pending
+
+
+def config_key(config: dict) -> str:
+    return hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def account_key(strategy_fund_id: int) -> str:
+    """Fund strategies are part of the run configuration; an account only adds the fund it follows."""
+    return config_key({'fund': strategy_fund_id})
+
+
+def save(key: str, as_of: date, account_keys: dict[int, str], states: dict[int, AccountState], versions: data_version.DataVersions) -> None:
+    """Save the (already flushed) states; older checkpoints of the same configuration beyond CHECKPOINTS_KEPT are removed."""
+    os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+    checkpoint = Checkpoint(as_of=as_of, config_key=key, data_version=versions.at(as_of),
+                            account_keys=account_keys, states=states)
+    path = os.path.join(CHECKPOINT_DIR, f"{key}_{as_of.isoformat()}.pkl")
+    with open(path + ".tmp", "wb") as f:
+        pickle.dump(checkpoint, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(path + ".tmp", path)
+
+    for old in _paths(key)[CHECKPOINTS_KEPT:]:
+        os.remove(old)
+
+
+def latest(key: str, up_to: date) -> Checkpoint | None:
+    """Newest checkpoint of this configuration dated on or before up_to whose input data is unchanged."""
+    versions: data_version.DataVersions | None = None
+    for path in _paths(key):
+        as_of = date.fromisoformat(os.path.basename(path)[len(key) + 1:-len(".pkl")])
+        if as_of > up_to:
+            continue
+        with open(path, "rb") as f:
+            checkpoint: Checkpoint = pickle.load(f)
+        versions = versions or data_version.DataVersions(up_to)
+        if checkpoint.data_version == versions.at(checkpoint.as_of):
+            return checkpoint
+        print(f"Checkpoint {as_of} is stale: input data up to that date has changed.")
+    return None
+
+
+def _paths(key: str) -> list[str]:
+    """This configuration's checkpoint files, newest first."""
+    return sorted(glob.glob(os.path.join(CHECKPOINT_DIR, f"{key}_*.pkl")), reverse=True)
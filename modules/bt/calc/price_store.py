@@ -0,0 +1,169 @@
+import json
+import os
+import numpy as np
+from datetime import date, timedelta
+from typing import Iterable
+from modules.bt.object import ticker_value
+
+# In-memory ticker_value for the back-test: one query per load, then O(1) as-of lookups.
+# Arrays are (symbol_idx, day_idx) over every calendar day in [start, end], so a date's index is (d - start).days.
+
+LOOKBACK_DAYS = 366  # history loaded before the first simulated day, for as-of lookups near the start
+NO_DAY = -1
+ARRAYS = ['price', 'market_cap', 'last_row', 'last_positive', 'last_market_cap']
+
+
+class PriceStore:
+
+    def __init__(self, start: date, end: date) -> None:
+        self.start = start
+        self.end = end
+        self.n_days = (end - start).days + 1
+        self._symbol_idx: dict[str, int] = {}
+        self.symbols: list[str] = []
+        # stock_price per day, NaN where there is no row or the price is NULL
+        self.price = np.empty((0, self.n_days), dtype=np.float64)
+        self.market_cap = np.empty((0, self.n_days), dtype=np.float64)
+        # index of the latest day <= d with a ticker_value row (any price) / with a positive price
+        self.last_row = np.empty((0, self.n_days), dtype=np.int32)
+        self.last_positive = np.empty((0, self.n_days), dtype=np.int32)
+        self.last_market_cap = np.empty((0, self.n_days), dtype=np.int32)
+
+    @classmethod
+    def load(cls, symbols: Iterable[str], first_day: date, last_day: date, lookback_days: int = LOOKBACK_DAYS) -> "PriceStore":
+        store = cls(first_day - timedelta(days=lookback_days), last_day)
+        store.ensure(symbols)
+        return store
+
+    def save(self, directory: str) -> None:
+        """Write the arrays as .npy files, for other processes to open() memory-mapped."""
+        os.makedirs(directory, exist_ok=True)
+        for name in ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(directory, "price_store.json"), "w") as f:
+            json.dump({'start': self.start.isoformat(), 'end': self.end.isoformat(), 'symbols': self.symbols}, f)
+
+    @classmethod
+    def open(cls, directory: str) -> "PriceStore":
+        """A store over the arrays save() wrote, mapped read-only; symbols loaded later are held in memory."""
+        with open(os.path.join(directory, "price_store.json")) as f:
+            meta = json.load(f)
+        store = cls(date.fromisoformat(meta['start']), date.fromisoformat(meta['end']))
+        store.symbols = list(meta['symbols'])
+        store._symbol_idx = {s: i for i, s in enumerate(store.symbols)}
+        for name in ARRAYS:
+            setattr(store, name, np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r'))
+        return store
+
+    def ensure(self, symbols: Iterable[str]) -> None:
+        """Load the symbols not in the store yet (one query for all of them)."""
+        missing = sorted({s for s in symbols if s and s not in self._symbol_idx})
+        if not missing:
+            return
+
+        rows = ticker_value.fetch_price_rows(missing, self.start, self.end)
+        base = len(self.symbols)
+        for i, symbol in enumerate(missing):
+            self._symbol_idx[symbol] = base + i
+        self.symbols.extend(missing)
+
+        price = np.full((len(missing), self.n_days), np.nan, dtype=np.float64)
+        market_cap = np.full((len(missing), self.n_days), np.nan, dtype=np.float64)
+        has_row = np.zeros((len(missing), self.n_days), dtype=bool)
+        if rows:
+            sym = np.fromiter((self._symbol_idx[r[0]] - base for r in rows), dtype=np.int64, count=len(rows))
+            day = np.fromiter(((r[1] - self.start).days for r in rows), dtype=np.int64, count=len(rows))
+            val = np.fromiter((np.nan if r[2] is None else r[2] for r in rows), dtype=np.float64, count=len(rows))
+            cap = np.fromiter((np.nan if r[3] is None else r[3] for r in rows), dtype=np.float64, count=len(rows))
+            has_row[sym, day] = True
+            price[sym, day] = val
+            market_cap[sym, day] = cap
+
+        days = np.arange(self.n_days, dtype=np.int32)
+        last_row = np.maximum.accumulate(np.where(has_row, days, NO_DAY), axis=1)
+        last_positive = np.maximum.accumulate(np.where(price > 0, days, NO_DAY), axis=1)
+        last_market_cap = np.maximum.accumulate(np.where(np.isnan(market_cap), NO_DAY, days), axis=1)
+
+        self.price = np.vstack([self.price, price])
+        self.market_cap = np.vstack([self.market_cap, market_cap])
+        self.last_row = np.vstack([self.last_row, last_row.astype(np.int32)])
+        self.last_positive = np.vstack([self.last_positive, last_positive.astype(np.int32)])
+        self.last_market_cap = np.vstack([self.last_market_cap, last_market_cap.astype(np.int32)])
+
+    # ── indexing ──
+
+    def index_of(self, symbol: str) -> int | None:
+        return self._symbol_idx.get(symbol)
+
+    def day_index(self, d: date) -> int:
+        """Index of d, clamped to the loaded range; NO_DAY before it."""
+        i = (d - self.start).days
+        if i < 0:
+            return NO_DAY
+        return min(i, self.n_days - 1)
+
+    def date_of(self, day: int) -> date:
+        return self.start + timedelta(days=int(day))
+
+    # ── lookups (the DB functions they replace in brackets) ──
+
+    def latest_price_date(self, symbol: str, as_of: date) -> date | None:
+        """Latest date <= as_of with a ticker_value row (fetch_latest_price_date_for_ticker)."""
+        s, d = self.index_of(symbol), self.day_index(as_of)
+        if s is None or d == NO_DAY:
+            return None
+        last = self.last_row[s, d]
+        return None if last == NO_DAY else self.date_of(last)
+
+    def has_row(self, symbol: str, on: date) -> bool:
+        """Whether ticker_value has a row for the symbol on that date, whatever its price."""
+        s, d = self.index_of(symbol), (on - self.start).days
+        if s is None or d < 0 or d >= self.n_days:
+            return False
+        return bool(self.last_row[s, d] == d)
+
+    def price_on(self, symbol: str, on: date) -> float | None:
+        """stock_price on exactly that date (fetch_ticker_on_date)."""
+        s, d = self.index_of(symbol), (on - self.start).days
+        if s is None or d < 0 or d >= self.n_days:
+            return None
+        value = self.price[s, d]
+        return None if np.isnan(value) else float(value)
+
+    def latest_nonzero_price(self, symbol: str, as_of: date) -> float | None:
+        """Latest positive stock_price on or before as_of (fetch_latest_nonzero_price)."""
+        s, d = self.index_of(symbol), self.day_index(as_of)
+        if s is None or d == NO_DAY:
+            return None
+        last = self.last_positive[s, d]
+        return None if last == NO_DAY else float(self.price[s, last])
+
+    def as_of_price(self, symbol: str, as_of: date) -> float | None:
+        """stock_price on the latest date with a row - NULL or 0 included, as the snapshot reads it."""
+        last = self.latest_price_date(symbol, as_of)
+        return None if last is None else self.price_on(symbol, last)
+
+    def as_of_prices(self, rows: np.ndarray, as_of: date) -> np.ndarray:
+        """as_of_price for many store rows at once; NaN where there is no row yet or its price is NULL."""
+        out = np.full(len(rows), np.nan, dtype=np.float64)
+        d = self.day_index(as_of)
+        if d == NO_DAY or not len(rows):
+            return out
+        last = self.last_row[rows, d]
+        found = last != NO_DAY
+        out[found] = self.price[rows[found], last[found]]
+        return out
+
+    def symbols_priced_on(self, symbols: Iterable[str], on: date) -> set[str]:
+        """The symbols with a non-zero stock_price on that date (fetch_tickers_by_symbols_on_date)."""
+        return {s for s in symbols if self.price_on(s, on)}
+
+    def latest_market_cap(self, symbol: str, as_of: date, days: int) -> tuple[date, float] | None:
+        """(value_date, market_cap) of the latest non-NULL market cap within `days` before as_of (fetch_latest_market_caps_within_window)."""
+        s, d = self.index_of(symbol), self.day_index(as_of)
+        if s is None or d == NO_DAY:
+            return None
+        last = self.last_market_cap[s, d]
+        if last == NO_DAY or (as_of - self.date_of(last)).days > days:
+            return None
+        return self.date_of(last), float(self.market_cap[s, last])
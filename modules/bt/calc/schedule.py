@@ -0,0 +1,37 @@
+from bisect import bisect_right
+from datetime import date
+from decimal import Decimal
+from typing import Iterable
+from modules.bt.object import interest_config, ticker_dividend_history
+
+# Corporate actions and interest for the back-test, loaded once: dividends indexed ex_date -> symbol -> amount
+# per share, so only ex-dates are looked at, and the interest rate as a step function over effective dates.
+
+
+class Schedule:
+
+    def __init__(self, start: date, end: date) -> None:
+        self.start = start
+        self.end = end
+        self.dividends: dict[date, dict[str, Decimal]] = {}
+        self._symbols: set[str] = set()
+        self.rates = interest_config.fetch_all()
+        self.rate_dates = [r.effective_date for r in self.rates]
+
+    def ensure(self, symbols: Iterable[str]) -> None:
+        """Load the dividends of the symbols not in the schedule yet (one query for all of them)."""
+        missing = sorted({s for s in symbols if s and s not in self._symbols})
+        if not missing:
+            return
+        self._symbols.update(missing)
+        for d in ticker_dividend_history.fetch_dividends_between(missing, self.start, self.end):
+            self.dividends.setdefault(d.ex_date, {}).setdefault(d.symbol, d.amount_per_share)
+
+    def dividends_on(self, ex_date: date) -> dict[str, Decimal]:
+        """symbol -> amount_per_share going ex on that date (fetch_dividends_on_date), among the loaded symbols."""
+        return self.dividends.get(ex_date, {})
+
+    def rate_on(self, d: date) -> interest_config.InterestRateConfig | None:
+        """The rate in effect on d (get_latest_interest_rate)."""
+        i = bisect_right(self.rate_dates, d)
+        return self.rates[i - 1] if i else None
@@ -0,0 +1,237 @@
+import numpy as np
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Callable, List
+from modules.bt.object import account, fund, fund_holding
+from modules.bt.object import account_holding as ah, account_performance as ap
+from modules.bt.actions import account_update
+from modules.bt.calc.model_fund import getStrategyFromJson, FundHolding
+from modules.bt.calc.price_store import PriceStore
+from modules.bt.calc.account_state import AccountState
+from modules.bt.calc.trading_calendar import TradingCalendar
+from modules.bt.calc.benchmark_series import BenchmarkSeries
+from modules.bt.calc.schedule import Schedule
+from modules.bt.calc import snapshot
+
+# Runs account_update.daily_actions for all accounts over the whole range, without re-reading anything per day:
+# the calendar, dividend events, interest rates and fund target changes are loaded up front, and an account
+# only goes through the trade path (execute_minimal_rebalance + create_daily_snapshot) on a day it has trade
+# candidates. Every other weekday its snapshot is its positions re-priced, for all such accounts in one pass.
+#
+# Tolerance against daily_actions: the re-priced snapshots round market values, cost basis and quantities with
+# the same expressions, so they agree to the cent; weights (6dp) can differ in the last digit because the
+# account total is summed in a different order. Dividend descriptions print quantities as held in memory
+# ("12.0 shares") rather than as read back from numeric(18,8).
+
+
+@dataclass
+class _Positions:
+    """An account's latest snapshot as arrays, in snapshot order."""
+    snapshot_date: date | None
+    holdings: List[ah.AccountHolding]
+    rows: np.ndarray        # price store rows
+    qty: np.ndarray
+    cost: np.ndarray
+    mkt_val: np.ndarray
+
+
+class Simulator:
+
+    def __init__(self, accounts: List[account.Account], start: date, end: date, prices: PriceStore, states: dict[int, AccountState],
+                 fund_targets: dict[int, List[FundHolding]] | None = None, progress: bool = True, calendar: TradingCalendar | None = None,
+                 benchmarks: BenchmarkSeries | None = None, schedule: Schedule | None = None) -> None:
+        self.accounts = [a for a in accounts if a.id is not None]
+        self.start = start
+        self.end = end
+        self.prices = prices
+        self.states = states
+        self.fund_targets = fund_targets    # fund -> its targets, in holding_date order; the fund_holding table when None
+        self.progress = progress
+        self.calendar = calendar if calendar is not None else TradingCalendar(start, end)
+        self.benchmarks = benchmarks if benchmarks is not None else BenchmarkSeries(end)
+        self.schedule = schedule
+        self._positions: dict[int, _Positions] = {}
+        self._in_sync: dict[int, date | None] = {}   # account -> the fund target date it last matched
+
+    # ── precomputed inputs ──
+
+    def prepare(self) -> None:
+        # Trades run on weekdays, as in daily_actions; on an exchange holiday the positions keep their last close
+        in_run = (self.calendar.days >= np.datetime64(self.start, 'D')) & (self.calendar.days <= np.datetime64(self.end, 'D'))
+        self.days: List[date] = self.calendar.dates(in_run)
+        self.weekdays = self.calendar.weekdays[in_run]
+
+        self.fund_data = {a.id: fund.fetch_fund(a.strategy_fund_id) for a in self.accounts}
+        self.rebalance_mode = {account_id: getStrategyFromJson(f.strategy).allocation_rebalance for account_id, f in self.fund_data.items()}
+        self.benchmarks.ensure(s for f in self.fund_data.values() for s in (getStrategyFromJson(f.strategy).benchmarks or []))
+
+        # Fund targets by holding_date; a fund's target on a day is its latest set on or before it
+        self.targets: dict[int, dict[date, List[FundHolding]]] = {}
+        for fund_id in {a.strategy_fund_id for a in self.accounts}:
+            by_date: dict[date, List[FundHolding]] = {}
+            history = self.fund_targets.get(fund_id, []) if self.fund_targets is not None else fund_holding.fetch_holdings_history(fund_id, self.end)
+            for h in history:
+                by_date.setdefault(h.holding_date, []).append(h)
+            self.targets[fund_id] = by_date
+        self.target_dates = {fund_id: sorted(by_date) for fund_id, by_date in self.targets.items()}
+
+        # Dividends of everything an account can hold: what it holds now, the fund targets and the price store
+        if self.schedule is None:
+            self.schedule = Schedule(self.start, self.end)
+        held = {h.symbol for state in self.states.values() for h in state.snapshot}
+        targeted = {h.symbol for by_date in self.targets.values() for holdings in by_date.values() for h in holdings}
+        self.schedule.ensure(held | targeted | set(self.prices.symbols))
+
+    def target_date_on(self, fund_id: int, d: date) -> date | None:
+        dates = self.target_dates[fund_id]
+        i = bisect_right(dates, d)
+        return dates[i - 1] if i else None
+
+    def target_on(self, fund_id: int, d: date) -> List[FundHolding]:
+        target_date = self.target_date_on(fund_id, d)
+        return self.targets[fund_id][target_date] if target_date else []
+
+    # ── run ──
+
+    def run(self, flush_every_days: int = 0, persist: bool = True, on_day: Callable[[date], None] | None = None) -> int:
+        """Simulate every day in the range, calling on_day after each. Returns the number of account rows written (none without persist)."""
+        self.prepare()
+        written = 0
+        for n, d in enumerate(self.days, start=1):
+            if self.progress:
+                print(f"Generating account activity on: {d.strftime('%A, %d-%m-%Y')}")
+            self.step(d, bool(self.weekdays[n - 1]))
+            if persist and flush_every_days and n % flush_every_days == 0:
+                written += sum(state.flush() for state in self.states.values())
+            if on_day is not None:
+                on_day(d)
+        if persist:
+            written += sum(state.flush() for state in self.states.values())
+        return written
+
+    def step(self, d: date, is_weekday: bool) -> None:
+        # Dividends, on ex-dates only
+        amounts = self.schedule.dividends_on(d)
+        if amounts:
+            for a in self.accounts:
+                held = self.states[a.id].current_snapshot(d)
+                divs = [{'symbol': h.symbol, 'quantity': h.quantity, 'amount_per_share': amounts[h.symbol]} for h in held if h.symbol in amounts]
+                account_update.record_dividends(a.id, d, divs, self.states[a.id])
+
+        if is_weekday:
+            quiet = []
+            for a in self.accounts:
+                if self._trade_day(a, d):
+                    self._trade(a, d)
+                else:
+                    quiet.append(a)
+            self._reprice(quiet, d)
+
+        # Interest on end of day cash
+        rate_cfg = self.schedule.rate_on(d)
+        for a in self.accounts:
+            state = self.states[a.id]
+            balance = state.cash_balance(d + timedelta(days=1))
+            if balance > 0:
+                account_update.record_interest(a.id, d, balance, rate_cfg, state)
+
+    def _trade_day(self, a: account.Account, d: date) -> bool:
+        """Whether the account has trade candidates today. Once in sync with its fund, it stays so until the fund's next target."""
+        target_date = self.target_date_on(a.strategy_fund_id, d)
+        if target_date is not None and self._in_sync.get(a.id) == target_date:
+            return False
+        held = self.states[a.id].current_snapshot(d)
+        candidates = account_update.identify_position_change_needs(a.id, self.target_on(a.strategy_fund_id, d), held)
+        self._in_sync[a.id] = None if candidates else target_date
+        return bool(candidates)
+
+    def _trade(self, a: account.Account, d: date) -> None:
+        """daily_actions' weekday path, on the in-memory books."""
+        state = self.states[a.id]
+        account_holdings = account_update.get_account_holdings(a.id, d, prices=self.prices, state=state)
+        target_fund_holdings = self.target_on(a.strategy_fund_id, d)
+        symbol_weights = {h.symbol: h.weight for h in target_fund_holdings if h.weight is not None}
+        rebalance_mode = self.rebalance_mode[a.id]
+        is_fund_update_day = (
+            rebalance_mode == 'full'
+            and bool(target_fund_holdings)
+            and target_fund_holdings[0].holding_date == d
+        )
+        candidates = account_update.identify_position_change_needs(a.id, target_fund_holdings, account_holdings)
+        today_trades = account_update.execute_minimal_rebalance(
+            account_id=a.id,
+            candidates=candidates,
+            eval_date=d,
+            account_holdings=account_holdings,
+            symbol_weights=symbol_weights,
+            rebalance_mode=rebalance_mode,
+            is_fund_update_day=is_fund_update_day,
+            prices=self.prices,
+            state=state,
+        )
+        daily_return, snapshots = account_update.create_daily_snapshot(a.id, d, account_holdings, today_trades, prices=self.prices, state=state)
+        account_update.benchmark_comparison(a.id, a.strategy_fund_id, d, daily_return, snapshots, fund_data=self.fund_data[a.id], state=state, benchmarks=self.benchmarks)
+
+    # ── re-pricing the accounts that do not trade today ──
+
+    def _positions_of(self, state: AccountState, d: date) -> _Positions:
+        positions = self._positions.get(state.account_id)
+        if positions is None or positions.snapshot_date != state.snapshot_date:
+            holdings = state.current_snapshot(d)
+            self.prices.ensure(h.symbol for h in holdings)
+            positions = _Positions(
+                snapshot_date=state.snapshot_date,
+                holdings=holdings,
+                rows=np.array([self.prices.index_of(h.symbol) for h in holdings], dtype=np.int64),
+                qty=np.array([float(h.quantity) for h in holdings], dtype=np.float64),
+                cost=np.array([float(h.cost_basis) for h in holdings], dtype=np.float64),
+                mkt_val=np.array([float(h.market_value) for h in holdings], dtype=np.float64),
+            )
+            self._positions[state.account_id] = positions
+        return positions
+
+    def _reprice(self, accounts: List[account.Account], d: date) -> None:
+        """create_daily_snapshot without trades: latest price per position, else the previous implied price (market_value / quantity)."""
+        if not accounts:
+            return
+        positions = [self._positions_of(self.states[a.id], d) for a in accounts]
+        counts = np.array([len(p.rows) for p in positions])
+        rows = np.concatenate([p.rows for p in positions])
+        qty = np.concatenate([p.qty for p in positions])
+        mkt_val_prev = np.concatenate([p.mkt_val for p in positions])
+
+        price = self.prices.as_of_prices(rows, d)
+        priced = ~np.isnan(price) & (price != 0)
+        implied = np.divide(mkt_val_prev, qty, out=np.zeros_like(qty), where=qty > 0)
+        price = np.where(priced, price, implied)
+        mkt_val = qty * price
+
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        for a, p, first, n in zip(accounts, positions, starts, counts):
+            self._record_repriced(a, p, d, price[first:first + n], mkt_val[first:first + n])
+
+    def _record_repriced(self, a: account.Account, p: _Positions, d: date, price: np.ndarray, mkt_val: np.ndarray) -> None:
+        state = self.states[a.id]
+        held = p.qty > 1e-8
+        if not held.any():
+            account_update.benchmark_comparison(a.id, a.strategy_fund_id, d, Decimal(0.0), [], fund_data=self.fund_data[a.id], state=state, benchmarks=self.benchmarks)
+            return
+
+        eod_cash = float(state.cash_balance(d + timedelta(days=1)))
+        tpv = float(mkt_val[held].sum()) + eod_cash
+        weight = mkt_val / tpv if tpv > 0 else np.zeros_like(mkt_val)
+
+        symbols = [h.symbol for h, keep in zip(p.holdings, held) if keep]
+        snapshots = snapshot.holdings(a.id, d, symbols, p.qty[held], p.cost[held], mkt_val[held], weight[held])
+        state.record_holdings(snapshots)
+        perf = ap.calculate_daily_performance(a.id, d, Decimal(round(eod_cash, 2)), snapshots, state.total_value)
+        state.record_performance(perf)
+
+        # The positions now stand for today's snapshot
+        if held.all():
+            p.snapshot_date = state.snapshot_date
+            p.holdings = snapshots
+            p.mkt_val = np.array([float(s.market_value) for s in snapshots], dtype=np.float64)
+        account_update.benchmark_comparison(a.id, a.strategy_fund_id, d, perf.daily_return, snapshots, fund_data=self.fund_data[a.id], state=state, benchmarks=self.benchmarks)
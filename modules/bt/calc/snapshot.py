@@ -0,0 +1,90 @@
+import numpy as np
+from datetime import date
+from decimal import Decimal
+from typing import Callable, List
+from modules.bt.object import account_holding as ah, account_trade as at
+
+# The end-of-day holdings of one account as array operations: yesterday's positions plus today's trades,
+# pro-rata cost basis on sells, latest prices with the previous implied price as fallback, market values and
+# weights. Rows come out in symbol order, as the pandas outer merge this replaces produced them, and values are
+# rounded as Python floats (round() is correctly rounded, np.round is not), so both give the same holdings.
+
+MIN_QUANTITY = 1e-8  # positions at or below it are closed
+
+
+def build(
+    account_id: int,
+    eval_date: date,
+    previous_holdings: List[ah.AccountHolding],
+    today_trades: List[at.AccountTrade],
+    as_of_prices: Callable[[List[str]], np.ndarray],
+    eod_cash: float,
+) -> List[ah.AccountHolding]:
+    """as_of_prices(symbols) returns each symbol's price on its latest ticker_value row, NaN where there is none."""
+    symbols = sorted({h.symbol for h in previous_holdings} | {t.symbol for t in today_trades})
+    if not symbols:
+        return []
+    idx = {s: i for i, s in enumerate(symbols)}
+    n = len(symbols)
+
+    # Yesterday
+    qty = np.zeros(n)
+    cost = np.zeros(n)
+    prev_price = np.full(n, np.nan)
+    if previous_holdings:
+        p = np.fromiter((idx[h.symbol] for h in previous_holdings), dtype=np.int64, count=len(previous_holdings))
+        prev_qty = np.array([float(h.quantity) for h in previous_holdings])
+        prev_val = np.array([float(h.market_value) for h in previous_holdings])
+        qty[p] = prev_qty
+        cost[p] = [float(h.cost_basis) for h in previous_holdings]
+        prev_price[p] = np.divide(prev_val, prev_qty, out=np.zeros_like(prev_val), where=prev_qty > 0)
+
+    # Today's trades: BUY adds quantity and cost (amount + fee), SELL removes quantity and a pro-rata share of the cost
+    qty_delta = np.zeros(n)
+    cost_delta = np.zeros(n)
+    qty_sold = np.zeros(n)
+    if today_trades:
+        t = np.fromiter((idx[x.symbol] for x in today_trades), dtype=np.int64, count=len(today_trades))
+        is_buy = np.array([x.side == 'BUY' for x in today_trades])
+        trade_qty = np.array([float(x.quantity) for x in today_trades])
+        trade_cost = np.array([float(x.total_amount) + float(x.commission) for x in today_trades])
+        np.add.at(qty_delta, t, np.where(is_buy, trade_qty, -trade_qty))
+        np.add.at(cost_delta, t, np.where(is_buy, trade_cost, 0.0))
+        np.add.at(qty_sold, t, np.where(is_buy, 0.0, trade_qty))
+
+    new_qty = qty + qty_delta
+    selling = (qty > 0) & (qty_sold > 0)
+    sell_pct = np.minimum(1.0, np.divide(qty_sold, qty, out=np.zeros_like(qty), where=selling))
+    new_cost = cost * (1.0 - sell_pct) + cost_delta
+
+    held = new_qty > MIN_QUANTITY
+    if not held.any():
+        return []
+    held_symbols = [s for s, h in zip(symbols, held) if h]
+    new_qty, new_cost, prev_price = new_qty[held], new_cost[held], prev_price[held]
+
+    # Missing or zero prices fall back to yesterday's implied price, then to 0
+    price = as_of_prices(held_symbols)
+    price = np.where(np.isnan(price) | (price == 0), prev_price, price)
+    price = np.nan_to_num(price, nan=0.0)
+    mkt_val = new_qty * price
+
+    tpv = mkt_val.sum() + eod_cash
+    weight = mkt_val / tpv if tpv > 0 else np.zeros_like(mkt_val)
+    return holdings(account_id, eval_date, held_symbols, new_qty, new_cost, mkt_val, weight)
+
+
+def holdings(account_id: int, eval_date: date, symbols: List[str], qty: np.ndarray, cost: np.ndarray,
+             mkt_val: np.ndarray, weight: np.ndarray) -> List[ah.AccountHolding]:
+    """Snapshot rows from position arrays, rounded as stored (whole shares, cents, 6dp weights)."""
+    return [
+        ah.AccountHolding(
+            account_id=account_id,
+            holding_date=eval_date,
+            symbol=symbol,
+            quantity=Decimal(str(round(q, 0))),
+            cost_basis=Decimal(str(round(c, 2))),
+            market_value=Decimal(str(round(v, 2))),
+            weight_percentage=Decimal(str(round(w, 6)))
+        ) for symbol, q, c, v, w in zip(symbols, qty.tolist(), cost.tolist(), mkt_val.tolist(), weight.tolist())
+    ]
@@ -0,0 +1,51 @@
+import numpy as np
+from datetime import date, timedelta
+
+# The back-test calendar, precomputed as datetime64[D] arrays: every calendar day of the run, which of them are
+# weekdays (the days accounts trade on, as in daily_actions), and the calc-period anchors the best ideas and fund
+# targets are built on.
+
+CALC_PERIOD_WEEKLY    = "WEEKLY"     # every Wednesday
+CALC_PERIOD_MONTHLY   = "MONTHLY"    # 15th of every month
+CALC_PERIOD_BIMONTHLY = "BIMONTHLY"  # 15th of every odd month (Jan, Mar, May, Jul, Sep, Nov)
+CALC_PERIOD_QUARTERLY = "QUARTERLY"  # 15th of Jan / Apr / Jul / Oct
+
+
+class TradingCalendar:
+
+    def __init__(self, start: date, end: date) -> None:
+        self.start = start
+        self.end = end
+        self.days = np.arange(np.datetime64(start, 'D'), np.datetime64(end + timedelta(days=1), 'D'))
+        self.weekdays = np.is_busday(self.days)
+
+        months = self.days.astype('datetime64[M]')
+        self._day_of_month = (self.days - months).astype(np.int64) + 1
+        self._month = months.astype(np.int64) % 12 + 1
+        self._weekday = (self.days.astype(np.int64) + 3) % 7   # 1970-01-01 was a Thursday
+
+    def dates(self, mask: np.ndarray | None = None, first: date | None = None) -> list[date]:
+        """The days (optionally only those in mask) from first on, as dates."""
+        days = self.days if mask is None else self.days[mask]
+        if first is not None:
+            days = days[days >= np.datetime64(first, 'D')]
+        return days.astype(object).tolist()
+
+    def calc_mask(self, calc_period: str) -> np.ndarray:
+        """Which days of the calendar are calc dates of the period."""
+        if calc_period == CALC_PERIOD_WEEKLY:
+            return self._weekday == 2
+        if calc_period == CALC_PERIOD_QUARTERLY:
+            return (self._day_of_month == 15) & np.isin(self._month, (1, 4, 7, 10))
+        if calc_period == CALC_PERIOD_BIMONTHLY:
+            return (self._day_of_month == 15) & (self._month % 2 == 1)
+        return self._day_of_month == 15
+
+    def calc_dates(self, calc_period: str, first: date | None = None) -> list[date]:
+        return self.dates(self.calc_mask(calc_period), first)
+
+
+def weekday_count(start: date, end: date) -> int:
+    """Monday-Friday days in [start, end], inclusive, holidays counted."""
+    return int(np.busday_count(np.datetime64(start, 'D'), np.datetime64(end + timedelta(days=1), 'D')))
+
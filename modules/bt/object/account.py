@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
 from psycopg.errors import Error
 from psycopg.rows import class_row
@@ -37,14 +37,30 @@ def fetch_fund(account_id: int) -> Account | None:
     except Error as e:
         raise Exception(f"Error fetching the Account details from the DB: {e}")
 
-def reset_accounts() -> None:
+def reset_accounts(after: date | None = None, account_ids: list[int] | None = None) -> None:
+    """Delete the simulated account activity (deposits are kept). `after` keeps the rows up to that date,
+    `account_ids` limits the reset to those accounts - both for resuming from a checkpoint."""
+    tables = [
+        ("account_cash_ledger", "transaction_date"),
+        ("account_trade", "trade_date"),
+        ("account_holding_daily", "holding_date"),
+        ("account_performance_daily", "performance_date"),
+        ("account_benchmark_comparison", "performance_date"),
+    ]
     try:
         with db_pool_instance_bt.get_connection() as conn:
             with conn.cursor() as cur:
-                cur.execute("DELETE FROM account_cash_ledger WHERE entry_type != 'DEPOSIT'")
-                cur.execute("DELETE FROM account_trade")
-                cur.execute("DELETE FROM account_holding_daily")
-                cur.execute("DELETE FROM account_performance_daily")
-                cur.execute("DELETE FROM account_benchmark_comparison")
+                for table, date_column in tables:
+                    conditions, params = [], []
+                    if table == "account_cash_ledger":
+                        conditions.append("entry_type != 'DEPOSIT'")
+                    if after is not None:
+                        conditions.append(f"{date_column} > %s")
+                        params.append(after)
+                    if account_ids is not None:
+                        conditions.append("account_id = ANY(%s)")
+                        params.append(account_ids)
+                    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+                    cur.execute(f"DELETE FROM {table}{where}", params)
     except Error as e:
         raise Exception(f"Error reseting the Account data in the DB: {e}")
\ No newline at end of file
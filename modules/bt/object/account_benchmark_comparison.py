@@ -1,9 +1,10 @@
 from dataclasses import dataclass
 from datetime import date
 from decimal import Decimal
-from typing import Tuple
+from typing import Tuple, List
 from psycopg.errors import Error
 from modules.core.db import db_pool_instance_bt
+from modules.core import bulk
 
 @dataclass
 class AccountBenchmarkComparison:
@@ -45,3 +46,18 @@ def record_benchmark_comparison(entry: AccountBenchmarkComparison) -> None:
                     entry.strategy_indexed_value, entry.benchmark_indexed_value, entry.daily_alpha))
     except Error as e:
         raise Exception(f"Error recording the benchmark comparison: {e}")
+
+def upsert_bulk(entries: List[AccountBenchmarkComparison]) -> None:
+    if not entries:
+        return
+    try:
+        with db_pool_instance_bt.get_connection() as conn:
+            with conn.cursor() as cur:
+                bulk.upsert(cur, "account_benchmark_comparison",
+                    ["account_id", "benchmark_symbol", "performance_date", "strategy_indexed_value", "benchmark_indexed_value", "daily_alpha"],
+                    [(e.account_id, e.benchmark_symbol, e.performance_date, e.strategy_indexed_value, e.benchmark_indexed_value, e.daily_alpha) for e in entries],
+                    conflict=["account_id", "benchmark_symbol", "performance_date"],
+                    update=["strategy_indexed_value", "benchmark_indexed_value", "daily_alpha"])
+            conn.commit()
+    except Error as e:
+        raise Exception(f"Error recording the benchmark comparisons: {e}")
@@ -1,9 +1,11 @@
 from dataclasses import dataclass
 from datetime import date
 from decimal import Decimal
-from typing import Optional
+from typing import Optional, List
 from psycopg.errors import Error
+from psycopg.rows import class_row
 from modules.core.db import db_pool_instance_bt
+from modules.core import bulk
 
 @dataclass
 class AccountCashLedger:
@@ -38,3 +40,29 @@ def record_cash_transaction(entry: AccountCashLedger) -> None:
                 """, (entry.account_id, entry.transaction_date, entry.amount, entry.entry_type, entry.description))
     except Error as e:
         raise Exception(f"Error recording cash transaction: {e}")
+
+def fetch_entries(account_id: int) -> List[AccountCashLedger]:
+    try:
+        with db_pool_instance_bt.get_connection() as conn:
+            with conn.cursor(row_factory=class_row(AccountCashLedger)) as cur:
+                cur.execute("""
+                    SELECT id, account_id, transaction_date, amount, entry_type, description
+                    FROM account_cash_ledger
+                    WHERE account_id = %s
+                    ORDER BY transaction_date, id
+                """, (account_id,))
+                return cur.fetchall()
+    except Error as e:
+        raise Exception(f"Error fetching the cash ledger of the account: {e}")
+
+def insert_bulk(entries: List[AccountCashLedger]) -> None:
+    if not entries:
+        return
+    try:
+        with db_pool_instance_bt.get_connection() as conn:
+            with conn.cursor() as cur:
+                bulk.insert(cur, "account_cash_ledger", ["account_id", "transaction_date", "amount", "entry_type", "description"],
+                    [(e.account_id, e.transaction_date, e.amount, e.entry_type, e.description) for e in entries])
+            conn.commit()
+    except Error as e:
+        raise Exception(f"Error recording cash transactions: {e}")
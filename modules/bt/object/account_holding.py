@@ -7,6 +7,7 @@ from typing import Optional
 from psycopg.rows import class_row
 from dataclasses import dataclass
 from modules.core.db import db_pool_instance_bt
+from modules.core import bulk
 
 @dataclass
 class AccountHolding:
@@ -19,6 +20,14 @@ class AccountHolding:
     weight_percentage: Decimal = Decimal(0)
     id: Optional[int] = None
 
+@dataclass
+class AsOfQuote:
+    symbol: str
+    sync_date: Optional[date]                 # held: latest date with both a price and a holding row; else the latest price date
+    stock_price: Optional[Decimal]            # on sync_date
+    last_nonzero_price: Optional[Decimal]     # latest positive price on or before the as-of date
+    quantity: Optional[Decimal]               # held on sync_date
+
 def fetch_current_account_snapshot(account_id: int, eval_date: date) -> List[AccountHolding]:
     try:
         with db_pool_instance_bt.get_connection() as conn:
@@ -89,6 +98,50 @@ def fetch_latest_common_date_for_ticker(account_id: int, symbol: str, as_of_date
         print(f"Error fetching common date for {symbol}: {e}")
         return None
 
+def fetch_as_of_quotes(account_id: int, symbols: List[str], held: List[str], as_of_date: date) -> List[AsOfQuote]:
+    """
+    The rebalance inputs for many symbols in one query: fetch_latest_common_date_for_ticker (held symbols) or
+    fetch_latest_price_date_for_ticker (others), then fetch_ticker_on_date, fetch_latest_nonzero_price and
+    fetch_account_holding_on_date at that date.
+    """
+    try:
+        with db_pool_instance_bt.get_connection() as conn:
+            with conn.cursor(row_factory=class_row(AsOfQuote)) as cur:
+                cur.execute("""
+                    WITH s AS (
+                        SELECT symbol, symbol = ANY(%(held)s::text[]) AS is_held
+                        FROM unnest(%(symbols)s::text[]) AS symbol
+                    ),
+                    sync AS (
+                        SELECT s.symbol, s.is_held,
+                            CASE WHEN s.is_held THEN (
+                                SELECT MAX(tv.value_date)
+                                FROM ticker_value tv
+                                JOIN account_holding_daily ah ON ah.symbol = tv.symbol AND ah.holding_date = tv.value_date
+                                WHERE tv.symbol = s.symbol AND ah.account_id = %(account_id)s AND tv.value_date <= %(as_of)s
+                            ) ELSE (
+                                SELECT MAX(tv.value_date)
+                                FROM ticker_value tv
+                                WHERE tv.symbol = s.symbol AND tv.value_date <= %(as_of)s
+                            ) END AS sync_date
+                        FROM s
+                    )
+                    SELECT sync.symbol,
+                           sync.sync_date::date AS sync_date,
+                           tv.stock_price,
+                           (SELECT nz.stock_price FROM ticker_value nz
+                            WHERE nz.symbol = sync.symbol AND nz.value_date <= %(as_of)s AND nz.stock_price > 0
+                            ORDER BY nz.value_date DESC LIMIT 1) AS last_nonzero_price,
+                           ah.quantity
+                    FROM sync
+                    LEFT JOIN ticker_value tv ON tv.symbol = sync.symbol AND tv.value_date = sync.sync_date
+                    LEFT JOIN account_holding_daily ah
+                        ON sync.is_held AND ah.account_id = %(account_id)s AND ah.symbol = sync.symbol AND ah.holding_date = sync.sync_date
+                """, {'account_id': account_id, 'symbols': symbols, 'held': held, 'as_of': as_of_date})
+                return cur.fetchall()
+    except Error as e:
+        raise Exception(f"Error fetching the as-of quotes of account {account_id}: {e}")
+
 def record_account_holdings(holdings: List[AccountHolding]) -> None:
     if not holdings:
         return
@@ -120,3 +173,19 @@ def record_account_holdings(holdings: List[AccountHolding]) -> None:
             conn.commit()
     except Exception as e:
         raise Exception(f"Error saving the latest account holdings snapshot into the DB: {e}")
+
+def upsert_bulk(holdings: List[AccountHolding]) -> None:
+    """record_account_holdings for many days at once (COPY + one upsert)."""
+    if not holdings:
+        return
+    try:
+        with db_pool_instance_bt.get_connection() as conn:
+            with conn.cursor() as cur:
+                bulk.upsert(cur, "account_holding_daily",
+                    ["account_id", "holding_date", "symbol", "quantity", "cost_basis", "market_value", "weight_percentage"],
+                    [(h.account_id, h.holding_date, h.symbol, h.quantity, h.cost_basis, h.market_value, h.weight_percentage) for h in holdings],
+                    conflict=["account_id", "holding_date", "symbol"],
+                    update=["quantity", "cost_basis", "market_value", "weight_percentage"])
+            conn.commit()
+    except Error as e:
+        raise Exception(f"Error saving the account holdings snapshots into the DB: {e}")
@@ -4,6 +4,7 @@ from decimal import Decimal
 from typing import Optional, List
 from psycopg.errors import Error
 from modules.core.db import db_pool_instance_bt
+from modules.core import bulk
 from modules.bt.object import account_holding
 from modules.bt.object import account_cash_ledger as acl
 
@@ -36,21 +37,28 @@ def fetch_latest_total_value(account_id: int, prev_date: date) -> Decimal:
         raise Exception(f"Error fetching previous TPV: {e}")
 
 
+def calculate_daily_performance(account_id: int, eval_date: date, cash_balance: Decimal, snapshots: List[account_holding.AccountHolding], tpv_yesterday: Decimal) -> AccountPerformance:
+    # Today's Totals
+    stock_value = sum((s.market_value for s in snapshots), Decimal('0'))
+    tpv_today = cash_balance + stock_value
+
+    # Daily Return = (Today / Yesterday) - 1
+    # Handle the first day of backtest where yesterday is 0
+    daily_ret = (tpv_today / tpv_yesterday) - 1 if tpv_yesterday > 0 else Decimal('0')
+
+    return AccountPerformance(account_id=account_id, performance_date=eval_date, total_value=tpv_today,
+                              cash_balance=cash_balance, stock_value=stock_value, daily_return=daily_ret)
+
+
 def record_daily_performance(account_id: int, eval_date: date, cash_balance: Decimal, snapshots: List[account_holding.AccountHolding]) -> Decimal:
     try:
-        # 1. Calculate Today's Totals
-        stock_value = sum(s.market_value for s in snapshots)
-        tpv_today = cash_balance + stock_value
-
-        # 2. Fetch Yesterday's TPV to calculate return
+        # Fetch Yesterday's TPV to calculate return
         yesterday = eval_date - timedelta(days=1)
         tpv_yesterday = fetch_latest_total_value(account_id, yesterday)
+        perf = calculate_daily_performance(account_id, eval_date, cash_balance, snapshots, tpv_yesterday)
+        tpv_today, stock_value, daily_ret = perf.total_value, perf.stock_value, perf.daily_return
 
-        # Daily Return = (Today / Yesterday) - 1
-        # Handle the first day of backtest where yesterday is 0
-        daily_ret = (tpv_today / tpv_yesterday) - 1 if tpv_yesterday > 0 else Decimal('0')
-
-        # 3. Save to DB
+        # Save to DB
         with db_pool_instance_bt.get_connection() as conn:
             with conn.cursor() as cur:
                 cur.execute("""
@@ -67,3 +75,19 @@ def record_daily_performance(account_id: int, eval_date: date, cash_balance: Dec
 
     except Error as e:
         raise Exception(f"Error recording daily performance for the account: {e}")
+
+
+def upsert_bulk(items: List[AccountPerformance]) -> None:
+    if not items:
+        return
+    try:
+        with db_pool_instance_bt.get_connection() as conn:
+            with conn.cursor() as cur:
+                bulk.upsert(cur, "account_performance_daily",
+                    ["account_id", "performance_date", "total_value", "cash_balance", "stock_value", "daily_return"],
+                    [(p.account_id, p.performance_date, p.total_value, p.cash_balance, p.stock_value, p.daily_return) for p in items],
+                    conflict=["account_id", "performance_date"],
+                    update=["total_value", "daily_return"])
+            conn.commit()
+    except Error as e:
+        raise Exception(f"Error recording daily performance for the account: {e}")
@@ -2,9 +2,10 @@
 from dataclasses import dataclass
 from decimal import Decimal
 from datetime import date
-from typing import Optional
+from typing import Optional, List
 from psycopg.errors import Error
 from modules.core.db import db_pool_instance_bt
+from modules.core import bulk
 
 @dataclass
 class AccountTrade:
@@ -29,4 +30,16 @@ def record_trade(trade: AccountTrade) -> None:
                     trade.quantity, trade.price, trade.commission, trade.total_amount))
 
     except Error as e:
-        raise Exception(f"Error insertinf account trades into the DB: {e}")
\ No newline at end of file
+        raise Exception(f"Error insertinf account trades into the DB: {e}")
+
+def insert_bulk(trades: List[AccountTrade]) -> None:
+    if not trades:
+        return
+    try:
+        with db_pool_instance_bt.get_connection() as conn:
+            with conn.cursor() as cur:
+                bulk.insert(cur, "account_trade", ["account_id", "symbol", "trade_date", "side", "quantity", "price", "commission", "total_amount"],
+                    [(t.account_id, t.symbol, t.trade_date, t.side, t.quantity, t.price, t.commission, t.total_amount) for t in trades])
+            conn.commit()
+    except Error as e:
+        raise Exception(f"Error insertinf account trades into the DB: {e}")
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from datetime import date
 from decimal import Decimal
-from typing import Optional
+from typing import Optional, List
 from psycopg.rows import class_row
 from modules.core.db import db_pool_instance_bt
 
@@ -47,4 +47,19 @@ def fetch_latest_benchmark_price_before(symbol: str, eval_date: date) -> Optiona
                 cur.execute(query, (symbol, eval_date))
                 return cur.fetchone()
     except Exception as e:
-        raise Exception(f"Error retrieving latest BenchmarkValue for {symbol} before {eval_date}: {e}")
\ No newline at end of file
+        raise Exception(f"Error retrieving latest BenchmarkValue for {symbol} before {eval_date}: {e}")
+
+def fetch_series(symbols: List[str], end_date: date) -> List[BenchmarkValue]:
+    """Every price of the benchmarks up to end_date, by symbol and date."""
+    try:
+        with db_pool_instance_bt.get_connection() as conn:
+            with conn.cursor(row_factory=class_row(BenchmarkValue)) as cur:
+                cur.execute("""
+                    SELECT symbol, value_date, price
+                    FROM benchmark_value
+                    WHERE symbol = ANY(%s) AND value_date <= %s
+                    ORDER BY symbol, value_date;
+                """, (symbols, end_date))
+                return cur.fetchall()
+    except Exception as e:
+        raise Exception(f"Error retrieving the BenchmarkValue series of {', '.join(symbols)}: {e}")
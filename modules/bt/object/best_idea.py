@@ -5,6 +5,7 @@ from psycopg.rows import class_row
 import pandas as pd
 from dataclasses import dataclass
 from modules.core.db import db_pool_instance_bt
+from modules.core import bulk
 
 @dataclass
 class BestIdea:
@@ -30,28 +31,17 @@ def insert_bulk(rows: list[tuple]) -> None:
     if not rows:
         return
 
-    query = """
-        INSERT INTO best_idea
-            (provider_etf_id, symbol, value_date, etf_weight, benchmark_weight, delta, ranking)
-        VALUES (%s, %s, %s, %s, %s, %s, %s)
-        ON CONFLICT (provider_etf_id, symbol, value_date)
-        DO UPDATE
-        SET
-            etf_weight = EXCLUDED.etf_weight,
-            benchmark_weight = EXCLUDED.benchmark_weight,
-            delta = EXCLUDED.delta,
-            ranking = EXCLUDED.ranking
-        WHERE
-            best_idea.etf_weight IS DISTINCT FROM EXCLUDED.etf_weight
-            OR best_idea.benchmark_weight IS DISTINCT FROM EXCLUDED.benchmark_weight
-            OR best_idea.delta IS DISTINCT FROM EXCLUDED.delta
-            OR best_idea.ranking IS DISTINCT FROM EXCLUDED.ranking;
-    """
-
     try:
         with db_pool_instance_bt.get_connection() as conn:
             with conn.cursor() as cur:
-                cur.executemany(query, rows)
+                bulk.upsert(
+                    cur, "best_idea",
+                    ["provider_etf_id", "symbol", "value_date", "etf_weight", "benchmark_weight", "delta", "ranking"],
+                    rows,
+                    conflict=["provider_etf_id", "symbol", "value_date"],
+                    update=["etf_weight", "benchmark_weight", "delta", "ranking"],
+                    only_changed=True,
+                )
     except Error as e:
         raise Exception(f"Error inserting Best Ideas in bulk: {e}")
 
@@ -137,11 +127,15 @@ def fetch_all_as_df(as_of_date: date) -> pd.DataFrame:
     except Error as e:
         raise Exception(f"Error fetching all best ideas as DataFrame: {e}")
 
-def reset() -> None:
+def reset(after: date | None = None) -> None:
+    """Delete the best ideas - all of them, or only those dated after `after` when resuming from a checkpoint."""
     try:
         with db_pool_instance_bt.get_connection() as conn:
             with conn.cursor() as cur:
-                cur.execute("DELETE FROM best_idea")          
+                if after is None:
+                    cur.execute("DELETE FROM best_idea")
+                else:
+                    cur.execute("DELETE FROM best_idea WHERE value_date > %s", (after,))
     except Error as e:
         raise Exception(f"Error reseting the Account data in the DB: {e}")
     
@@ -0,0 +1,68 @@
+import hashlib
+from bisect import bisect_right
+from datetime import date
+from decimal import Decimal
+from psycopg.errors import Error
+from modules.core.db import db_pool_instance_bt
+
+# Tables a back-test reads, with the date column that places a row in the simulation.
+# fund_holding is produced by the run itself, but the account stage consumes it, so it is fingerprinted too.
+# Values are summed as numeric so the fingerprint does not depend on floating-point summation order.
+INPUT_TABLES = [
+    ("ticker_value", "value_date", "stock_price"),
+    ("ticker_dividend_history", "ex_date", "amount_per_share"),
+    ("benchmark_value", "value_date", "price"),
+    ("best_idea", "value_date", "delta"),
+    ("fund_holding", "holding_date", "weight"),
+    ("interest_rate_config", "effective_date", "annual_rate"),
+]
+
+
+class DataVersions:
+    """Fingerprints (row count, date range and value sum per table) of the input rows dated on or before any day up to
+    `up_to`, from one grouped scan per table. Rows added or changed later in time leave a day's fingerprint unchanged,
+    so a checkpoint stays valid for its period."""
+
+    def __init__(self, up_to: date) -> None:
+        self.up_to = up_to
+        # table -> (dates, running row count, running value sum), one entry per date that has rows
+        self._tables: dict[str, tuple[list[date], list[int], list[Decimal | None]]] = {}
+        try:
+            with db_pool_instance_bt.get_connection() as conn:
+                with conn.cursor() as cur:
+                    for table, date_column, value_column in INPUT_TABLES:
+                        cur.execute(f"""
+                            SELECT {date_column}, COUNT(*), SUM({value_column}::numeric)
+                            FROM {table}
+                            WHERE {date_column} <= %s
+                            GROUP BY {date_column}
+                            ORDER BY {date_column}
+                        """, (up_to,))
+                        dates, counts, sums = [], [], []
+                        count, total = 0, None
+                        for d, n, s in cur.fetchall():
+                            count += n
+                            if s is not None:
+                                total = s if total is None else total + s
+                            dates.append(d)
+                            counts.append(count)
+                            sums.append(total)
+                        self._tables[table] = (dates, counts, sums)
+                    cur.execute("SELECT COUNT(*), SUM(amount) FROM account_cash_ledger WHERE entry_type = 'DEPOSIT'")
+                    self._deposits = cur.fetchone()
+        except Error as e:
+            raise Exception(f"Error fingerprinting the back-test input data: {e}")
+
+    def at(self, d: date) -> str:
+        """The fingerprint of the input rows dated on or before d (d <= up_to)."""
+        if d > self.up_to:
+            raise Exception(f"Data versions were loaded up to {self.up_to}, not {d}.")
+        parts = []
+        for table, _, _ in INPUT_TABLES:
+            dates, counts, sums = self._tables[table]
+            i = bisect_right(dates, d) - 1
+            # The same values a COUNT / MIN / MAX / SUM over the rows up to d returns
+            row = (counts[i], dates[0], dates[i], sums[i]) if i >= 0 else (0, None, None, None)
+            parts.append(f"{table}:{row}")
+        parts.append(f"deposits:{self._deposits}")
+        return hashlib.sha256("|".join(parts).encode()).hexdigest()[:16]
@@ -1,4 +1,12 @@
-from modules.core.db import db_pool_instance_bt
+from modules.core.db import db_pool_instance, db_pool_instance_bt
+from modules.core.api_stocks import api_client_instance, api_rate_limiter
+from modules.core.response_cache import response_cache
+from modules.object.log import log_writer
 
 def cleanup() -> None:
+    api_client_instance.close()
+    api_rate_limiter.close()
+    response_cache.close()
+    log_writer.close()
     db_pool_instance_bt.close_all_connections()
+    db_pool_instance.close_all_connections()
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 from psycopg.errors import Error
 from psycopg.rows import class_row
 from dataclasses import dataclass
@@ -37,11 +37,16 @@ def fetch_fund(fund_id: int) -> Fund | None:
     except Error as e:
         raise Exception(f"Error fetching the Fund from the DB: {e}")
 
-def reset_funds() -> None:
+def reset_funds(after: date | None = None) -> None:
+    """Delete the fund targets - all of them, or only those dated after `after` when resuming from a checkpoint."""
     try:
         with db_pool_instance_bt.get_connection() as conn:
             with conn.cursor() as cur:
-                cur.execute("DELETE FROM fund_holding_change")
-                cur.execute("DELETE FROM fund_holding")
+                if after is None:
+                    cur.execute("DELETE FROM fund_holding_change")
+                    cur.execute("DELETE FROM fund_holding")
+                else:
+                    cur.execute("DELETE FROM fund_holding_change WHERE change_date > %s", (after,))
+                    cur.execute("DELETE FROM fund_holding WHERE holding_date > %s", (after,))
     except Error as e:
         raise Exception(f"Error reseting the Fund holdings in the DB: {e}")
\ No newline at end of file
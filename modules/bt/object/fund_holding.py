@@ -63,4 +63,31 @@ def insert_fund_holding(items: List[FundHolding]) -> None:
             conn.commit()
 
     except Error as e:
-        raise Exception(f"Error replacing fund holdings in DB: {e}")
\ No newline at end of file
+        raise Exception(f"Error replacing fund holdings in DB: {e}")
+
+def fetch_symbols_between(start: date, end: date) -> List[str]:
+    """Every symbol any fund targets in [start, end] - the universe a back-test can trade."""
+    try:
+        with db_pool_instance_bt.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT DISTINCT symbol FROM fund_holding
+                    WHERE holding_date >= %s AND holding_date <= %s;
+                """, (start, end))
+                return [row[0] for row in cur.fetchall()]
+    except Error as e:
+        raise Exception(f"Error fetching the fund holding symbols from the DB: {e}")
+
+def fetch_holdings_history(fund_id: int, end: date) -> List[FundHolding]:
+    """Every target the fund had up to `end`, in holding_date order."""
+    try:
+        with db_pool_instance_bt.get_connection() as conn:
+            with conn.cursor(row_factory=class_row(FundHolding)) as cur:
+                cur.execute("""
+                    SELECT * FROM fund_holding
+                    WHERE fund_id = %s AND holding_date <= %s
+                    ORDER BY holding_date;
+                """, (fund_id, end))
+                return cur.fetchall()
+    except Error as e:
+        raise Exception(f"Error fetching the Fund Holdings history from the DB: {e}")
@@ -24,3 +24,12 @@ def get_latest_interest_rate(eval_date: date) -> Optional[InterestRateConfig]:
                 return cur.fetchone()
     except Error as e:
         raise Exception(f"Error getting latest interest rate: {e}")
+
+def fetch_all() -> list[InterestRateConfig]:
+    try:
+        with db_pool_instance_bt.get_connection() as conn:
+            with conn.cursor(row_factory=class_row(InterestRateConfig)) as cur:
+                cur.execute("SELECT * FROM interest_rate_config ORDER BY effective_date")
+                return cur.fetchall()
+    except Error as e:
+        raise Exception(f"Error getting the interest rates: {e}")
@@ -36,6 +36,33 @@ def fetch_alpha_annual() -> list[AlphaAnnual]:
         raise Exception(f"Error fetching annual alpha from DB: {e}")
 
 
+def alpha_annual(comparisons: list) -> list[AlphaAnnual]:
+    """perf_get_alpha_annual over AccountBenchmarkComparison rows held in memory."""
+    first: dict[tuple, tuple] = {}
+    last: dict[tuple, tuple] = {}
+    for c in comparisons:
+        key = (c.account_id, c.benchmark_symbol, c.performance_date.year)
+        if key not in first or c.performance_date < first[key][0]:
+            first[key] = (c.performance_date, c.strategy_indexed_value, c.benchmark_indexed_value)
+        if key not in last or c.performance_date > last[key][0]:
+            last[key] = (c.performance_date, c.strategy_indexed_value, c.benchmark_indexed_value)
+
+    rows = []
+    for key in sorted(first, key=lambda k: (k[2], k[0], k[1])):
+        _, strat_start, bench_start = first[key]
+        _, strat_end, bench_end = last[key]
+        if not strat_start or not bench_start:
+            continue
+        strategy_return = strat_end / strat_start - 1
+        benchmark_return = bench_end / bench_start - 1
+        rows.append(AlphaAnnual(
+            account_id=key[0], benchmark_symbol=key[1], performance_year=float(key[2]),
+            annual_strategy_return=strategy_return, annual_benchmark_return=benchmark_return,
+            annual_alpha=strategy_return - benchmark_return,
+        ))
+    return rows
+
+
 def export_daily_returns_csv(account_id: int, file_name: str) -> None:
     try:
         with db_pool_instance_bt.get_connection() as conn:
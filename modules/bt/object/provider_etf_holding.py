@@ -4,6 +4,7 @@ from psycopg.errors import Error
 from psycopg.rows import class_row
 from dataclasses import dataclass
 from modules.core.db import db_pool_instance_bt
+from modules.core import bulk
 import pandas as pd
 
 @dataclass
@@ -90,38 +91,15 @@ def insert_holding_bulk(items: List[ProviderEtfHolding]) -> None:
     if not items:
         return
     
-    fund_id = items[0].provider_etf_id
-    holding_date = items[0].holding_date
-
     try:
         with db_pool_instance_bt.get_connection() as conn:
             with conn.cursor() as cur:
-
-                delete_sql = """
-                    DELETE FROM provider_etf_holding
-                    WHERE provider_etf_id = %s
-                      AND holding_date = %s;
-                """
-                cur.execute(delete_sql, (fund_id, holding_date))
-
-                insert_sql = """
-                    INSERT INTO provider_etf_holding (
-                        provider_etf_id,
-                        holding_date,
-                        ticker,
-                        shares,
-                        market_value,
-                        weight
-                    )
-                    VALUES (%s, %s, %s, %s, %s, %s);
-                """
-
-                insert_values = [
-                    (i.provider_etf_id, i.holding_date, i.ticker, i.shares, i.market_value, i.weight)
-                    for i in items
-                ]
-
-                cur.executemany(insert_sql, insert_values)
+                bulk.replace(
+                    cur, "provider_etf_holding",
+                    ["provider_etf_id", "holding_date", "ticker", "shares", "market_value", "weight"],
+                    [(i.provider_etf_id, i.holding_date, i.ticker, i.shares, i.market_value, i.weight) for i in items],
+                    key=["provider_etf_id", "holding_date"],
+                )
 
             conn.commit()
 
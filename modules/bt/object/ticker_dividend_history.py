@@ -3,7 +3,7 @@ from datetime import date
 from decimal import Decimal
 from typing import Optional, List
 from psycopg.errors import Error
-from psycopg.rows import dict_row
+from psycopg.rows import dict_row, class_row
 from modules.core.db import db_pool_instance_bt
 
 @dataclass
@@ -34,6 +34,20 @@ def fetch_dividends_for_holdings(account_id: int, eval_date: date) -> list[dict]
                 return cur.fetchall()
     except Error as e:
             raise Exception(f"Error getting dividends of holdings: {e}")
+
+def fetch_dividends_on_date(symbols: List[str], ex_date: date) -> dict[str, Decimal]:
+    """symbol -> amount_per_share for the symbols going ex-dividend on that date."""
+    try:
+        with db_pool_instance_bt.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT symbol, amount_per_share
+                    FROM ticker_dividend_history
+                    WHERE symbol = ANY(%s) AND ex_date = %s
+                """, (symbols, ex_date))
+                return {row[0]: row[1] for row in cur.fetchall()}
+    except Error as e:
+        raise Exception(f"Error getting dividends of holdings: {e}")
     
 def insert_dividends_bulk(items: List[TickerDividendHistory]) -> None:
     if not items:
@@ -80,4 +94,18 @@ def insert_dividends_bulk(items: List[TickerDividendHistory]) -> None:
 
     except Error as e:
         raise Exception(f"Error replacing dividend for ticker symbol: {e}")
-    
\ No newline at end of file
+    
+
+def fetch_dividends_between(symbols: List[str], start: date, end: date) -> List[TickerDividendHistory]:
+    try:
+        with db_pool_instance_bt.get_connection() as conn:
+            with conn.cursor(row_factory=class_row(TickerDividendHistory)) as cur:
+                cur.execute("""
+                    SELECT symbol, ex_date, amount_per_share
+                    FROM ticker_dividend_history
+                    WHERE symbol = ANY(%s) AND ex_date >= %s AND ex_date <= %s
+                    ORDER BY ex_date, symbol
+                """, (symbols, start, end))
+                return cur.fetchall()
+    except Error as e:
+        raise Exception(f"Error getting the dividend history: {e}")
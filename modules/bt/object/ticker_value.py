@@ -5,6 +5,7 @@ from psycopg.rows import class_row, dict_row
 import pandas as pd
 from dataclasses import dataclass, asdict
 from modules.core.db import db_pool_instance_bt
+from modules.core import bulk
 
 @dataclass
 class TickerValue:
@@ -136,6 +137,22 @@ def fetch_tickers_by_symbols_on_date(symbols: List[str], value_date: date) -> Li
     except Error as e:
         raise Exception(f"Error retrieving latest TickerValue data: {e}")
     
+def fetch_latest_prices(symbols: List[str], as_of_date: date) -> dict[str, float | None]:
+    """stock_price on each symbol's latest row on or before as_of_date (NULL included); symbols without a row are left out."""
+    try:
+        with db_pool_instance_bt.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT DISTINCT ON (symbol) symbol, stock_price
+                    FROM ticker_value
+                    WHERE symbol = ANY(%s)
+                      AND value_date <= %s
+                    ORDER BY symbol, value_date DESC;
+                """, (symbols, as_of_date))
+                return {symbol: None if price is None else float(price) for symbol, price in cur.fetchall()}
+    except Error as e:
+        raise Exception(f"Error retrieving the latest prices: {e}")
+
 def fetch_latest_market_caps_within_window(symbols: List[str], as_of_date: date, days: int) -> List[TickerValue]:
     try:
         with db_pool_instance_bt.get_connection() as conn:
@@ -182,29 +199,31 @@ def upsert_bulk(items: List[TickerValue]) -> None:
     try:
         with db_pool_instance_bt.get_connection() as conn:
             with conn.cursor() as cur:
-
-                insert_sql = """
-                    INSERT INTO ticker_value (
-                        symbol,
-                        value_date,
-                        stock_price,
-                        market_cap
-                    )
-                    VALUES (%s, %s, %s, %s)
-                    ON CONFLICT (symbol, value_date)
-                    DO UPDATE SET
-                        stock_price = EXCLUDED.stock_price,
-                        market_cap = EXCLUDED.market_cap;
-                """
-
-                insert_values = [
-                    (i.symbol, i.value_date, i.stock_price, i.market_cap)
-                    for i in items
-                ]
-
-                cur.executemany(insert_sql, insert_values)
+                bulk.upsert(
+                    cur, "ticker_value",
+                    ["symbol", "value_date", "stock_price", "market_cap"],
+                    [(i.symbol, i.value_date, i.stock_price, i.market_cap) for i in items],
+                    conflict=["symbol", "value_date"],
+                    update=["stock_price", "market_cap"],
+                )
 
             conn.commit()
 
     except Error as e:
-        raise Exception(f"Error inserting ticker values in DB: {e}")
\ No newline at end of file
+        raise Exception(f"Error inserting ticker values in DB: {e}")
+
+def fetch_price_rows(symbols: List[str], start: date, end: date) -> list[tuple[str, date, float | None, float | None]]:
+    """All (symbol, value_date, stock_price, market_cap) rows for the symbols in [start, end], for the in-memory price store."""
+    try:
+        with db_pool_instance_bt.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT symbol, value_date, stock_price, market_cap
+                    FROM ticker_value
+                    WHERE symbol = ANY(%s)
+                      AND value_date >= %s
+                      AND value_date <= %s;
+                """, (symbols, start, end))
+                return cur.fetchall()
+    except Error as e:
+        raise Exception(f"Error fetching ticker value rows for the price store: {e}")
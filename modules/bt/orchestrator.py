@@ -1,32 +1,27 @@
 from datetime import date, timedelta
 import log
-from modules.bt.object import fund, best_idea, ticker, provider_etf_holding, categorize_ticker
-from modules.bt.object import account, performance
+from modules.bt.object import fund, fund_holding, best_idea, ticker, provider_etf_holding, categorize_ticker
+from modules.bt.object import account, performance, data_version
 from modules.bt.actions import stocks_categorize as bt_categorize_tickers, stocks_download, best_ideas_generator, funds_update, account_update
 from modules.bt.calc.model_fund import getStrategyFromJson
-from modules.bt.calc import classification
-
-CALC_PERIOD_WEEKLY    = "WEEKLY"     # every Wednesday
-CALC_PERIOD_MONTHLY   = "MONTHLY"    # 15th of every month
-CALC_PERIOD_BIMONTHLY = "BIMONTHLY"  # 15th of every odd month (Jan, Mar, May, Jul, Sep, Nov)
-CALC_PERIOD_QUARTERLY = "QUARTERLY"  # 15th of Jan / Apr / Jul / Oct
+from modules.bt.calc import classification, model_fund, checkpoint
+from modules.bt.calc.price_store import PriceStore
+from modules.bt.calc.account_state import AccountState
+from modules.bt.calc.simulator import Simulator
+from modules.bt.calc.benchmark_series import BenchmarkSeries
+from modules.bt.calc.schedule import Schedule
+from modules.bt.calc.trading_calendar import TradingCalendar, CALC_PERIOD_WEEKLY, CALC_PERIOD_MONTHLY, CALC_PERIOD_BIMONTHLY, CALC_PERIOD_QUARTERLY
 
 # --- Configuration ---
 START_DATE  = date(2022, 1, 1)
 END_DATE    = date(2025, 12, 31)
 CALC_PERIOD = CALC_PERIOD_MONTHLY  # CALC_PERIOD_WEEKLY | CALC_PERIOD_MONTHLY | CALC_PERIOD_BIMONTHLY | CALC_PERIOD_QUARTERLY
+FLUSH_EVERY_DAYS = 0  # write the simulated account books to the DB every N days; 0 = once, at the end of the run
+USE_SIMULATOR = True  # False runs account_update.daily_actions day by day (the reference engine, see simulator.py for the tolerance)
+CHECKPOINTS = True    # save the engine state on every calc date and resume from the latest valid one (simulator only)
+INTEGER_CENTS = True  # rebalance in int cents instead of Decimal (same trades; scripts/_reconcile_integer_cents.py checks it)
 # ---------------------
 
-def _is_calc_date(d: date, calc_period: str) -> bool:
-    if calc_period == CALC_PERIOD_WEEKLY:
-        return d.weekday() == 2  # Wednesday
-    if calc_period == CALC_PERIOD_QUARTERLY:
-        return d.day == 15 and d.month in (1, 4, 7, 10)
-    if calc_period == CALC_PERIOD_BIMONTHLY:
-        return d.day == 15 and d.month % 2 == 1
-    return d.day == 15  # MONTHLY (default)
-
-
 def distinct_provider_etfs(accounts) -> list[int]:
     distinct_etfs = set()
     for current_account in accounts:
@@ -41,6 +36,19 @@ def distinct_provider_etfs(accounts) -> list[int]:
 
     return list(distinct_etfs)
 
+def _run_config(do_best_ideas: bool, do_target_fund: bool) -> dict:
+    """Everything besides the input data and END_DATE that shapes the results, for the checkpoint key."""
+    return {
+        'start': START_DATE,
+        'calc_period': CALC_PERIOD,
+        'stages': [do_best_ideas, do_target_fund],
+        'drift_threshold': account_update.DRIFT_THRESHOLD,
+        'mc_weight': [model_fund.MC_WEIGHT_ALPHA, model_fund.MC_WEIGHT_CAP, model_fund.MC_WEIGHT_FLOOR],
+        'funds': sorted((f.id, f.strategy) for f in fund.fetch_all()),
+        'integer_cents': INTEGER_CENTS,
+        'simulator': USE_SIMULATOR,
+    }
+
 def run():
     accounts = account.fetch_all()
     etf_ids = distinct_provider_etfs(accounts)
@@ -50,6 +58,17 @@ def run():
     do_target_fund = True
     do_accounts = True
 
+    # Resume after the latest checkpoint that still matches the configuration and the input data
+    run_key = checkpoint.config_key(_run_config(do_best_ideas, do_target_fund))
+    account_keys = {a.id: checkpoint.account_key(a.strategy_fund_id) for a in accounts if a.id is not None}
+    resume = checkpoint.latest(run_key, END_DATE) if CHECKPOINTS and USE_SIMULATOR and do_accounts else None
+    resume_after = resume.as_of if resume else None
+    first_day = resume.as_of + timedelta(days=1) if resume else START_DATE
+    calendar = TradingCalendar(START_DATE, END_DATE)
+    calc_dates = calendar.calc_dates(CALC_PERIOD, first_day)
+    if resume:
+        log.record_status(f"Resuming the back test after the checkpoint of {resume.as_of}.")
+
     # Stock data gathering
     if do_data_download:
         ticker.sanitize()
@@ -68,36 +87,70 @@ def run():
 
     # Identify the lateset best ideas per ETF.
     if do_best_ideas:
-        best_idea.reset()
+        best_idea.reset(after=resume_after)
 
-        current_sim_date = START_DATE
-        while current_sim_date <= END_DATE:
-            if _is_calc_date(current_sim_date, CALC_PERIOD):
-                print(f"Identifying best ideas per ETF on: {current_sim_date.strftime("%A, %d-%m-%Y")}")
-                best_ideas_generator.run(etf_ids, current_sim_date)
-            current_sim_date += timedelta(days=1)
+        for calc_date in calc_dates:
+            print(f"Identifying best ideas per ETF on: {calc_date.strftime("%A, %d-%m-%Y")}")
+            best_ideas_generator.run(etf_ids, calc_date)
 
     # Construct todays target fund holdings.
     if do_target_fund:
-        fund.reset_funds()
+        fund.reset_funds(after=resume_after)
 
-        current_sim_date = START_DATE
-        while current_sim_date <= END_DATE:
-            if _is_calc_date(current_sim_date, CALC_PERIOD):
-                print(f"Constructing target funds holdings on: {current_sim_date.strftime("%A, %d-%m-%Y")}")
-                funds_update.run(current_sim_date)
-            current_sim_date += timedelta(days=1)
+        for calc_date in calc_dates:
+            print(f"Constructing target funds holdings on: {calc_date.strftime("%A, %d-%m-%Y")}")
+            funds_update.run(calc_date)
 
     # Update account based on daily activity (interest, dividends, transactions, performance)
     if do_accounts:
-        account.reset_accounts()
-
-        current_sim_date = START_DATE
-        while current_sim_date <= END_DATE:
-            print(f"Generating account activity on: {current_sim_date.strftime("%A, %d-%m-%Y")}")
-            for current_account in accounts:
-                account_update.daily_actions(current_account, current_sim_date)
-            current_sim_date += timedelta(days=1)
+        account_update.INTEGER_CENTS = INTEGER_CENTS
+
+        # Accounts in the checkpoint (and still on the same fund) resume; the others restart from START_DATE
+        resumed = {aid: s for aid, s in resume.states.items() if resume.account_keys.get(aid) == account_keys.get(aid)} if resume else {}
+        restarted = [a for a in accounts if a.id is not None and a.id not in resumed]
+        if resume is None:
+            account.reset_accounts()
+        else:
+            account.reset_accounts(after=resume.as_of, account_ids=list(resumed))
+            if restarted:
+                account.reset_accounts(account_ids=[a.id for a in restarted])
+
+        # Prices for every symbol a fund can target, loaded once; symbols outside it are loaded on first use.
+        prices = PriceStore.load(fund_holding.fetch_symbols_between(START_DATE, END_DATE), START_DATE, END_DATE)
+        print(f"Price store: {len(prices.symbols)} symbols over {prices.n_days} days.")
+
+        # Account books are kept in memory for the run and written in bulk; benchmark prices, dividends and interest rates are loaded once and shared
+        states = {**resumed, **{a.id: AccountState.load(a.id) for a in restarted}}
+        benchmarks = BenchmarkSeries(END_DATE)
+        schedule = Schedule(START_DATE, END_DATE)
+
+        if USE_SIMULATOR:
+            rows_written = 0
+            if resume is not None and restarted:
+                print(f"Catching up {len(restarted)} accounts to {resume.as_of}.")
+                rows_written += Simulator(restarted, START_DATE, resume.as_of, prices, {a.id: states[a.id] for a in restarted}, calendar=calendar, benchmarks=benchmarks, schedule=schedule).run()
+
+            checkpoint_dates = set(calc_dates) if CHECKPOINTS else set()
+            # Input data is fixed from here on (the targets are written), so it is fingerprinted once for every save
+            versions = data_version.DataVersions(END_DATE) if checkpoint_dates else None
+            def save_checkpoint(d: date) -> None:
+                if versions and d in checkpoint_dates:
+                    for state in states.values():
+                        state.flush()
+                    checkpoint.save(run_key, d, account_keys, states, versions)
+
+            rows_written += Simulator(accounts, first_day, END_DATE, prices, states, calendar=calendar, benchmarks=benchmarks, schedule=schedule).run(flush_every_days=FLUSH_EVERY_DAYS, on_day=save_checkpoint)
+        else:
+            for days_simulated, current_sim_date in enumerate(calendar.dates(), start=1):
+                print(f"Generating account activity on: {current_sim_date.strftime("%A, %d-%m-%Y")}")
+                for current_account in accounts:
+                    account_update.daily_actions(current_account, current_sim_date, prices=prices, state=states.get(current_account.id), benchmarks=benchmarks, schedule=schedule)
+                if FLUSH_EVERY_DAYS and days_simulated % FLUSH_EVERY_DAYS == 0:
+                    for state in states.values():
+                        state.flush()
+
+            rows_written = sum(state.flush() for state in states.values())
+        print(f"Account books written: {rows_written} rows.")
 
     # Results
     alpha_rows = performance.fetch_alpha_annual()
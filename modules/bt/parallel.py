@@ -0,0 +1,166 @@
+import copy
+import itertools
+import math
+import multiprocessing
+import os
+import pickle
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from datetime import date
+from typing import List
+import log
+from modules.bt import orchestrator
+from modules.bt.object import account, best_idea, fund, performance
+from modules.bt.actions import account_update, funds_update
+from modules.bt.calc import model_fund
+from modules.bt.calc.price_store import PriceStore
+from modules.bt.calc.account_state import AccountState
+from modules.bt.calc.simulator import Simulator
+from modules.bt.calc.trading_calendar import TradingCalendar
+
+# Parameter sweeps over the back-test, in worker processes. Each task is one grid point for one shard of the
+# accounts: it builds its funds' targets in memory from the best ideas, simulates the shard and returns its
+# annual alpha rows - nothing is written to the back-test DB, so tasks cannot step on each other or on a
+# regular run. Prices are shared as memory-mapped .npy files and the best ideas as one pickle, both written
+# once by the parent. The best_idea table must already cover the calc dates of every period in the grid.
+
+
+@dataclass(frozen=True)
+class GridPoint:
+    calc_period: str = orchestrator.CALC_PERIOD
+    drift_threshold: float = account_update.DRIFT_THRESHOLD
+    mc_weight_alpha: float = model_fund.MC_WEIGHT_ALPHA
+    ranking_from: int | None = None     # None keeps each fund's own strategy value
+    ranking_to: int | None = None
+    holdings: int | None = None
+
+    @property
+    def label(self) -> str:
+        return ", ".join(f"{k}={v}" for k, v in asdict(self).items() if v is not None)
+
+
+@dataclass
+class GridTask:
+    point: GridPoint
+    account_ids: List[int]
+    shared_dir: str
+
+
+@dataclass
+class GridResult:
+    point: GridPoint
+    row: performance.AlphaAnnual
+
+
+def expand_grid(**axes: list) -> List[GridPoint]:
+    """Every combination of the given GridPoint fields, e.g. expand_grid(calc_period=[...], drift_threshold=[...])."""
+    names = list(axes)
+    return [GridPoint(**dict(zip(names, values))) for values in itertools.product(*(axes[n] for n in names))]
+
+
+def run(grid: List[GridPoint], max_workers: int | None = None, start: date = orchestrator.START_DATE, end: date = orchestrator.END_DATE) -> List[GridResult]:
+    accounts = [a for a in account.fetch_all() if a.id is not None]
+    if not grid or not accounts:
+        log.record_notice(f"Back-test grid: nothing to run ({len(grid)} grid points, {len(accounts)} accounts).")
+        return []
+    max_workers = max_workers or os.cpu_count() or 1
+
+    # Accounts are split so that small grids still keep every worker busy
+    shards_per_point = min(len(accounts), max(1, math.ceil(max_workers / len(grid))))
+    shard_size = math.ceil(len(accounts) / shards_per_point)
+    shards = [[a.id for a in accounts[i:i + shard_size]] for i in range(0, len(accounts), shard_size)]
+
+    with tempfile.TemporaryDirectory(prefix="bt_grid_") as shared_dir:
+        _write_shared_data(grid, start, end, shared_dir)
+        tasks = [GridTask(point, shard, shared_dir) for point in grid for shard in shards]
+        log.record_status(f"Back-test grid: {len(grid)} points x {len(shards)} account shards on {max_workers} workers.")
+
+        # spawn: workers open their own DB pools instead of inheriting the parent's sockets
+        results: List[GridResult] = []
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            for task_results in executor.map(_run_task, tasks, itertools.repeat((start, end))):
+                results.extend(task_results)
+
+    _report(results)
+    return results
+
+
+# ── shared, read-only inputs ──
+
+def _calc_dates(calc_period: str, start: date, end: date) -> List[date]:
+    return TradingCalendar(start, end).calc_dates(calc_period)
+
+
+def _write_shared_data(grid: List[GridPoint], start: date, end: date, shared_dir: str) -> None:
+    calc_dates = sorted({d for p in {g.calc_period for g in grid} for d in _calc_dates(p, start, end)})
+    ideas = {}
+    for d in calc_dates:
+        df = model_fund.resolve_canonical_symbols(best_idea.fetch_all_as_df(as_of_date=d))
+        ideas[d] = (df, funds_update.market_cap_map(df))
+    with open(os.path.join(shared_dir, "best_ideas.pkl"), "wb") as f:
+        pickle.dump(ideas, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    # Any grid point can only target symbols of these frames, whatever its ranking range or holdings count,
+    # so the workers never have to load a symbol themselves (PriceStore.ensure would copy the mapped arrays).
+    symbols = sorted({s for df, _ in ideas.values() for s in df['canonical_symbol'].dropna()})
+    PriceStore.load(symbols, start, end).save(os.path.join(shared_dir, "prices"))
+
+
+# ── worker ──
+
+def _run_task(task: GridTask, period: tuple[date, date]) -> List[GridResult]:
+    start, end = period
+    point = task.point
+    # Module-level knobs; each worker process runs one task at a time
+    account_update.DRIFT_THRESHOLD = point.drift_threshold
+    model_fund.MC_WEIGHT_ALPHA = point.mc_weight_alpha
+    account_update.INTEGER_CENTS = orchestrator.INTEGER_CENTS
+
+    prices = PriceStore.open(os.path.join(task.shared_dir, "prices"))
+    with open(os.path.join(task.shared_dir, "best_ideas.pkl"), "rb") as f:
+        ideas = pickle.load(f)
+
+    accounts = [a for a in account.fetch_all() if a.id in task.account_ids]
+    targets = {fund_id: _fund_targets(fund_id, point, ideas, start, end) for fund_id in {a.strategy_fund_id for a in accounts}}
+    states = {a.id: AccountState.load(a.id) for a in accounts}
+
+    Simulator(accounts, start, end, prices, states, fund_targets=targets, progress=False).run(persist=False)
+
+    comparisons = [c for s in states.values() for c in s.pending_comparisons]
+    return [GridResult(point, row) for row in performance.alpha_annual(comparisons)]
+
+
+def _fund_targets(fund_id: int, point: GridPoint, ideas: dict, start: date, end: date) -> List[model_fund.FundHolding]:
+    """funds_update.run for one fund over the point's calc dates, kept in memory."""
+    f = fund.fetch_fund(fund_id)
+    if f is None:
+        raise Exception("Missing strategy for fund")
+    strategy = dict(f.strategy)
+    for key in ('ranking_from', 'ranking_to', 'holdings'):
+        if getattr(point, key) is not None:
+            strategy[key] = getattr(point, key)
+    protocol = model_fund.FundProtocol(id=f.id, name=f.name, strategy=strategy)
+
+    history: List[model_fund.FundHolding] = []
+    previous: List[model_fund.FundHolding] = []
+    for d in _calc_dates(point.calc_period, start, end):
+        df, mc_map = ideas[d]
+        # generate() re-dates the previous holdings it keeps, so hand it copies
+        results = model_fund.generate(today=d, fund=protocol, previous_holdings=[copy.copy(h) for h in previous],
+                                      all_best_ideas_df=df, mc_map=mc_map)
+        previous = results.holdings
+        history.extend(results.holdings)
+    return history
+
+
+def _report(results: List[GridResult]) -> None:
+    header = f"{'Year':<8}{'Account':<9}{'Benchmark':<12}{'Strategy':>10}{'Benchmark':>12}{'Alpha':>10}  Parameters"
+    log.record_status(header)
+    log.record_status("-" * len(header))
+    for r in sorted(results, key=lambda r: (r.point.label, r.row.performance_year, r.row.account_id)):
+        log.record_status(
+            f"{int(r.row.performance_year):<8}{r.row.account_id:<9}{r.row.benchmark_symbol:<12}"
+            f"{float(r.row.annual_strategy_return):>10.2%}{float(r.row.annual_benchmark_return):>12.2%}"
+            f"{float(r.row.annual_alpha):>10.2%}  {r.point.label}"
+        )
@@ -3,6 +3,7 @@ import log
 import os
 from datetime import datetime, timezone
 from modules.bt.object.exit import cleanup
+from modules.core.db import db_pool_instance_bt
 from modules.bt import orchestrator
 
 
@@ -11,6 +12,8 @@ atexit.register(cleanup)
 if __name__ == '__main__':
     try:
         print("Starting back testing run")
+        db_pool_instance_bt.configure('backtest')
+        db_pool_instance_bt.warm_up()
         
         ENV_TYPE = os.environ.get("ENV_TYPE")
         environment = ENV_TYPE if ENV_TYPE is not None and ENV_TYPE == 'production' else 'development'
@@ -26,6 +29,7 @@ if __name__ == '__main__':
 
         end = datetime.now(timezone.utc)
         message_full = f"Activated at {start_time.strftime("%H:%M:%S")}\nCompleted at {end.strftime("%H:%M:%S")}.\n\n"
+        print(db_pool_instance_bt.metrics_summary())
 
     except Exception as e:
         log.record_error(f"Error in Best Ideas Back Test run: {e}")
@@ -0,0 +1,31 @@
+import atexit
+import log
+from datetime import datetime, timezone
+from modules.bt.object.exit import cleanup
+from modules.bt import orchestrator, parallel
+
+
+atexit.register(cleanup)
+
+# --- Configuration ---
+GRID = parallel.expand_grid(
+    calc_period=[orchestrator.CALC_PERIOD_MONTHLY, orchestrator.CALC_PERIOD_QUARTERLY],
+    drift_threshold=[0.05, 0.10],
+    mc_weight_alpha=[0.5, 1.0],
+)
+MAX_WORKERS = None  # os.cpu_count()
+# ---------------------
+
+if __name__ == '__main__':
+    try:
+        start_time = datetime.now(timezone.utc)
+        log.record_status(f"Starting back testing grid of {len(GRID)} parameter sets")
+
+        parallel.run(GRID, max_workers=MAX_WORKERS)
+
+        end = datetime.now(timezone.utc)
+        print(f"Activated at {start_time.strftime('%H:%M:%S')}\nCompleted at {end.strftime('%H:%M:%S')}.\n")
+
+    except Exception as e:
+        log.record_error(f"Error in Back Test grid run: {e}")
+        raise Exception(f"Back Test grid failed - {e}")
@@ -1,72 +1,164 @@
 import log
 import os
+import csv
+import io
 import time
+import asyncio
+import httpx
 from concurrent.futures import ThreadPoolExecutor
-from typing import List, Dict
-from datetime import date
-from collections import deque
-from threading import Lock
-from urllib.request import urlopen
-import json
+from typing import Any, Callable, Dict
+from datetime import date, datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlencode
+from modules.core.http_client import HttpClientSingleton
+from modules.core.rate_limiter import RateLimiter
+from modules.core.response_cache import response_cache
 
 FMP_API_URL = 'https://financialmodelingprep.com/stable'
 
 CALLS_PER_MINUTE = 200
 WINDOW_SECONDS = 60.0
 
-_call_timestamps = deque()
-_bucket_lock = Lock()
+# Endpoints that count as more than one call against the quota: the bulk files return the whole market at once.
+ENDPOINT_WEIGHT: dict[str, int] = {'eod-bulk': 10}
 
-def throttle_api_calls() -> None:
-    """
-    Token bucket rate limiter.
-    Guarantees no more than CALLS_PER_MINUTE in WINDOW_SECONDS.
-    Thread-safe and burst-safe.
-    """
-    with _bucket_lock:
-        now = time.monotonic()
+api_rate_limiter = RateLimiter('fmp', CALLS_PER_MINUTE, WINDOW_SECONDS, weights=ENDPOINT_WEIGHT)
 
-        # Remove timestamps older than the rolling window
-        while _call_timestamps and now - _call_timestamps[0] >= WINDOW_SECONDS:
-            _call_timestamps.popleft()
+def throttle_api_calls(endpoint: str = '') -> None:
+    """Wait for a slot under CALLS_PER_MINUTE. The wait happens outside the limiter's lock."""
+    api_rate_limiter.acquire(endpoint)
 
-        # If bucket is full, wait until a token frees up
-        if len(_call_timestamps) >= CALLS_PER_MINUTE:
-            sleep_time = WINDOW_SECONDS - (now - _call_timestamps[0])
-            if sleep_time > 0:
-                time.sleep(sleep_time)
+API_RETRIES = 3
+API_RETRY_DELAY = 2.0  # seconds; doubles on each subsequent attempt
+API_MAX_RETRY_AFTER = 60.0  # cap on a server-requested Retry-After wait
 
-            # Recalculate after sleeping
-            now = time.monotonic()
-            while _call_timestamps and now - _call_timestamps[0] >= WINDOW_SECONDS:
-                _call_timestamps.popleft()
+# Enough keep-alive connections to use the full rate limit at ~3s a call; more would only queue on the throttle.
+API_MAX_CONNECTIONS = max(4, CALLS_PER_MINUTE // 20)
+API_BATCH_CONCURRENCY = API_MAX_CONNECTIONS
 
-        # Consume a token
-        _call_timestamps.append(time.monotonic())
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
 
-API_RETRIES = 3
-API_RETRY_DELAY = 2.0  # seconds; doubles on each subsequent attempt
+api_client_instance = HttpClientSingleton(max_connections=API_MAX_CONNECTIONS, max_keepalive=API_MAX_CONNECTIONS, http2=True, headers={'Accept': 'application/json'})
+
+
+class ApiResponseError(Exception):
+    def __init__(self, response: httpx.Response) -> None:
+        super().__init__(f"{response.status_code} {response.reason_phrase}")
+        self.status_code = response.status_code
+        self.retry_after = _parse_retry_after(response.headers.get('retry-after'))
+
+
+def _parse_retry_after(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), API_MAX_RETRY_AFTER)
+
+
+def _parse_response(response: httpx.Response) -> Any:
+    if response.status_code != 200:
+        raise ApiResponseError(response)
+    return response.json()
+
+
+def _retry_delay(e: Exception, attempt: int) -> float | None:
+    """Seconds to wait before the next attempt, or None when the error is not worth retrying."""
+    if isinstance(e, ApiResponseError):
+        if e.status_code not in RETRYABLE_STATUS:
+            return None
+        if e.retry_after is not None:
+            return e.retry_after
+    elif not isinstance(e, (httpx.TransportError, ValueError)):
+        return None
+    return API_RETRY_DELAY * (2 ** attempt)
+
+
+def _parse_csv_response(response: httpx.Response) -> list[dict[str, str]]:
+    if response.status_code != 200:
+        raise ApiResponseError(response)
+    return list(csv.DictReader(io.StringIO(response.text)))
+
+
+def get_jsonparsed_data(url: str, parse: Callable[[httpx.Response], Any] = _parse_response) -> Any:
+    last_exc: Exception | None = None
+    for attempt in range(API_RETRIES):
+        try:
+            return parse(api_client_instance.get_client().get(url))
+        except Exception as e:
+            last_exc = e
+            delay = _retry_delay(e, attempt)
+            if delay is None:
+                break
+            if attempt < API_RETRIES - 1:
+                time.sleep(delay)
+    raise last_exc if last_exc is not None else Exception("Failed to fetch data after retries")
 
-def get_jsonparsed_data(url: str) -> dict:
+async def get_jsonparsed_data_async(client: httpx.AsyncClient, url: str) -> Any:
     last_exc: Exception | None = None
     for attempt in range(API_RETRIES):
         try:
-            response = urlopen(url)
-            if response.code != 200:
-                raise Exception(f"{response.reason}")
-            data = response.read().decode("utf-8")
-            return json.loads(data)
+            return _parse_response(await client.get(url))
         except Exception as e:
             last_exc = e
+            delay = _retry_delay(e, attempt)
+            if delay is None:
+                break
             if attempt < API_RETRIES - 1:
-                time.sleep(API_RETRY_DELAY * (2 ** attempt))
+                await asyncio.sleep(delay)
     raise last_exc if last_exc is not None else Exception("Failed to fetch data after retries")
 
+def _api_url(endpoint: str, params: dict) -> str:
+    query = urlencode({**{k: v for k, v in params.items() if v is not None}, 'apikey': os.getenv('SECRET_MARKET_DATA_API_KEY')})
+    return f"{FMP_API_URL}/{endpoint}?{query}"
+
+def _fetch_json(endpoint: str, params: dict) -> Any:
+    """GET an FMP endpoint, served from the response cache when possible. Only cache misses use the rate limit."""
+    key = response_cache.make_key(endpoint, params)
+    hit, cached = response_cache.get(endpoint, key)
+    if hit:
+        return cached
+
+    throttle_api_calls(endpoint)
+    data = get_jsonparsed_data(_api_url(endpoint, params))
+    response_cache.put(endpoint, key, data)
+    return data
+
+async def fetch_json_async(client: httpx.AsyncClient, endpoint: str, params: dict) -> Any:
+    """Async _fetch_json, for callers already running an event loop with their own client."""
+    key = response_cache.make_key(endpoint, params)
+    hit, cached = response_cache.get(endpoint, key)
+    if hit:
+        return cached
+
+    await api_rate_limiter.acquire_async(endpoint)
+    data = await get_jsonparsed_data_async(client, _api_url(endpoint, params))
+    response_cache.put(endpoint, key, data)
+    return data
+
+def fetch_json_many(calls: list[tuple[str, dict]], concurrency: int = API_BATCH_CONCURRENCY) -> list[Any]:
+    """Run many (endpoint, params) calls concurrently over one async connection pool, opened and closed by this call
+    (each caller thread runs its own event loop). Results are in call order; a failed call yields its exception instead of raising."""
+    async def run() -> list[Any]:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async with api_client_instance.new_async_client() as client:
+            async def one(endpoint: str, params: dict) -> Any:
+                async with semaphore:
+                    return await fetch_json_async(client, endpoint, params)
+
+            return await asyncio.gather(*(one(endpoint, params) for endpoint, params in calls), return_exceptions=True)
+
+    return asyncio.run(run()) if calls else []
+
 def get_stock_profile(symbol: str) -> dict[str,str] | str:
     try:
-        throttle_api_calls()
-        url = (f"{FMP_API_URL}/profile?symbol={symbol}&apikey={os.getenv('SECRET_MARKET_DATA_API_KEY')}")
-        array = get_jsonparsed_data(url)
+        array = _fetch_json('profile', {'symbol': symbol})
         
         if not isinstance(array, list) or len(array) == 0:
             message = f"Invalid profile response for symbol '{symbol}': empty result"
@@ -82,9 +174,7 @@ def get_stock_profile(symbol: str) -> dict[str,str] | str:
     
 def search_by_isin(isin: str) -> dict | None:
     try:
-        throttle_api_calls()
-        url = f"{FMP_API_URL}/search-isin?isin={isin}&apikey={os.getenv('SECRET_MARKET_DATA_API_KEY')}"
-        result = get_jsonparsed_data(url)
+        result = _fetch_json('search-isin', {'isin': isin})
         if not isinstance(result, list) or len(result) == 0:
             return None
         return result[0]
@@ -94,9 +184,7 @@ def search_by_isin(isin: str) -> dict | None:
 
 def search_by_symbol(query: str) -> list[dict]:
     try:
-        throttle_api_calls()
-        url = f"{FMP_API_URL}/search-symbol?query={query}&limit=1000&apikey={os.getenv('SECRET_MARKET_DATA_API_KEY')}"
-        result = get_jsonparsed_data(url)
+        result = _fetch_json('search-symbol', {'query': query, 'limit': 1000})
         if not isinstance(result, list):
             return []
         return result
@@ -106,9 +194,7 @@ def search_by_symbol(query: str) -> list[dict]:
 
 def search_by_name(query: str) -> list[dict]:
     try:
-        throttle_api_calls()
-        url = f"{FMP_API_URL}/search-name?query={query}&apikey={os.getenv('SECRET_MARKET_DATA_API_KEY')}"
-        result = get_jsonparsed_data(url)
+        result = _fetch_json('search-name', {'query': query})
         if not isinstance(result, list):
             return []
         return result
@@ -118,9 +204,7 @@ def search_by_name(query: str) -> list[dict]:
 
 def fetch_available_exchanges() -> list[dict]:
     try:
-        throttle_api_calls()
-        url = f"{FMP_API_URL}/available-exchanges?apikey={os.getenv('SECRET_MARKET_DATA_API_KEY')}"
-        result = get_jsonparsed_data(url)
+        result = _fetch_json('available-exchanges', {})
         if not isinstance(result, list):
             return []
         return result
@@ -130,9 +214,7 @@ def fetch_available_exchanges() -> list[dict]:
 
 def get_stock_historic_prices(symbol: str, start: date, end: date) -> list[dict[str,str]] | str:
     try:
-        throttle_api_calls()
-        url = (f"{FMP_API_URL}/historical-price-eod/light?symbol={symbol}&from={start.strftime("%Y-%m-%d")}&to={end.strftime("%Y-%m-%d")}&apikey={os.getenv('SECRET_MARKET_DATA_API_KEY')}")
-        array = get_jsonparsed_data(url)
+        array = _fetch_json('historical-price-eod/light', {'symbol': symbol, 'from': start.strftime("%Y-%m-%d"), 'to': end.strftime("%Y-%m-%d")})
         
         if not isinstance(array, list) or len(array) == 0:
             message = f"Invalid stock price on date response for symbol '{symbol}': empty result"
@@ -148,9 +230,7 @@ def get_stock_historic_prices(symbol: str, start: date, end: date) -> list[dict[
 
 def get_stock_historic_dividend(symbol: str) -> list[dict[str,str]] | str:
     try:
-        throttle_api_calls()
-        url = (f"{FMP_API_URL}/dividends?symbol={symbol}&apikey={os.getenv('SECRET_MARKET_DATA_API_KEY')}")
-        array = get_jsonparsed_data(url)
+        array = _fetch_json('dividends', {'symbol': symbol})
         
         if not isinstance(array, list):
             message = f"Invalid historic dividends response for symbol '{symbol}': empty result"
@@ -166,9 +246,7 @@ def get_stock_historic_dividend(symbol: str) -> list[dict[str,str]] | str:
 
 def get_stock_historic_splits(symbol: str) -> list[dict[str,str]] | str:
     try:
-        throttle_api_calls()
-        url = (f"{FMP_API_URL}/splits?symbol={symbol}&apikey={os.getenv('SECRET_MARKET_DATA_API_KEY')}")
-        array = get_jsonparsed_data(url)
+        array = _fetch_json('splits', {'symbol': symbol})
         
         if not isinstance(array, list):
             message = f"Invalid historic splits response for symbol '{symbol}': empty result"
@@ -184,9 +262,7 @@ def get_stock_historic_splits(symbol: str) -> list[dict[str,str]] | str:
 
 def get_stock_historic_market_cap(symbol: str, start: date, end: date) -> list[dict[str,str]] | str:
     try:
-        throttle_api_calls()
-        url = (f"{FMP_API_URL}/historical-market-capitalization?symbol={symbol}&from={start.strftime("%Y-%m-%d")}&to={end.strftime("%Y-%m-%d")}&apikey={os.getenv('SECRET_MARKET_DATA_API_KEY')}")
-        array = get_jsonparsed_data(url)
+        array = _fetch_json('historical-market-capitalization', {'symbol': symbol, 'from': start.strftime("%Y-%m-%d"), 'to': end.strftime("%Y-%m-%d")})
         
         if not isinstance(array, list) or len(array) == 0:
             message = f"Invalid historic market cap price response for symbol '{symbol}': empty result"
@@ -210,9 +286,7 @@ def get_fx_rate(from_currency: str, to_currency: str = 'USD') -> float | str:
         return 1.0
     symbol = f"{from_currency}{to_currency}"
     try:
-        throttle_api_calls()
-        url = f"{FMP_API_URL}/quote-short?symbol={symbol}&apikey={os.getenv('SECRET_MARKET_DATA_API_KEY')}"
-        array = get_jsonparsed_data(url)
+        array = _fetch_json('quote-short', {'symbol': symbol})
         if not isinstance(array, list) or len(array) == 0:
             message = f"Invalid FX rate response for '{symbol}': empty result"
             log.record_notice(message)
@@ -227,26 +301,20 @@ def get_fx_rate(from_currency: str, to_currency: str = 'USD') -> float | str:
 # Fetch company list and factors forr use in classification universe
 # ------------------------------------------------------------------
 def fetch_company_factors(symbol: str) -> tuple[Dict, Dict]:
-    apikey = os.getenv('SECRET_MARKET_DATA_API_KEY')
-
-    def _fetch(endpoint: str):
-        throttle_api_calls()
-        return get_jsonparsed_data(endpoint)
-
     try:
         endpoints = {
-            "profile": f"{FMP_API_URL}/profile?symbol={symbol}&apikey={apikey}",
-            "growth": f"{FMP_API_URL}/financial-growth?symbol={symbol}&apikey={apikey}",
-            "ratios": f"{FMP_API_URL}/ratios-ttm?symbol={symbol}&apikey={apikey}",
-            "metrics": f"{FMP_API_URL}/key-metrics-ttm?symbol={symbol}&apikey={apikey}",
-            "income": f"{FMP_API_URL}/income-statement?symbol={symbol}&limit=1&apikey={apikey}",
-            "cashflow": f"{FMP_API_URL}/cash-flow-statement?symbol={symbol}&limit=1&apikey={apikey}",
+            "profile": ('profile', {'symbol': symbol}),
+            "growth": ('financial-growth', {'symbol': symbol}),
+            "ratios": ('ratios-ttm', {'symbol': symbol}),
+            "metrics": ('key-metrics-ttm', {'symbol': symbol}),
+            "income": ('income-statement', {'symbol': symbol, 'limit': 1}),
+            "cashflow": ('cash-flow-statement', {'symbol': symbol, 'limit': 1}),
         }
 
         results = {}
 
         with ThreadPoolExecutor(max_workers=6) as executor:
-            futures = {name: executor.submit(_fetch, url) for name, url in endpoints.items()}
+            futures = {name: executor.submit(_fetch_json, endpoint, params) for name, (endpoint, params) in endpoints.items()}
 
             for name, future in futures.items():
                 results[name] = future.result()
@@ -329,34 +397,30 @@ def fetch_company_factors(symbol: str) -> tuple[Dict, Dict]:
 # Fetch ESG disclosure and risk rating for a single symbol
 # ------------------------------------------------------------------
 def fetch_esg_data(symbol: str) -> tuple[Dict, Dict]:
-    apikey = os.getenv('SECRET_MARKET_DATA_API_KEY')
-
-    def _fetch(endpoint: str):
-        throttle_api_calls()
-        return get_jsonparsed_data(endpoint)
-
     try:
         endpoints = {
-            "disclosure": f"{FMP_API_URL}/esg-disclosures?symbol={symbol}&apikey={apikey}",
-            "rating":     f"{FMP_API_URL}/esg-ratings?symbol={symbol}&apikey={apikey}",
+            "disclosure": ('esg-disclosures', {'symbol': symbol}),
+            "rating":     ('esg-ratings', {'symbol': symbol}),
         }
         results = {}
         with ThreadPoolExecutor(max_workers=2) as executor:
-            futures = {name: executor.submit(_fetch, url) for name, url in endpoints.items()}
+            futures = {name: executor.submit(_fetch_json, endpoint, params) for name, (endpoint, params) in endpoints.items()}
             for name, future in futures.items():
                 results[name] = future.result()
 
-        d = results["disclosure"]
-        r = results["rating"]
-        disclosure = max(d, key=lambda x: x.get('date', ''), default={}) if isinstance(d, list) and d else {}
-        rating     = max(r, key=lambda x: x.get('fiscalYear', ''), default={}) if isinstance(r, list) and r else {}
-        return disclosure, rating
+        return _latest_esg(results["disclosure"], results["rating"])
 
     except Exception as e:
         log.record_error(f"Failed to get ESG data for {symbol}: {e}")
         return {}, {}
 
 
+def _latest_esg(d: Any, r: Any) -> tuple[Dict, Dict]:
+    disclosure = max(d, key=lambda x: x.get('date', ''), default={}) if isinstance(d, list) and d else {}
+    rating     = max(r, key=lambda x: x.get('fiscalYear', ''), default={}) if isinstance(r, list) and r else {}
+    return disclosure, rating
+
+
 SCREENER_PAGE_LIMIT = 1000
 SCREENER_MAX_PAGES = 20
 
@@ -367,14 +431,10 @@ def fetch_company_screener(market_cap_more_than: int, page: int, limit: int = SC
     Expected fields per item: symbol, marketCap, country, exchangeShortName, companyName.
     """
     try:
-        throttle_api_calls()
-        apikey = os.getenv('SECRET_MARKET_DATA_API_KEY')
-        url = (
-            f"{FMP_API_URL}/company-screener"
-            f"?marketCapMoreThan={market_cap_more_than}&limit={limit}&page={page}"
-            f"&isEtf=false&isFund=false&isActivelyTrading=true&apikey={apikey}"
-        )
-        result = get_jsonparsed_data(url)
+        result = _fetch_json('company-screener', {
+            'marketCapMoreThan': market_cap_more_than, 'limit': limit, 'page': page,
+            'isEtf': 'false', 'isFund': 'false', 'isActivelyTrading': 'true',
+        })
         if not isinstance(result, list):
             log.record_notice(f"Unexpected screener response on page {page}: {type(result)}")
             return []
@@ -383,3 +443,107 @@ def fetch_company_screener(market_cap_more_than: int, page: int, limit: int = SC
         log.record_notice(f"Failed to fetch company screener page {page}: {e}")
         return []
 
+
+# ------------------------------------------------------------------
+# Batch / bulk variants: chunked multi-symbol calls fanned out per symbol,
+# with single-symbol calls for whatever a batch did not answer
+# ------------------------------------------------------------------
+BATCH_CHUNK_SIZE = 100
+
+def _chunks(items: list[str], size: int) -> list[list[str]]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+def _by_symbol(result: Any) -> dict[str, dict]:
+    if not isinstance(result, list):
+        return {}
+    return {str(item['symbol']).upper(): item for item in result if isinstance(item, dict) and item.get('symbol')}
+
+def _fetch_batch(endpoint: str, param: str, symbols: list[str]) -> dict[str, dict]:
+    """Call a multi-symbol endpoint in chunks; returns the items by upper-case symbol."""
+    calls = [(endpoint, {param: ','.join(chunk)}) for chunk in _chunks(symbols, BATCH_CHUNK_SIZE)]
+    found: dict[str, dict] = {}
+    for (_, params), result in zip(calls, fetch_json_many(calls)):
+        if isinstance(result, Exception):
+            log.record_notice(f"Batch '{endpoint}' call failed for {params[param].count(',') + 1} symbols: {result}")
+            continue
+        found.update(_by_symbol(result))
+    return found
+
+def _fetch_each(symbols: list[str], fetch: Callable[[str], Any]) -> dict[str, Any]:
+    if not symbols:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(API_BATCH_CONCURRENCY, len(symbols))) as executor:
+        return dict(zip(symbols, executor.map(fetch, symbols)))
+
+def get_stock_profiles(symbols: list[str]) -> dict[str, dict | str]:
+    """
+    Profiles for many symbols, keyed by the symbols as given. Values are as get_stock_profile returns them:
+    the profile dict, or an error message. Cached profiles are used first, the rest are fetched in
+    multi-symbol chunks and stored in the cache per symbol; misses fall back to one call per symbol.
+    """
+    wanted = list(dict.fromkeys(s for s in symbols if s))
+    profiles: dict[str, dict | str] = {}
+    pending: list[str] = []
+    for symbol in wanted:
+        hit, cached = response_cache.get('profile', response_cache.make_key('profile', {'symbol': symbol}))
+        if hit and isinstance(cached, list) and cached:
+            profiles[symbol] = cached[0]
+        else:
+            pending.append(symbol)
+
+    if len(pending) > 1:
+        found = _fetch_batch('profile', 'symbol', pending)
+        for symbol in pending:
+            item = found.get(symbol.upper())
+            if item:
+                profiles[symbol] = item
+                response_cache.put('profile', response_cache.make_key('profile', {'symbol': symbol}), [item])
+
+    profiles.update(_fetch_each([s for s in pending if s not in profiles], get_stock_profile))
+    return profiles
+
+def get_batch_quotes(symbols: list[str]) -> dict[str, dict]:
+    """Latest quotes (price, marketCap, ...) keyed by the symbols as given; symbols without a quote are left out."""
+    wanted = list(dict.fromkeys(s for s in symbols if s))
+    found = _fetch_batch('batch-quote', 'symbols', wanted)
+    quotes = {s: found[s.upper()] for s in wanted if s.upper() in found}
+
+    def quote(symbol: str) -> dict | None:
+        try:
+            return next(iter(_by_symbol(_fetch_json('quote', {'symbol': symbol})).values()), None)
+        except Exception as e:
+            log.record_notice(f"Failed to get quote for '{symbol}': {e}")
+            return None
+
+    fallback = _fetch_each([s for s in wanted if s not in quotes], quote)
+    quotes.update({s: q for s, q in fallback.items() if q})
+    return quotes
+
+def get_bulk_eod(day: date) -> dict[str, dict[str, str]] | None:
+    """End-of-day prices of every listed symbol for one date (one call), keyed by upper-case symbol. Empty on a market holiday, None if the call failed."""
+    try:
+        throttle_api_calls('eod-bulk')
+        rows = get_jsonparsed_data(_api_url('eod-bulk', {'date': day.strftime("%Y-%m-%d")}), _parse_csv_response)
+        return {row['symbol'].upper(): row for row in rows if row.get('symbol')}
+    except Exception as e:
+        log.record_notice(f"Failed to get bulk end-of-day prices for {day}: {e}")
+        return None
+
+def fetch_esg_data_many(symbols: list[str]) -> dict[str, tuple[Dict, Dict]]:
+    """
+    fetch_esg_data for many symbols. The ESG endpoints take one symbol per call, so this saves
+    wall-clock time (calls run concurrently on one connection pool) rather than calls.
+    """
+    wanted = list(dict.fromkeys(s for s in symbols if s))
+    calls = [call for s in wanted for call in (('esg-disclosures', {'symbol': s}), ('esg-ratings', {'symbol': s}))]
+    results = fetch_json_many(calls)
+
+    esg: dict[str, tuple[Dict, Dict]] = {}
+    for i, symbol in enumerate(wanted):
+        d, r = results[2 * i], results[2 * i + 1]
+        if isinstance(d, Exception) or isinstance(r, Exception):
+            log.record_error(f"Failed to get ESG data for {symbol}: {d if isinstance(d, Exception) else r}")
+            esg[symbol] = ({}, {})
+        else:
+            esg[symbol] = _latest_esg(d, r)
+    return esg
@@ -0,0 +1,83 @@
+from typing import Iterable, Sequence
+import pandas as pd
+from psycopg import Cursor, sql
+
+# Set-based bulk writes: rows are streamed with COPY ... FROM STDIN into a temporary staging table,
+# then moved into the target with one INSERT ... ON CONFLICT (upsert) or DELETE + INSERT (replace).
+# The staging table lives for the current transaction only, so run these inside the caller's connection.
+
+Rows = pd.DataFrame | Iterable[Sequence]
+
+
+def to_rows(data: Rows, columns: Sequence[str]) -> Iterable[Sequence]:
+    """DataFrame (its `columns`, NaN as NULL, numpy scalars as Python values) or an iterable of tuples in column order."""
+    if isinstance(data, pd.DataFrame):
+        df = data[list(columns)].astype(object)
+        df = df.where(df.notna(), None)
+        return df.itertuples(index=False, name=None)
+    return data
+
+
+def stage(cur: Cursor, table: str, columns: Sequence[str], data: Rows) -> str:
+    """COPY the rows into a staging table shaped like `table` (these columns only, no constraints). Returns its name."""
+    staging = f"_bulk_{table}"
+    cur.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(sql.Identifier(staging)))
+    cur.execute(sql.SQL("CREATE TEMP TABLE {} ON COMMIT DROP AS SELECT {} FROM {} WITH NO DATA").format(
+        sql.Identifier(staging), _columns(columns), sql.Identifier(table)))
+    # Row order, so the last of several rows with the same key wins - as it did with one statement per row.
+    cur.execute(sql.SQL("ALTER TABLE {} ADD COLUMN _row bigserial").format(sql.Identifier(staging)))
+
+    with cur.copy(sql.SQL("COPY {} ({}) FROM STDIN").format(sql.Identifier(staging), _columns(columns))) as copy:
+        for row in to_rows(data, columns):
+            copy.write_row(row)
+    return staging
+
+
+def upsert(cur: Cursor, table: str, columns: Sequence[str], data: Rows, conflict: Sequence[str], update: Sequence[str], only_changed: bool = False) -> int:
+    """INSERT ... ON CONFLICT (conflict) DO UPDATE the `update` columns. With only_changed, unchanged rows are not rewritten.
+    Returns the number of rows inserted or updated."""
+    staging = stage(cur, table, columns, data)
+    query = sql.SQL("""
+        INSERT INTO {table} ({columns})
+        SELECT DISTINCT ON ({conflict}) {columns} FROM {staging} ORDER BY {conflict}, _row DESC
+        ON CONFLICT ({conflict}) DO UPDATE SET {assignments}
+    """).format(
+        table=sql.Identifier(table),
+        columns=_columns(columns),
+        conflict=_columns(conflict),
+        staging=sql.Identifier(staging),
+        assignments=sql.SQL(', ').join(sql.SQL("{0} = EXCLUDED.{0}").format(sql.Identifier(c)) for c in update),
+    )
+    if only_changed:
+        query += sql.SQL(" WHERE ") + sql.SQL(' OR ').join(
+            sql.SQL("{}.{} IS DISTINCT FROM EXCLUDED.{}").format(sql.Identifier(table), sql.Identifier(c), sql.Identifier(c)) for c in update)
+    cur.execute(query)
+    return cur.rowcount
+
+
+def replace(cur: Cursor, table: str, columns: Sequence[str], data: Rows, key: Sequence[str]) -> int:
+    """Delete every target row sharing a `key` with the new rows, then insert the new rows. Returns the number inserted."""
+    staging = stage(cur, table, columns, data)
+    cur.execute(sql.SQL("DELETE FROM {table} t USING (SELECT DISTINCT {key} FROM {staging}) s WHERE {match}").format(
+        table=sql.Identifier(table),
+        key=_columns(key),
+        staging=sql.Identifier(staging),
+        match=sql.SQL(' AND ').join(sql.SQL("t.{0} = s.{0}").format(sql.Identifier(c)) for c in key),
+    ))
+    cur.execute(sql.SQL("INSERT INTO {table} ({columns}) SELECT {columns} FROM {staging} ORDER BY _row").format(
+        table=sql.Identifier(table), columns=_columns(columns), staging=sql.Identifier(staging)))
+    return cur.rowcount
+
+
+def insert(cur: Cursor, table: str, columns: Sequence[str], data: Rows) -> int:
+    """Plain append: COPY the rows straight into `table`. Returns the number of rows written."""
+    count = 0
+    with cur.copy(sql.SQL("COPY {} ({}) FROM STDIN").format(sql.Identifier(table), _columns(columns))) as copy:
+        for row in to_rows(data, columns):
+            copy.write_row(row)
+            count += 1
+    return count
+
+
+def _columns(columns: Sequence[str]) -> sql.Composed:
+    return sql.SQL(', ').join(sql.Identifier(c) for c in columns)
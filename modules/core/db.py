@@ -1,11 +1,115 @@
 import os
-from contextlib import AbstractContextManager
-from psycopg import Connection
+import time
+from contextlib import AbstractContextManager, contextmanager
+from dataclasses import dataclass
+from threading import Lock
+from typing import Iterator
+from psycopg import Connection, Cursor
 from psycopg_pool import ConnectionPool
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# ── pool sizing per entry point ──
+
+@dataclass
+class PoolConfig:
+    min_size: int = 1
+    max_size: int = 10
+    timeout: float = 30.0          # seconds a checkout may wait for a free connection
+    prepare_threshold: int = 2     # executions of a query text on a connection before it is server-side prepared (psycopg: 5)
+
+# The cron runs the downloader threads, the resolver / FMP executors and the log writer side by side;
+# the back-test is mostly single-threaded but long. Override with DB_POOL_MIN_SIZE / DB_POOL_MAX_SIZE.
+POOL_PROFILES: dict[str, PoolConfig] = {
+    'default': PoolConfig(),
+    'cron': PoolConfig(min_size=4, max_size=16),
+    'backtest': PoolConfig(min_size=2, max_size=6),
+}
+
+SLOW_QUERY_MS = int(os.environ.get("DB_SLOW_QUERY_MS", "1000"))
+SLOW_QUERIES_KEPT = 10
+
+
+def pool_config(profile: str) -> PoolConfig:
+    base = POOL_PROFILES.get(profile, POOL_PROFILES['default'])
+    return PoolConfig(
+        min_size=int(os.environ.get("DB_POOL_MIN_SIZE", base.min_size)),
+        max_size=int(os.environ.get("DB_POOL_MAX_SIZE", base.max_size)),
+        timeout=float(os.environ.get("DB_POOL_TIMEOUT", base.timeout)),
+        prepare_threshold=int(os.environ.get("DB_PREPARE_THRESHOLD", base.prepare_threshold)),
+    )
+
+
+# ── metrics ──
+
+class PoolMetrics:
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self.checkouts = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+        self.held_ms_total = 0.0
+        self.held_ms_max = 0.0
+        self.exhausted = 0
+        self.queries = 0
+        self.slow_queries: list[tuple[float, str]] = []
+
+    def record_checkout(self, wait_ms: float, held_ms: float, exhausted: bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_ms_total += wait_ms
+            self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+            self.held_ms_total += held_ms
+            self.held_ms_max = max(self.held_ms_max, held_ms)
+            if exhausted:
+                self.exhausted += 1
+
+    def record_query(self, query: object, ms: float) -> None:
+        with self._lock:
+            self.queries += 1
+            if ms < SLOW_QUERY_MS:
+                return
+            text = query.as_string(None) if hasattr(query, 'as_string') else str(query)
+            self.slow_queries.append((ms, ' '.join(text.split())[:120]))
+            self.slow_queries.sort(key=lambda q: q[0], reverse=True)
+            del self.slow_queries[SLOW_QUERIES_KEPT:]
+
+    def summary(self) -> str:
+        with self._lock:
+            if not self.checkouts:
+                return "no checkouts"
+            lines = [
+                f"{self.checkouts} checkouts, wait avg {self.wait_ms_total / self.checkouts:.1f}ms / max {self.wait_ms_max:.0f}ms, "
+                f"held avg {self.held_ms_total / self.checkouts:.1f}ms / max {self.held_ms_max:.0f}ms, "
+                f"{self.exhausted} checkouts found the pool exhausted, {self.queries} queries"
+            ]
+            lines += [f"  slow query {ms:.0f}ms: {q}" for ms, q in self.slow_queries]
+            return "\n".join(lines)
+
+
+class TimedCursor(Cursor):
+    """Cursor that reports every execute's duration to its pool's metrics (see DatabasePoolSingleton._configure)."""
+    metrics: PoolMetrics | None = None
+
+    def execute(self, query, params=None, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().execute(query, params, **kwargs)
+        finally:
+            if self.metrics is not None:
+                self.metrics.record_query(query, (time.perf_counter() - start) * 1000)
+
+    def executemany(self, query, params_seq, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().executemany(query, params_seq, **kwargs)
+        finally:
+            if self.metrics is not None:
+                self.metrics.record_query(query, (time.perf_counter() - start) * 1000)
+
+
 class DatabasePoolSingleton:
     _instances = {}  # Stores instances by database name
 
@@ -20,12 +124,22 @@ class DatabasePoolSingleton:
     def _init_pool(self, db_name: str) -> None:
         self.db_name = db_name
         self._pool = None
+        self.config = pool_config('default')
+        self.metrics = PoolMetrics()
+        self._cursor_class = type('PoolCursor', (TimedCursor,), {'metrics': self.metrics})
         # Shared credentials from environment
         self.host = os.getenv('SECRET_DATABASE_HOST')
         self.port = os.getenv('SECRET_DATABASE_PORT')
         self.user = os.getenv('SECRET_DATABASE_USER')
         self.password = os.getenv('SECRET_DATABASE_PASSWORD')
 
+    def configure(self, profile: str) -> None:
+        """Size the pool for an entry point ('cron', 'backtest'); call before the first connection is taken."""
+        if self._pool is not None:
+            print(f"Pool for {self.db_name} is already open, keeping its {self.config.min_size}-{self.config.max_size} sizing.")
+            return
+        self.config = pool_config(profile)
+
     def get_pool(self) -> ConnectionPool:
         if self._pool is None:
             conninfo = (
@@ -33,17 +147,52 @@ class DatabasePoolSingleton:
                 f"dbname={self.db_name} user={self.user} "
                 f"password={self.password}"
             )
-            print(f"Connecting pool to: {self.db_name}")
-            # Initialize with your specific min/max sizes
-            self._pool = ConnectionPool(conninfo, min_size=1, max_size=10)
+            print(f"Connecting pool to: {self.db_name} ({self.config.min_size}-{self.config.max_size} connections)")
+            self._pool = ConnectionPool(
+                conninfo,
+                min_size=self.config.min_size,
+                max_size=self.config.max_size,
+                timeout=self.config.timeout,
+                configure=self._configure,
+                name=self.db_name,
+            )
         return self._pool
 
+    def _configure(self, conn: Connection) -> None:
+        # Queries repeated on a connection are server-side prepared on their second run instead of their fifth.
+        # Nothing is prepared ahead here: the per-row lookups now hit the ticker index or go out as COPY batches.
+        conn.prepare_threshold = self.config.prepare_threshold
+        conn.cursor_factory = self._cursor_class
+
+    def warm_up(self, timeout: float = 30.0) -> None:
+        """Open min_size connections now rather than on the first checkouts."""
+        self.get_pool().wait(timeout=timeout)
+
     def get_connection(self) -> AbstractContextManager[Connection]:
-        return self.get_pool().connection()
+        return self._checkout()
+
+    @contextmanager
+    def _checkout(self) -> Iterator[Connection]:
+        pool = self.get_pool()
+        stats = pool.get_stats()
+        exhausted = stats.get('pool_available', 0) == 0 and stats.get('pool_size', 0) >= stats.get('pool_max', 0)
+        requested = time.perf_counter()
+        with pool.connection() as conn:
+            acquired = time.perf_counter()
+            try:
+                yield conn
+            finally:
+                released = time.perf_counter()
+                self.metrics.record_checkout((acquired - requested) * 1000, (released - acquired) * 1000, exhausted)
 
     def get_max_connections(self) -> int:
         return self.get_pool().max_size
 
+    def metrics_summary(self) -> str:
+        stats = self._pool.get_stats() if self._pool is not None else {}
+        waiting = f", {stats.get('requests_waiting', 0)} requests queued now" if stats else ""
+        return f"DB pool {self.db_name} ({self.config.min_size}-{self.config.max_size}): {self.metrics.summary()}{waiting}"
+
     def close_all_connections(self) -> None:
         if self._pool:
             self._pool.close()
@@ -52,4 +201,4 @@ class DatabasePoolSingleton:
 
 # Create/Retrieve the specific instances
 db_pool_instance = DatabasePoolSingleton(os.getenv('SECRET_DATABASE_NAME'))
-db_pool_instance_bt = DatabasePoolSingleton(os.getenv('SECRET_DATABASE_NAME_BT'))
\ No newline at end of file
+db_pool_instance_bt = DatabasePoolSingleton(os.getenv('SECRET_DATABASE_NAME_BT'))
@@ -0,0 +1,47 @@
+import importlib.util
+import httpx
+
+HTTP_TIMEOUT_SECONDS = 30.0
+HTTP_MAX_CONNECTIONS = 20
+HTTP_MAX_KEEPALIVE = 10
+
+# HTTP/2 needs the optional 'h2' package; without it httpx talks HTTP/1.1 over the same pooled connections.
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+class HttpClientSingleton:
+    _client: httpx.Client | None = None
+
+    def __init__(self, max_connections: int = HTTP_MAX_CONNECTIONS, max_keepalive: int = HTTP_MAX_KEEPALIVE, http2: bool = False, headers: dict | None = None) -> None:
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.headers = headers or {}
+
+    def _options(self) -> dict:
+        return dict(
+            timeout=HTTP_TIMEOUT_SECONDS,
+            follow_redirects=True,
+            http2=self.http2,
+            headers={'Accept-Encoding': 'gzip, deflate', **self.headers},
+            limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_keepalive),
+        )
+
+    def get_client(self) -> httpx.Client:
+        if self._client is None:
+            # One pooled, thread-safe client - connections are kept alive and reused across calls.
+            self._client = httpx.Client(**self._options())
+        return self._client
+
+    def new_async_client(self) -> httpx.AsyncClient:
+        """An AsyncClient with the same options, for the caller to open and close (async with) on its own event loop.
+        AsyncClients are bound to one loop, so they are not shared."""
+        return httpx.AsyncClient(**self._options())
+
+    def close(self) -> None:
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+
+# Create the single instance used for holdings file downloads
+http_client_instance = HttpClientSingleton()
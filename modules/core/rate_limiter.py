@@ -0,0 +1,96 @@
+import asyncio
+import os
+import sqlite3
+import time
+from threading import Lock
+
+# Reservation-based token bucket. A caller reserves its tokens under the lock and gets back how long to wait;
+# the wait itself happens outside the lock, so other callers can queue their own reservations meanwhile.
+# Set RATE_LIMIT_PATH to an SQLite file to share one bucket between processes (cron, back-test, scripts).
+
+RATE_LIMIT_PATH = os.environ.get("RATE_LIMIT_PATH")
+RATE_LIMIT_BURST = int(os.environ.get("RATE_LIMIT_BURST", "10"))
+
+
+class RateLimiter:
+
+    def __init__(self, name: str, calls_per_window: int, window_seconds: float = 60.0, burst: int = RATE_LIMIT_BURST, weights: dict[str, int] | None = None, path: str | None = RATE_LIMIT_PATH) -> None:
+        # Any window holds at most burst + rate * window calls, so the refill rate leaves room for the burst.
+        self.name = name
+        self.burst = float(max(1, min(burst, calls_per_window)))
+        self.rate = (calls_per_window - self.burst) / window_seconds if calls_per_window > self.burst else calls_per_window / window_seconds
+        self.weights = weights or {}
+        self._lock = Lock()
+        self._tokens = self.burst
+        self._updated_at = time.time()
+        self._path = path
+        self._db: sqlite3.Connection | None = None
+        self.waited_seconds = 0.0
+
+    def weight(self, endpoint: str) -> int:
+        return self.weights.get(endpoint, 1)
+
+    def reserve(self, weight: int = 1) -> float:
+        """Take `weight` tokens, going into debt if needed. Returns the seconds to wait before making the call."""
+        with self._lock:
+            delay = None
+            if self._path is not None:
+                try:
+                    delay = self._reserve_shared(weight)
+                except sqlite3.Error as e:
+                    print(f"Shared rate limit state unavailable, limiting this process only: {e}")
+                    self._path = None
+            if delay is None:
+                self._tokens, self._updated_at, delay = self._take(self._tokens, self._updated_at, weight, time.time())
+            self.waited_seconds += delay
+            return delay
+
+    def acquire(self, endpoint: str = '') -> None:
+        delay = self.reserve(self.weight(endpoint))
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, endpoint: str = '') -> None:
+        # The shared bucket waits on the SQLite write lock (BEGIN IMMEDIATE), so it is reserved off the event loop.
+        if self._path is not None:
+            delay = await asyncio.to_thread(self.reserve, self.weight(endpoint))
+        else:
+            delay = self.reserve(self.weight(endpoint))
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    # ── internals (called with the lock held) ──
+
+    def _take(self, tokens: float, updated_at: float, weight: int, now: float) -> tuple[float, float, float]:
+        tokens = min(self.burst, tokens + max(0.0, now - updated_at) * self.rate) - weight
+        delay = -tokens / self.rate if tokens < 0 else 0.0
+        return tokens, now, delay
+
+    def _reserve_shared(self, weight: int) -> float:
+        db = self._shared()
+        # BEGIN IMMEDIATE takes the file's write lock, so the read-modify-write is atomic across processes.
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            row = db.execute("SELECT tokens, updated_at FROM bucket WHERE name = ?", (self.name,)).fetchone()
+            tokens, updated_at = row if row else (self.burst, now)
+            tokens, updated_at, delay = self._take(tokens, updated_at, weight, now)
+            db.execute("INSERT OR REPLACE INTO bucket (name, tokens, updated_at) VALUES (?, ?, ?)", (self.name, tokens, updated_at))
+            db.execute("COMMIT")
+            return delay
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+
+    def _shared(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self._path or '', timeout=10, isolation_level=None, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS bucket (name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)")
+        return self._db
@@ -0,0 +1,151 @@
+import json
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any
+
+# Response cache for the market data API: keyed by endpoint + normalised params, per-endpoint TTL,
+# an in-memory LRU and an optional SQLite file shared between runs (and processes) - set FMP_CACHE_PATH.
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# Seconds a response stays valid. Endpoints not listed (quotes, FX) are never cached.
+ENDPOINT_TTL: dict[str, int] = {
+    'profile': 12 * HOUR,  # carries today's price / market cap - good for one cron run, not the next day's
+    'search-isin': 7 * DAY,
+    'search-symbol': 7 * DAY,
+    'search-name': 7 * DAY,
+    'available-exchanges': 7 * DAY,
+    'esg-disclosures': 7 * DAY,
+    'esg-ratings': 7 * DAY,
+    'financial-growth': 7 * DAY,
+    'income-statement': 7 * DAY,
+    'cash-flow-statement': 7 * DAY,
+    'ratios-ttm': DAY,
+    'key-metrics-ttm': DAY,
+    'company-screener': DAY,
+    'dividends': DAY,
+    'splits': DAY,
+    'historical-price-eod/light': DAY,
+    'historical-market-capitalization': DAY,
+}
+
+MAX_MEMORY_ENTRIES = int(os.environ.get("FMP_CACHE_MAX_ENTRIES", "20000"))
+CACHE_PATH = os.environ.get("FMP_CACHE_PATH")
+
+
+class ResponseCache:
+
+    def __init__(self, max_entries: int = MAX_MEMORY_ENTRIES, path: str | None = CACHE_PATH) -> None:
+        self._lock = Lock()
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._max_entries = max_entries
+        self._path = path
+        self._db: sqlite3.Connection | None = None
+        self.hits: dict[str, int] = {}
+        self.misses: dict[str, int] = {}
+
+    @staticmethod
+    def make_key(endpoint: str, params: dict) -> str:
+        normalised = sorted((k, str(v).strip().upper() if k in ('symbol', 'isin') else str(v).strip()) for k, v in params.items() if v is not None)
+        return f"{endpoint}?{'&'.join(f'{k}={v}' for k, v in normalised)}"
+
+    def ttl(self, endpoint: str) -> int:
+        return ENDPOINT_TTL.get(endpoint, 0)
+
+    def get(self, endpoint: str, key: str) -> tuple[bool, Any]:
+        if self.ttl(endpoint) <= 0:
+            return False, None
+
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                self._count(self.hits, endpoint)
+                return True, entry[1]
+
+            disk = self._disk_get(key, now)
+            if disk is not None:
+                self._remember(key, disk)
+                self._count(self.hits, endpoint)
+                return True, disk[1]
+
+            if entry:
+                del self._entries[key]
+            self._count(self.misses, endpoint)
+            return False, None
+
+    def put(self, endpoint: str, key: str, value: Any) -> None:
+        ttl = self.ttl(endpoint)
+        # Errors and empty answers are not cached - they are often transient.
+        if ttl <= 0 or not value:
+            return
+
+        entry = (time.time() + ttl, value)
+        with self._lock:
+            self._remember(key, entry)
+            self._disk_put(key, entry)
+
+    def summary(self) -> str:
+        hits, misses = sum(self.hits.values()), sum(self.misses.values())
+        total = hits + misses
+        rate = f"{100.0 * hits / total:.1f}%" if total else "n/a"
+        return f"API response cache: {hits} hits / {misses} misses ({rate}), {len(self._entries)} entries in memory"
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    # ── internals (called with the lock held) ──
+
+    def _remember(self, key: str, entry: tuple[float, Any]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def _count(counter: dict[str, int], endpoint: str) -> None:
+        counter[endpoint] = counter.get(endpoint, 0) + 1
+
+    def _disk(self) -> sqlite3.Connection | None:
+        if self._path is None:
+            return None
+        if self._db is None:
+            self._db = sqlite3.connect(self._path, timeout=10, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS response (key TEXT PRIMARY KEY, expires_at REAL NOT NULL, body TEXT NOT NULL)")
+            self._db.execute("DELETE FROM response WHERE expires_at <= ?", (time.time(),))
+            self._db.commit()
+        return self._db
+
+    def _disk_get(self, key: str, now: float) -> tuple[float, Any] | None:
+        try:
+            db = self._disk()
+            if db is None:
+                return None
+            row = db.execute("SELECT expires_at, body FROM response WHERE key = ? AND expires_at > ?", (key, now)).fetchone()
+            return (row[0], json.loads(row[1])) if row else None
+        except sqlite3.Error as e:
+            print(f"Response cache read failed, continuing without it: {e}")
+            return None
+
+    def _disk_put(self, key: str, entry: tuple[float, Any]) -> None:
+        try:
+            db = self._disk()
+            if db is None:
+                return
+            db.execute("INSERT OR REPLACE INTO response (key, expires_at, body) VALUES (?, ?, ?)", (key, entry[0], json.dumps(entry[1])))
+            db.commit()
+        except sqlite3.Error as e:
+            print(f"Response cache write failed, continuing without it: {e}")
+
+
+# Create the single instance of ResponseCache
+response_cache = ResponseCache()
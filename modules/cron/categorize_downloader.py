@@ -33,15 +33,7 @@ def run() -> int:
                 )
                 log.record_status(f"Resolving tickers for ETF '{etf.name}'...")
                 resolver.set_classification(etf.style_type, etf.cap_type)
-                df['cat_ticker_id'] = df.apply(
-                    lambda row: resolver.resolve(
-                        region=etf.region or 'US',
-                        symbol=row.get('ticker'),
-                        isin=row.get('isin'),
-                        name=row.get('name'),
-                    ),
-                    axis=1,
-                )
+                df['cat_ticker_id'] = resolver.resolve_many(etf.region or 'US', df)
                 cat_ticker_ids = df['cat_ticker_id'].dropna().astype(int).tolist()
                 categorize_etf_holding.insert_holding(etf.id, date.today(), cat_ticker_ids)
                 categorize_etf.update_last_download(etf.id)
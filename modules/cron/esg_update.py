@@ -1,7 +1,10 @@
 import log
 from modules.object import batch_run
 from modules.object.ticker import fetch_all_valid
-from modules.ticker.resolver import populate_esg, TickerResolver
+from modules.ticker.resolver import populate_esg_many, TickerResolver
+
+# Tickers per round of concurrent ESG calls.
+ESG_CHUNK_SIZE = 100
 
 
 def run() -> int:
@@ -10,11 +13,14 @@ def run() -> int:
     tickers = fetch_all_valid()
     log.record_status(f"ESG update: refreshing {len(tickers)} tickers.")
 
-    count = 0
+    pairs: list[tuple[int, str]] = []
     for t in tickers:
         assert t.id is not None
-        populate_esg(t.id, resolver.get_full_symbol(t))
-        count += 1
+        pairs.append((t.id, resolver.get_full_symbol(t)))
+
+    count = 0
+    for i in range(0, len(pairs), ESG_CHUNK_SIZE):
+        count += populate_esg_many(pairs[i:i + ESG_CHUNK_SIZE])
 
     batch_run.update_completed_at(batch_run_id)
     log.record_status(f"ESG update complete: {count} tickers refreshed.")
@@ -1,14 +1,18 @@
+import asyncio
 import log
 import os
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, wait
 from modules.object import batch_run, ticker
 from modules.object import categorize_ticker as cat_ticker_obj
-from modules.parse.download import process_provider
+from modules.parse.download import EtfStats, process_provider, process_providers_async
 from modules.object import provider
 from modules.calc import classification
+from modules.ticker.resolver import TickerResolver
 
 MAX_WORKERS = 5
+# Shared-browser asyncio pipeline; set ASYNC_DOWNLOADER=0 to fall back to a thread (and browser) per provider.
+ASYNC_DOWNLOADER = os.environ.get("ASYNC_DOWNLOADER", "1") == "1"
 
 def run(start_time: datetime) -> tuple[str, int, list[int] | None]:
     try:
@@ -20,14 +24,23 @@ def run(start_time: datetime) -> tuple[str, int, list[int] | None]:
 
         log.record_status(f"Running ETF Downloader batch job ID {batch_run_id} - will proccess {len(to_scrape)} items.")
 
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            future_to_provider = {executor.submit(process_provider, item): item for item in to_scrape}
-            wait(future_to_provider)
+        if ASYNC_DOWNLOADER:
+            results = asyncio.run(process_providers_async(to_scrape, max_providers=MAX_WORKERS))
+        else:
+            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+                futures = [executor.submit(process_provider, item) for item in to_scrape]
+                wait(futures)
+            results = [f.exception() or f.result() for f in futures]
+
+        failed_providers = [p.name for p, r in zip(to_scrape, results) if isinstance(r, BaseException)]
+        etf_stats: list[EtfStats] = [s for r in results if not isinstance(r, BaseException) for s in r]
 
-        failed_providers = [p.name for f, p in future_to_provider.items() if f.exception() is not None]
         if failed_providers:
             log.record_error(f"{len(failed_providers)} provider(s) failed during collection: {', '.join(str(n) for n in failed_providers)}")
 
+        # Tickers answered from the shared index skipped their profile call - refresh today's values once for all providers.
+        TickerResolver(TickerResolver.POPULATE_TICKER).refresh_ticker_values()
+
         ## -- Classification ---
         ticker.update_style_for_unclassified()
         ticker.update_style_from_provider_etfs()
@@ -53,6 +66,12 @@ def run(start_time: datetime) -> tuple[str, int, list[int] | None]:
             else:
                 stats_downloader += "{:<8}{:<20}{}\n".format(line['id'], f"{line['downloaded']} out of {line['available']}", line['name'])
 
+        skipped = [s for s in etf_stats if s.skipped]
+        if skipped:
+            stats_downloader += f"\nUnchanged since last download, not re-processed: {len(skipped)}\n"
+            for s in skipped:
+                stats_downloader += "{:<8}{:<20}{}\n".format(s.etf_id or '', s.skipped, s.etf_name)
+
         log.record_status(f"Finished ETF Downloader batch run on {len(to_scrape)} items.\n{stats_downloader}")
 
         return stats_downloader, total_downloaded, provider_ids
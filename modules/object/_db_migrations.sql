@@ -0,0 +1,10 @@
+-- Changes to an existing database that _db_schema.sql already includes for new ones.
+-- Run each block once, in order; every statement is safe to run again.
+
+-- provider_etf: direct-HTTP holdings download and unchanged-file skip
+ALTER TABLE public.provider_etf ADD COLUMN IF NOT EXISTS download_capture jsonb;
+ALTER TABLE public.provider_etf ADD COLUMN IF NOT EXISTS last_file_hash text;
+ALTER TABLE public.provider_etf ADD COLUMN IF NOT EXISTS last_holding_date date;
+
+-- provider_etf: captures no longer keep the browser's session cookies
+UPDATE public.provider_etf SET download_capture = download_capture - 'cookies' WHERE download_capture ? 'cookies';
@@ -601,7 +601,10 @@ CREATE TABLE public.provider_etf (
     mapping jsonb,
     file_format character varying(10),
     last_downloaded timestamp without time zone,
-    benchmark_id integer REFERENCES public.benchmark(id) ON UPDATE CASCADE ON DELETE SET NULL
+    benchmark_id integer REFERENCES public.benchmark(id) ON UPDATE CASCADE ON DELETE SET NULL,
+    download_capture jsonb,
+    last_file_hash text,
+    last_holding_date date
 );
 
 
@@ -5,6 +5,7 @@ from psycopg.rows import class_row, dict_row
 import pandas as pd
 from dataclasses import dataclass, asdict
 from modules.core.db import db_pool_instance
+from modules.core import bulk
 
 @dataclass
 class BestIdea:
@@ -36,28 +37,17 @@ def insert_bulk(rows: list[tuple]) -> None:
     if not rows:
         return
 
-    query = """
-        INSERT INTO best_idea
-            (provider_etf_id, ticker_id, value_date, etf_weight, benchmark_weight, delta, ranking, benchmark_mode)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        ON CONFLICT (provider_etf_id, ticker_id, value_date, benchmark_mode)
-        DO UPDATE
-        SET
-            etf_weight = EXCLUDED.etf_weight,
-            benchmark_weight = EXCLUDED.benchmark_weight,
-            delta = EXCLUDED.delta,
-            ranking = EXCLUDED.ranking
-        WHERE
-            best_idea.etf_weight IS DISTINCT FROM EXCLUDED.etf_weight
-            OR best_idea.benchmark_weight IS DISTINCT FROM EXCLUDED.benchmark_weight
-            OR best_idea.delta IS DISTINCT FROM EXCLUDED.delta
-            OR best_idea.ranking IS DISTINCT FROM EXCLUDED.ranking;
-    """
-
     try:
         with db_pool_instance.get_connection() as conn:
             with conn.cursor() as cur:
-                cur.executemany(query, rows)
+                bulk.upsert(
+                    cur, "best_idea",
+                    ["provider_etf_id", "ticker_id", "value_date", "etf_weight", "benchmark_weight", "delta", "ranking", "benchmark_mode"],
+                    rows,
+                    conflict=["provider_etf_id", "ticker_id", "value_date", "benchmark_mode"],
+                    update=["etf_weight", "benchmark_weight", "delta", "ranking"],
+                    only_changed=True,
+                )
     except Error as e:
         raise Exception(f"Error inserting Best Ideas in bulk: {e}")
 
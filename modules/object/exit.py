@@ -1,4 +1,13 @@
 from modules.core.db import db_pool_instance
+from modules.core.http_client import http_client_instance
+from modules.core.api_stocks import api_client_instance, api_rate_limiter
+from modules.core.response_cache import response_cache
+from modules.object.log import log_writer
 
 def cleanup() -> None:
+    http_client_instance.close()
+    api_client_instance.close()
+    api_rate_limiter.close()
+    response_cache.close()
+    log_writer.close()
     db_pool_instance.close_all_connections()
@@ -1,7 +1,14 @@
+import os
+import queue
+import random
 import sys
+import time
+import multiprocessing
+from threading import Lock, Thread
 from psycopg.errors import Error
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from modules.core import bulk
 from modules.core.db import db_pool_instance
 
 @dataclass
@@ -28,3 +35,112 @@ def insert(item: Log) -> int | None:
         return None
 
 
+# ── background writer ──
+
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
+LOG_BATCH_SIZE = int(os.environ.get("LOG_BATCH_SIZE", "500"))
+LOG_FLUSH_SECONDS = float(os.environ.get("LOG_FLUSH_SECONDS", "1.0"))
+LOG_ERROR_WAIT_SECONDS = 1.0
+
+# Share of messages per level that is stored in the DB (all are still printed). Errors are always stored.
+LOG_SAMPLE_RATE = {
+    'status': float(os.environ.get("LOG_SAMPLE_STATUS", "1.0")),
+    'notice': float(os.environ.get("LOG_SAMPLE_NOTICE", "1.0")),
+}
+
+LOG_COLUMNS = ["created_at", "process", "log_type", "code", "msg"]
+
+_FLUSH = object()
+
+
+class LogWriter:
+    """Queues log rows and writes them in batches from one worker thread, on one pooled connection at a time.
+
+    A full queue drops status / notice rows rather than block the caller; errors wait briefly for room first.
+    Spawned worker processes (no atexit there) write synchronously instead.
+    """
+
+    def __init__(self) -> None:
+        self._queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        self._lock = Lock()
+        self._worker: Thread | None = None
+        self._closed = False
+        self.dropped = 0
+        self.sampled_out = 0
+
+    def submit(self, item: Log) -> None:
+        print(item.msg)
+        rate = LOG_SAMPLE_RATE.get(item.log_type, 1.0)
+        if rate < 1.0 and random.random() >= rate:
+            self.sampled_out += 1
+            return
+
+        if self._closed or multiprocessing.parent_process() is not None:
+            self._write([item])
+            return
+
+        self._start()
+        if item.created_at is None:
+            item.created_at = datetime.now(timezone.utc).replace(tzinfo=None)
+        try:
+            if item.log_type == 'error':
+                self._queue.put(item, timeout=LOG_ERROR_WAIT_SECONDS)
+            else:
+                self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self) -> None:
+        """Block until everything queued so far is written."""
+        if self._worker is not None and self._worker.is_alive():
+            self._queue.put(_FLUSH)
+            self._queue.join()
+
+    def close(self) -> None:
+        self.flush()
+        self._closed = True
+        if self.dropped or self.sampled_out:
+            print(f"[LOG] {self.dropped} log rows dropped on a full queue, {self.sampled_out} sampled out.", file=sys.stderr)
+
+    def _start(self) -> None:
+        if self._worker is None:
+            with self._lock:
+                if self._worker is None:
+                    self._worker = Thread(target=self._run, name='log-writer', daemon=True)
+                    self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            batch: list[Log] = []
+            markers = 0
+            deadline = time.monotonic() + LOG_FLUSH_SECONDS
+            while len(batch) < LOG_BATCH_SIZE:
+                try:
+                    entry = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if entry is _FLUSH:
+                    markers += 1
+                    break
+                batch.append(entry)
+
+            if batch:
+                self._write(batch)
+            for _ in range(len(batch) + markers):
+                self._queue.task_done()
+
+    @staticmethod
+    def _write(batch: list[Log]) -> None:
+        try:
+            with db_pool_instance.get_connection() as conn:
+                with conn.cursor() as cur:
+                    bulk.insert(cur, "log", LOG_COLUMNS, [
+                        (i.created_at or datetime.now(timezone.utc).replace(tzinfo=None), i.process, i.log_type, None if i.code is None else str(i.code), i.msg)
+                        for i in batch
+                    ])
+        except Error as e:
+            print(f"[LOG DB ERROR] {e} | {len(batch)} log rows lost, first: {batch[0].msg}", file=sys.stderr)
+
+
+# Create the single instance of LogWriter
+log_writer = LogWriter()
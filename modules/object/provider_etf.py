@@ -1,7 +1,8 @@
+import json
 from datetime import date, datetime, timezone
 from psycopg.errors import Error
 from psycopg.rows import class_row
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from modules.core.db import db_pool_instance
 from modules.object.provider import Provider 
 
@@ -32,6 +33,9 @@ class ProviderEtf:
     file_format: str | None
     last_downloaded: datetime | None
     benchmark_id: int | None = None
+    download_capture: dict | None = None
+    last_file_hash: str | None = None
+    last_holding_date: date | None = None
 
 @dataclass
 class EtfDownload:
@@ -40,6 +44,9 @@ class EtfDownload:
     file_name: str | None
     data: bytes | None
     date_from_page: date | None = None
+    timings: list[tuple[str, int]] = field(default_factory=list)
+    not_modified: bool = False
+    capture: dict | None = None
 
 def fetch_by_id(id: int) -> ProviderEtf:
     with db_pool_instance.get_connection() as conn:
@@ -79,3 +86,23 @@ def update_last_download(id: int) -> None:
     
     except Error as e:
         raise Exception(f"Error updating the Provider item in the DB: {e}")
+
+
+def update_download_capture(id: int, capture: dict | None) -> None:
+    try:
+        with db_pool_instance.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("UPDATE provider_etf SET download_capture = %s WHERE id = %s;", (json.dumps(capture) if capture else None, id))
+
+    except Error as e:
+        raise Exception(f"Error updating the Provider ETF download capture in the DB: {e}")
+
+
+def update_last_ingest(id: int, file_hash: str, holding_date: date | None) -> None:
+    try:
+        with db_pool_instance.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("UPDATE provider_etf SET last_file_hash = %s, last_holding_date = %s WHERE id = %s;", (file_hash, holding_date, id))
+
+    except Error as e:
+        raise Exception(f"Error updating the Provider ETF last ingest in the DB: {e}")
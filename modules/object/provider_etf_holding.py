@@ -4,6 +4,7 @@ from psycopg.errors import Error
 from psycopg.rows import class_row
 from dataclasses import dataclass
 from modules.core.db import db_pool_instance
+from modules.core import bulk
 import pandas as pd
 
 @dataclass
@@ -101,22 +102,10 @@ def insert_all_holdings(etf_id: int, df: pd.DataFrame) -> None:
             "market_value",
             "weight"
         ]]
-        rows = list(df.itertuples(index=False, name=None)).copy()
 
         with db_pool_instance.get_connection() as conn:
             with conn.cursor() as cur:
-                delete_query = """
-                    DELETE FROM provider_etf_holding peh
-                    WHERE peh.provider_etf_id = %s
-                    AND peh.holding_date = %s;
-                """
-                cur.execute(delete_query, (etf_id, df["holding_date"].iat[0]))
-                insert_query = """
-                    INSERT INTO provider_etf_holding
-                        (provider_etf_id, holding_date, ticker_id, shares, market_value, weight)
-                    VALUES (%s, %s, %s, %s, %s, %s);
-                """
-                cur.executemany(insert_query, rows)
+                bulk.replace(cur, "provider_etf_holding", list(df.columns), df, key=["provider_etf_id", "holding_date"])
 
     except Error as e:
         raise Exception(f"Error inserting the Provider ETF Holdings into the DB: {e}")
@@ -62,6 +62,19 @@ def fetch_all_for_isin_cache() -> dict[str, int | None]:
     except Error as e:
         raise Exception(f"Error fetching all ISINs for cache: {e}")
 
+def fetch_for_index(since: datetime | None = None) -> list[tuple]:
+    """Return (id, created_at, symbol, exchange, isin, invalid) rows, optionally only those created since a time."""
+    try:
+        with db_pool_instance.get_connection() as conn:
+            with conn.cursor() as cur:
+                if since is None:
+                    cur.execute('SELECT id, created_at, symbol, exchange, isin, invalid FROM ticker ORDER BY created_at;')
+                else:
+                    cur.execute('SELECT id, created_at, symbol, exchange, isin, invalid FROM ticker WHERE created_at >= %s ORDER BY created_at;', (since,))
+                return cur.fetchall()
+    except Error as e:
+        raise Exception(f"Error fetching tickers for the index: {e}")
+
 def fetch_by_symbols(symbols: list[str]) -> list[Ticker]:
     try:
         with db_pool_instance.get_connection() as conn:
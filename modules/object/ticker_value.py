@@ -5,6 +5,7 @@ from psycopg.rows import class_row, dict_row
 import pandas as pd
 from dataclasses import dataclass, asdict
 from modules.core.db import db_pool_instance
+from modules.core import bulk
 
 @dataclass
 class TickerValue:
@@ -69,27 +70,13 @@ def upsert_bulk(items: List[TickerValue]) -> None:
     try:
         with db_pool_instance.get_connection() as conn:
             with conn.cursor() as cur:
-
-                insert_sql = """
-                    INSERT INTO ticker_value (
-                        ticker_id,
-                        value_date,
-                        stock_price,
-                        market_cap
-                    )
-                    VALUES (%s, %s, %s, %s)
-                    ON CONFLICT (ticker_id, value_date)
-                    DO UPDATE SET
-                        stock_price = EXCLUDED.stock_price,
-                        market_cap = EXCLUDED.market_cap;
-                """
-
-                insert_values = [
-                    (i.ticker_id, i.value_date, i.stock_price, i.market_cap)
-                    for i in items
-                ]
-
-                cur.executemany(insert_sql, insert_values)
+                bulk.upsert(
+                    cur, "ticker_value",
+                    ["ticker_id", "value_date", "stock_price", "market_cap"],
+                    [(i.ticker_id, i.value_date, i.stock_price, i.market_cap) for i in items],
+                    conflict=["ticker_id", "value_date"],
+                    update=["stock_price", "market_cap"],
+                )
 
             conn.commit()
 
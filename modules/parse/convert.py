@@ -8,7 +8,7 @@ import xlrd
 import pandas as pd
 from modules.core.util import clean_date
 from modules.ticker import util as tu
-from modules.object.provider import Mapping
+from modules.object.provider import Mapping, getMappingFromJson
 
 FILE_FOLDER = "./.downloads/"
 DECIMAL_PRECISION = 10
@@ -165,7 +165,8 @@ def convert_to_data_frame(full_rows: list[list[str]], mapping: Mapping) -> pd.Da
     df.columns = df.columns.str.replace('\ufeff', '', regex=True)
     return df
 
-def map_data(full_rows: list[list[str]], file_name:str, date_from_page: date | None, mapping: Mapping) -> pd.DataFrame:
+def frame_holdings(full_rows: list[list[str]], file_name:str, date_from_page: date | None, mapping: Mapping) -> pd.DataFrame:
+    """Map the raw rows onto the target columns and holding date - pure CPU work, no API or DB access."""
     df = convert_to_data_frame(full_rows=full_rows, mapping=mapping)
     
     good_date: date | None = None
@@ -215,7 +216,11 @@ def map_data(full_rows: list[list[str]], file_name:str, date_from_page: date | N
         df.loc[:, "holding_date"] = good_date
     else:
         df["holding_date"] = pd.to_datetime(df["holding_date"].tolist(), format=mapping.date.format, errors="coerce")
-    
+
+    return df
+
+def complete_holdings(df: pd.DataFrame, mapping: Mapping) -> pd.DataFrame:
+    """Fill missing tickers from alternate data (API lookups), then clean, filter and aggregate the holdings."""
     missing_mask = df['ticker'].isna() | (df['ticker'].astype(str).str.strip() == '')
     if missing_mask.any():
         has_isin = 'isin' in df.columns
@@ -275,6 +280,10 @@ def map_data(full_rows: list[list[str]], file_name:str, date_from_page: date | N
 
     return df    
 
+def map_data(full_rows: list[list[str]], file_name:str, date_from_page: date | None, mapping: Mapping) -> pd.DataFrame:
+    df = frame_holdings(full_rows=full_rows, file_name=file_name, date_from_page=date_from_page, mapping=mapping)
+    return complete_holdings(df, mapping)
+
 def get_tickers(full_rows: list[list[str]], mapping: Mapping) -> list[str]:
     df = convert_to_data_frame(full_rows=full_rows, mapping=mapping)
     ticker_col_name = mapping.columns['ticker']
@@ -320,3 +329,10 @@ def load(etf_name: str | None, file_format: str | None, mapping: Mapping | None,
     except Exception as e:
         raise Exception(f"Failed to convert downloaded ETF ({etf_name}) to Data Frame table data: {e}")
 
+
+
+def parse_holdings(etf_name: str | None, file_format: str | None, mapping: dict, file_name: str, raw_data: bytes, date_from_page: date | None) -> pd.DataFrame:
+    """Process pool entry point: raw file bytes to framed holdings. Top-level and picklable; finish with complete_holdings()."""
+    map_obj = getMappingFromJson(mapping)
+    full_rows = load(etf_name=etf_name, file_format=file_format, mapping=map_obj, file_name=file_name, raw_data=raw_data)
+    return frame_holdings(full_rows=full_rows, file_name=file_name, date_from_page=date_from_page, mapping=map_obj)
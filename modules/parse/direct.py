@@ -0,0 +1,103 @@
+import log
+import os
+import re
+from datetime import datetime, timezone
+from email.message import Message
+from urllib.parse import unquote, urlparse
+import httpx
+from modules.core.http_client import http_client_instance
+from modules.object.provider import Provider, getMappingFromJson
+from modules.object.provider_etf import EtfDownload, ProviderEtf
+
+# Direct-HTTP fast path for holdings files served from a stable URL.
+# The first browser download records the file URL and request headers (provider_etf.download_capture);
+# later runs fetch that URL with a conditional GET and only fall back to the browser when this fails.
+# Session cookies are never stored: a file that needs them fails the direct fetch and the browser gets fresh ones.
+
+DIRECT_DOWNLOAD = os.environ.get("DIRECT_DOWNLOAD", "1") == "1"
+
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+
+
+def capture_download(url: str, referer: str, user_agent: str, file_name: str | None) -> dict | None:
+    """Describe a browser download so it can be replayed over plain HTTP. Blob / data URLs cannot be replayed."""
+    if not url.startswith(('http://', 'https://')):
+        return None
+
+    return {
+        'url': url,
+        'headers': {'Referer': referer, 'User-Agent': user_agent},
+        'file_name': file_name,
+        'etag': None,
+        'last_modified': None,
+        'captured_at': datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def can_fetch_direct(cp: Provider, etf: ProviderEtf) -> bool:
+    if not DIRECT_DOWNLOAD or not etf.download_capture or not etf.download_capture.get('url'):
+        return False
+
+    # A holdings date read from the page needs the page.
+    mapping = etf.mapping or cp.mapping
+    if mapping and getMappingFromJson(mapping).date.on_page:
+        return False
+
+    return True
+
+
+def _file_name_from_response(response: httpx.Response) -> str | None:
+    disposition = response.headers.get('content-disposition')
+    if disposition:
+        msg = Message()
+        msg['content-disposition'] = disposition
+        name = msg.get_filename()
+        if name:
+            return name
+
+    path_name = unquote(os.path.basename(urlparse(str(response.url)).path))
+    return path_name if re.search(r'\.(csv|xlsx?|txt)$', path_name, re.IGNORECASE) else None
+
+
+def fetch_direct(cp: Provider, etf: ProviderEtf) -> EtfDownload | None:
+    """Fetch the holdings file over HTTP. Returns None when the browser is needed."""
+    capture = dict(etf.download_capture or {})
+    capture.pop('cookies', None)  # stored by older captures
+    headers = dict(capture.get('headers') or {})
+    if capture.get('etag'):
+        headers['If-None-Match'] = capture['etag']
+    if capture.get('last_modified'):
+        headers['If-Modified-Since'] = capture['last_modified']
+
+    try:
+        response = http_client_instance.get_client().get(capture['url'], headers=headers)
+
+        if response.status_code == 304:
+            log.record_status(f"ETF '{etf.name}' - [{etf.id}] holdings file not modified since last download.")
+            return EtfDownload(provider=cp, etf=etf, file_name=capture.get('file_name'), data=None, not_modified=True, capture=capture)
+
+        if response.status_code != 200:
+            raise Exception(f"HTTP {response.status_code}")
+
+        content_type = response.headers.get('content-type', '').split(';')[0].strip().lower()
+        if content_type in HTML_CONTENT_TYPES or not response.content:
+            raise Exception(f"Got '{content_type or 'empty'}' content instead of a holdings file")
+
+        file_name = _file_name_from_response(response)
+        mapping = etf.mapping or cp.mapping
+        if file_name is None:
+            # A captured name goes stale when the date is part of it.
+            if mapping and getMappingFromJson(mapping).date.in_file_name:
+                raise Exception("No file name in response and the holdings date is read from the file name")
+            file_name = capture.get('file_name')
+
+        capture['file_name'] = file_name
+        capture['etag'] = response.headers.get('etag')
+        capture['last_modified'] = response.headers.get('last-modified')
+
+        log.record_status(f"ETF '{etf.name}' - [{etf.id}] holdings fetched directly in {int(response.elapsed.total_seconds() * 1000)}ms")
+        return EtfDownload(provider=cp, etf=etf, file_name=file_name, data=response.content, capture=capture)
+
+    except Exception as e:
+        log.record_notice(f"Direct download failed for ETF '{etf.name}' - [{etf.id}], falling back to the browser: {e}")
+        return None
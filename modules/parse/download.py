@@ -1,15 +1,22 @@
+import asyncio
 import log
+import multiprocessing
 import os
+import pandas as pd
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from modules.core import sender
-from modules.core.util import get_domain_from_url
+from modules.core.util import get_domain_from_url, get_file_hash
 from modules.object.provider import Provider, update_domain, getMappingFromJson
-from modules.object.provider_etf import update_last_download
+from modules.object.provider_etf import EtfDownload, update_last_download, update_download_capture, update_last_ingest
 from modules.object.provider_etf_holding import insert_all_holdings
 from modules.ticker.resolver import TickerResolver
 
-from modules.parse.url import scrape_provider
-from modules.parse.convert import load, map_data
+from modules.parse import url
+from modules.parse.convert import load, map_data, parse_holdings, complete_holdings
+
+PARSE_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
 
 
 @dataclass
@@ -21,6 +28,7 @@ class EtfStats:
     tickers: int = 0
     problem_tickers: list[str] = field(default_factory=list)
     error: str | None = None
+    skipped: str | None = None
 
     @property
     def problems(self) -> int:
@@ -31,7 +39,7 @@ class EtfStats:
         return 100.0 * self.tickers / self.holdings if self.holdings else 0.0
 
 
-def process_provider(provider: Provider, save_dir: str | None = None) -> list[EtfStats]:
+def _ensure_domain(provider: Provider) -> None:
     if provider.id is None or provider.url_start is None:
         raise Exception("Missing data in DB for provider scraping.")
 
@@ -44,56 +52,97 @@ def process_provider(provider: Provider, save_dir: str | None = None) -> list[Et
         sender.send_admin(subject=f"Failed to get Domain from URL", message=f"Failed to parse web age URL {provider.url_start} and get the domain.")
         raise Exception(f"Failed to get Domain from URL.")
 
-    try:
-        log.record_status(f"Starting to collect holdings from provider '{provider.name}'")
 
-        downloads = scrape_provider(provider)
+def _save_download(d: EtfDownload, save_dir: str | None) -> None:
+    if save_dir and d.data:
+        file_name = f"{d.etf.id} - {d.etf.region} - {d.file_name}"
+        with open(os.path.join(save_dir, file_name), 'wb') as f:
+            f.write(d.data)
+
+
+def store_holdings(d: EtfDownload, df: pd.DataFrame, resolver: TickerResolver, etf_stat: EtfStats) -> None:
+    """Resolve the tickers of mapped holdings and store them for the ETF."""
+    if d.etf.id is None:
+        return
+
+    etf_stat.holdings = len(df)
+
+    log.record_status(f"Resolving tickers for ETF '{d.etf.name}'...")
+    df['ticker_id'] = resolver.resolve_many(d.etf.region, df)
+    etf_stat.tickers = int(df['ticker_id'].notna().sum())
+    etf_stat.problem_tickers = sorted(set(
+        df.loc[df['ticker_id'].isna(), 'ticker'].dropna().astype(str).tolist()
+    ))
+    log.record_status(f"ETF '{d.etf.name}': {etf_stat.tickers}/{etf_stat.holdings} holdings identified as tickers ({etf_stat.match_pct:.1f}%).")
+
+    df = df[df['ticker_id'].notna()]
+    insert_all_holdings(d.etf.id, df)
+    update_last_download(d.etf.id)
+    if d.data:
+        holding_date = pd.to_datetime(df['holding_date']).max() if len(df) else None
+        update_last_ingest(d.etf.id, get_file_hash(d.data), None if holding_date is None or pd.isna(holding_date) else holding_date.date())
+    if d.capture:
+        # Only a capture that led to a stored file is reused (and its ETag trusted) on the next run.
+        update_download_capture(d.etf.id, d.capture)
+
+
+def skip_reason(d: EtfDownload) -> str | None:
+    """Why this download needs no ingest: the server said 304, or the bytes and page date match the last stored file."""
+    if d.not_modified:
+        return "not modified"
+    if d.data and d.etf.last_file_hash and get_file_hash(d.data) == d.etf.last_file_hash:
+        # The same file under a new page date holds that date's holdings, so it is ingested again.
+        page_date = d.date_from_page.date() if isinstance(d.date_from_page, datetime) else d.date_from_page
+        if page_date is None or page_date == d.etf.last_holding_date:
+            return "unchanged file"
+    return None
+
+
+def keep_unchanged(d: EtfDownload, etf_stat: EtfStats, reason: str) -> None:
+    """The holdings stored last time are still current - only mark the ETF as downloaded."""
+    if d.etf.id is None:
+        return
+    etf_stat.skipped = reason
+    as_of = f" (holdings of {d.etf.last_holding_date})" if d.etf.last_holding_date else ""
+    log.record_status(f"ETF '{d.etf.name}' - [{d.etf.id}] skipped, {reason}{as_of}.")
+    update_last_download(d.etf.id)
+    if d.capture:
+        update_download_capture(d.etf.id, d.capture)
+
+
+def _collection_failed(provider: Provider, e: Exception) -> Exception:
+    message = f"The processing of the provider '{provider.name}' has not completed. {e}"
+    log.record_error(message)
+    sender.send_admin(subject="Failed holdings collection", message=message)
+    return Exception(message)
 
-        if len(downloads) == 0:
-            log.record_notice(f"No holdings downloads identified when scraping URL '{provider.name}'")
-            return []
 
-        log.record_status(f"Storing holdings for {len(downloads)} ETFs for analysis of provider '{provider.name}'.")
+def process_provider(provider: Provider, save_dir: str | None = None) -> list[EtfStats]:
+    _ensure_domain(provider)
+
+    try:
+        log.record_status(f"Starting to collect holdings from provider '{provider.name}'")
 
         stats: list[EtfStats] = []
         resolver = TickerResolver(TickerResolver.POPULATE_TICKER)
 
-        for d in downloads:
+        # Downloads stream in from the scrape workers - each is stored as soon as it arrives.
+        for d in url.scrape_provider(provider):
             etf_stat = EtfStats(etf_name=d.etf.name or '', etf_id=d.etf.id, etf_region=d.etf.region)
             if d.etf and d.etf.id:
                 try:
                     file_format = d.etf.file_format or d.provider.file_format
                     mapping = d.etf.mapping or d.provider.mapping
-                    if mapping and d.file_name and d.data:
-                        if save_dir:
-                            file_name = f"{d.etf.id} - {d.etf.region} - {d.file_name}"
-                            with open(os.path.join(save_dir, file_name), 'wb') as f:
-                                f.write(d.data)
+                    reason = skip_reason(d)
+                    if reason:
+                        keep_unchanged(d, etf_stat, reason)
+                    elif mapping and d.file_name and d.data:
+                        _save_download(d, save_dir)
 
                         map_obj = getMappingFromJson(mapping)
                         full_rows = load(etf_name=d.etf.name, file_format=file_format, mapping=map_obj, file_name=d.file_name, raw_data=d.data)
                         df = map_data(full_rows=full_rows, file_name=d.file_name, date_from_page=d.date_from_page, mapping=map_obj)
-                        etf_stat.holdings = len(df)
-
-                        log.record_status(f"Resolving tickers for ETF '{d.etf.name}'...")
-                        df['ticker_id'] = df.apply(
-                            lambda row: resolver.resolve(
-                                region=d.etf.region,
-                                symbol=row.get('ticker'),
-                                isin=row.get('isin'),
-                                name=row.get('name'),
-                            ),
-                            axis=1
-                        )
-                        etf_stat.tickers = int(df['ticker_id'].notna().sum())
-                        etf_stat.problem_tickers = sorted(set(
-                            df.loc[df['ticker_id'].isna(), 'ticker'].dropna().astype(str).tolist()
-                        ))
-                        log.record_status(f"ETF '{d.etf.name}': {etf_stat.tickers}/{etf_stat.holdings} holdings identified as tickers ({etf_stat.match_pct:.1f}%).")
-
-                        df = df[df['ticker_id'].notna()]
-                        insert_all_holdings(d.etf.id, df)
-                        update_last_download(d.etf.id)
+                        store_holdings(d, df, resolver, etf_stat)
 
                 except Exception as e:
                     etf_stat.error = str(e)
@@ -101,11 +150,87 @@ def process_provider(provider: Provider, save_dir: str | None = None) -> list[Et
 
             stats.append(etf_stat)
 
+        if len(stats) == 0:
+            log.record_notice(f"No holdings downloads identified when scraping URL '{provider.name}'")
+            return []
+
         log.record_status(f"Completed collection for the provider '{provider.name}'")
         return stats
 
     except Exception as e:
-        message = f"The processing of the provider '{provider.name}' has not completed. {e}"
-        log.record_error(message)
-        sender.send_admin(subject=f"Failed holdings collection", message=f"{message}")
-        raise Exception(message)
+        raise _collection_failed(provider, e)
+
+
+# ── asyncio pipeline ──
+# One browser for all providers; file parsing runs in a process pool while the next pages load.
+
+async def _ingest_download(d: EtfDownload, resolver: TickerResolver, parse_pool: ProcessPoolExecutor, store_lock: asyncio.Lock, save_dir: str | None) -> EtfStats:
+    etf_stat = EtfStats(etf_name=d.etf.name or '', etf_id=d.etf.id, etf_region=d.etf.region)
+    if d.etf and d.etf.id:
+        try:
+            file_format = d.etf.file_format or d.provider.file_format
+            mapping = d.etf.mapping or d.provider.mapping
+            reason = skip_reason(d)
+            if reason:
+                await asyncio.to_thread(keep_unchanged, d, etf_stat, reason)
+            elif mapping and d.file_name and d.data:
+                _save_download(d, save_dir)
+
+                loop = asyncio.get_running_loop()
+                df = await loop.run_in_executor(parse_pool, parse_holdings, d.etf.name, file_format, mapping, d.file_name, d.data, d.date_from_page)
+                map_obj = getMappingFromJson(mapping)
+
+                # API lookups and DB writes stay in this process, one ETF at a time per provider (shared resolver caches).
+                async with store_lock:
+                    df = await asyncio.to_thread(complete_holdings, df, map_obj)
+                    await asyncio.to_thread(store_holdings, d, df, resolver, etf_stat)
+
+        except Exception as e:
+            etf_stat.error = str(e)
+            log.record_error(f"Failed to parse the data for ETF '{d.etf.name}'. {e}")
+
+    return etf_stat
+
+
+async def process_provider_async(provider: Provider, browser, parse_pool: ProcessPoolExecutor, save_dir: str | None = None) -> list[EtfStats]:
+    await asyncio.to_thread(_ensure_domain, provider)
+
+    try:
+        log.record_status(f"Starting to collect holdings from provider '{provider.name}'")
+
+        resolver = TickerResolver(TickerResolver.POPULATE_TICKER)
+        store_lock = asyncio.Lock()
+        ingest: list[asyncio.Task] = []
+
+        async for d in url.scrape_provider_async(browser, provider):
+            ingest.append(asyncio.create_task(_ingest_download(d, resolver, parse_pool, store_lock, save_dir)))
+
+        stats: list[EtfStats] = list(await asyncio.gather(*ingest))
+
+        if len(stats) == 0:
+            log.record_notice(f"No holdings downloads identified when scraping URL '{provider.name}'")
+            return []
+
+        log.record_status(f"Completed collection for the provider '{provider.name}'")
+        return stats
+
+    except Exception as e:
+        raise _collection_failed(provider, e)
+
+
+async def process_providers_async(providers: list[Provider], max_providers: int, parse_workers: int = PARSE_WORKERS) -> list[list[EtfStats] | BaseException]:
+    """Run all providers on one shared browser. Results are in provider order; a failed provider returns its exception."""
+    # spawn: the parse workers must not inherit the parent's DB pool or Playwright connection.
+    with ProcessPoolExecutor(max_workers=parse_workers, mp_context=multiprocessing.get_context('spawn')) as parse_pool:
+        async with url.stealth_playwright() as p:
+            browser = await url.launch_browser(p)
+            provider_limit = asyncio.Semaphore(max_providers)
+
+            async def run_one(item: Provider) -> list[EtfStats]:
+                async with provider_limit:
+                    return await process_provider_async(item, browser, parse_pool)
+
+            try:
+                return await asyncio.gather(*(run_one(item) for item in providers), return_exceptions=True)
+            finally:
+                await browser.close()
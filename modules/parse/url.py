@@ -1,26 +1,43 @@
+import asyncio
 import os
 import log
+import queue
 import re
 import tempfile
+import threading
 import time
+import weakref
 from datetime import date
-from typing import List
-from dataclasses import dataclass
-from playwright.sync_api import sync_playwright, Download, Browser, BrowserContext, Page
+from typing import AsyncIterator, Iterator
+from urllib.parse import urlparse
+from dataclasses import dataclass, field
+from playwright.async_api import async_playwright, Download, Browser, BrowserContext, Page
 from playwright_stealth import Stealth
 from modules.core.util import clean_date
 from modules.object.provider import Provider, Mapping, getMappingFromJson
 from modules.object.provider_etf import EtfDownload, ProviderEtf, fetch_by_provider_id
 from modules.object.categorize_etf import CategorizeEtfDownload
 from modules.core.protocols import CategorizeEtfProtocol
+from modules.parse.direct import can_fetch_direct, capture_download, fetch_direct
+from modules.parse.wait import SETTLE, StepTimer, WaitSpec, event_label, parse_wait, perform, wait_for
 
-
+# The page steps run on Playwright's async API only. Async callers share one browser across providers
+# (scrape_provider_async); the sync entry points drive the same steps on an event loop of their own.
 
 ENV_TYPE = os.environ.get("ENV_TYPE")
 
 SCRAPE_MAX_RETRIES = 3
 SCRAPE_RETRY_DELAY_SECONDS = 3
 
+# Isolated browser contexts per provider.
+SCRAPE_WORKERS = int(os.environ.get("SCRAPE_WORKERS", "3"))
+# Concurrent page loads against a single host, across all providers scraped on the same event loop.
+SCRAPE_MAX_PER_DOMAIN = int(os.environ.get("SCRAPE_MAX_PER_DOMAIN", "4"))
+
+# Semaphores belong to their event loop: host -> semaphore, per loop.
+_domain_limits: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Semaphore]] = weakref.WeakKeyDictionary()
+_SCRAPE_DONE = object()
+
 # Add extra launch arguments to mimic real Chrome
 CHROME_LAUNCH_ARGS = [
         "--disable-blink-features=AutomationControlled",
@@ -41,221 +58,420 @@ class OpenBrowser:
     context: BrowserContext | None
     page: Page | None
 
-def get_date_on_page(page: Page, mapping: Mapping) -> date | None:
+
+def stealth_playwright():
+    return Stealth().use_async(async_playwright())
+
+
+async def launch_browser(p) -> Browser:
+    return await p.chromium.launch(headless=True, args=CHROME_LAUNCH_ARGS)
+
+
+async def _new_browser_context(browser: Browser) -> BrowserContext:
+    return await browser.new_context(
+        user_agent=REAL_USER_AGENT,
+        viewport={'width': 1920, 'height': 1080},
+        accept_downloads=True
+    )
+
+
+def domain_limit(url: str) -> asyncio.Semaphore:
+    # One semaphore per host, shared by every worker of every provider running on this event loop.
+    host = urlparse(url).hostname or url
+    limits = _domain_limits.setdefault(asyncio.get_running_loop(), {})
+    if host not in limits:
+        limits[host] = asyncio.Semaphore(SCRAPE_MAX_PER_DOMAIN)
+    return limits[host]
+
+
+# ── page steps ──
+
+async def get_date_on_page(page: Page, mapping: Mapping) -> date | None:
     try:
         on_page = mapping.date.on_page
         if not on_page or not on_page.location:
             return None
 
         locator = page.locator(on_page.location).first
-        locator.wait_for(state="visible", timeout=15000)
+        await locator.wait_for(state="visible", timeout=15000)
+
+        raw_text = await locator.inner_text()
 
-        raw_text = locator.inner_text()
-       
         # Normalize whitespace (handles line breaks between label and date)
         normalized = " ".join(raw_text.split())
-        
+
         if on_page.text_before:
             # Case 1: anchor text provided
             anchor = on_page.text_before.strip()
             if anchor not in normalized:
                 return None
-            
+
             candidate = normalized.split(anchor, 1)[1].strip()
             return clean_date(candidate, mapping.date.format).date()
-            
-        else:
-            # Case 2: one date in section
-            return clean_date(normalized, mapping.date.format)
-            
-        return None
+
+        # Case 2: one date in section
+        return clean_date(normalized, mapping.date.format)
 
     except Exception as e:
         log.record_notice(f"An unexpected error occurred when trying to get the date on the page: {e}")
         return None
 
 
-def dispatch(page: Page, event: dict) -> None:
-        action_timout = 7000
-        name: str = event.get("name", "")
-        selector: str = event.get("selector", "")
+async def dispatch(page: Page, event: dict) -> None:
+    action_timout = 7000
+    name: str = event.get("name", "")
+    selector: str = event.get("selector", "")
+
+    if name == "navigate":
+        await page.goto(event["url"], wait_until="domcontentloaded", timeout=action_timout)
+        return
 
-        if name == "navigate":
-            page.goto(event["url"], wait_until="domcontentloaded", timeout=action_timout)
-            return;
+    if name == "mouse":
+        await page.mouse.wheel(event["x"], event["y"])
+        return
 
-        if name == "mouse":
-            page.mouse.wheel(event["x"],event["y"])
-            return;
+    if "browserName" in event or selector == "":
+        return
 
-        if "browserName" in event or selector == "":
-            return;
+    elif name == "click":
+        await page.click(selector, button=event.get("button", "left"), click_count=event.get("clickCount", 1), timeout=action_timout, force=True)
 
-        elif name == "click":
-            page.click(selector, button=event.get("button", "left"), click_count=event.get("clickCount", 1), timeout=action_timout, force=True)
+    elif name == "check":
+        await page.check(selector, timeout=action_timout)
 
-        elif name == "check":
-            page.check(selector, timeout=action_timout)
+    elif name == "fill":
+        # focus first for robustness
+        await page.click(selector, timeout=action_timout)
+        await page.fill(selector, event["text"], timeout=action_timout)
 
-        elif name == "fill":
-            # focus first for robustness
-            page.click(selector, timeout=action_timout)
-            page.fill(selector, event["text"], timeout=action_timout)
+    elif name == "select":
+        await page.select_option(selector, value=event["options"], timeout=action_timout)
 
-        elif name == "select":
-            page.select_option(selector, value=event["options"], timeout=action_timout)
+    elif name == "scroll_to_first":
+        await page.locator(selector).first.scroll_into_view_if_needed(timeout=action_timout)
 
-        elif name == "scroll_to_first":
-            page.locator(selector).first.scroll_into_view_if_needed(timeout=action_timout)
+    else:
+        raise NotImplementedError(f"Unsupported action: {name}")
 
-        else:
-            raise NotImplementedError(f"Unsupported action: {name}")
-        
-        page.wait_for_timeout(1000)
 
-def save_and_get_data(download: Download) -> bytes:
-        temp_path = os.path.join(tempfile.gettempdir(), download.suggested_filename or "download.bin")
-        download.save_as(temp_path)
-        with open(temp_path, "rb") as f:
-            data = f.read()
-        os.remove(temp_path)
-        return data
+async def save_and_get_data(download: Download) -> bytes:
+    temp_path = os.path.join(tempfile.gettempdir(), f"{id(download)}-{download.suggested_filename or 'download.bin'}")
+    await download.save_as(temp_path)
+    with open(temp_path, "rb") as f:
+        data = f.read()
+    os.remove(temp_path)
+    return data
 
-def get_holdings(page: Page, trigger_download: dict) -> tuple[str | None, bytes | None, str | None]:
+
+async def get_holdings(page: Page, trigger_download: dict, timer: StepTimer | None = None, capture: dict | None = None) -> tuple[str | None, bytes | None, str | None]:
+    timer = timer or StepTimer()
     try:
-        page.wait_for_timeout(2000)
-        page.locator(trigger_download['selector']).first.wait_for(
-            state="visible",
-            timeout=15000
-        )
-        dispatch(page, { 'name': 'scroll_to_first', 'selector': trigger_download['selector'] })
-        page.wait_for_timeout(2000)
-
-        # # Perform the click
-        with page.expect_download() as download_info:
-            # Perform the action that initiates download
-            dispatch(page, { 'name': 'click', 'selector': trigger_download['selector'] })
+        selector = trigger_download['selector']
+        with timer.step('download_ready'):
+            await page.locator(selector).first.wait_for(state="visible", timeout=15000)
+            await dispatch(page, { 'name': 'scroll_to_first', 'selector': selector })
+            await wait_for(page, parse_wait(trigger_download.get('wait'), default=WaitSpec(kind='download_ready', selector=selector), selector=selector), timer)
 
-        download = download_info.value
-        return download.suggested_filename, save_and_get_data(download=download), None
+        with timer.step('download'):
+            # Perform the action that initiates download
+            async with page.expect_download() as download_info:
+                await dispatch(page, { 'name': 'click', 'selector': selector })
 
-        # download.save_as(download.suggested_filename)
+            download = await download_info.value
+            if capture is not None:
+                # Record where the file came from so later runs can fetch it without the browser.
+                captured = capture_download(download.url, page.url, REAL_USER_AGENT, download.suggested_filename)
+                if captured:
+                    capture.update(captured)
+            return download.suggested_filename, await save_and_get_data(download=download), None
 
     except Exception as e:
         return None, None, f"An unexpected error occurred when trying to get the holdings:\n {e}"
 
 
-def open_page(page: Page, url: str, wait_pre_events: str | None, wait_post_events: str | None, events: dict | None) -> bool:
+async def open_page(page: Page, url: str, wait_pre_events: str | None, wait_post_events: str | None, events: dict | None, timer: StepTimer | None = None) -> bool:
+    timer = timer or StepTimer()
     try:
+        with timer.step('goto'):
+            # Using 'wait_until="networkidle"' - not good if the page has a video in it that constantly load data.
+            # Using domcontentloaded and then waiting for the DOM to settle.
+            await page.goto(url, wait_until="domcontentloaded", timeout=30000)
 
-        # Using 'wait_until="networkidle"' - not good if the page has a video in it that constantly load data.
-        # Using domcontentloaded with an extra timeout of 20 seconds. 
-        page.goto(url, wait_until="domcontentloaded", timeout=30000)
-
-        if "chrome-error://" in page.url:
-            page.reload()
-            page.wait_for_timeout(3000)
+            if "chrome-error://" in page.url:
+                await page.reload()
+                await wait_for(page, SETTLE, timer)
 
-        if wait_pre_events:
-            page.locator(wait_pre_events).first.wait_for(
-                state="visible",
-                timeout=30000
-            )
+            if wait_pre_events:
+                await page.locator(wait_pre_events).first.wait_for(state="visible", timeout=30000)
 
-        page.wait_for_timeout(1000)  # final paint
+            await wait_for(page, SETTLE, timer)  # final paint
 
         # Run any instruction on the page to open the page content.
         if events:
-            for event in events:
-                max_retries = 2
-                for attempt in range(max_retries):
-                    try:
-                        dispatch(page, event)
-                        page.wait_for_timeout(2000)  # final paint
-                        break
-                    except Exception as e:
-                        if attempt == max_retries - 1:
-                            raise
-                        log.record_notice(f"Dispatch failed on attempt {attempt + 1}, retrying... Error: {e}")
-                        page.wait_for_timeout(1000)
-
-
-        page.wait_for_timeout(2000)  # final paint
-
-        if wait_post_events:
-            page.locator(wait_post_events).first.wait_for(
-                state="visible",
-                timeout=10000
-            )
+            for index, event in enumerate(events):
+                with timer.step(event_label(index, event)):
+                    if event.get("name") == "wait":
+                        await wait_for(page, parse_wait(event), timer)
+                        continue
+
+                    spec = parse_wait(event.get("wait"), default=SETTLE, selector=event.get("selector"))
+                    max_retries = 2
+                    for attempt in range(max_retries):
+                        try:
+                            await perform(page, lambda: dispatch(page, event), spec, timer)
+                            break
+                        except Exception as e:
+                            if attempt == max_retries - 1:
+                                raise
+                            log.record_notice(f"Dispatch failed on attempt {attempt + 1}, retrying... Error: {e}")
+                            await page.wait_for_timeout(1000)
+
+        with timer.step('post_events'):
+            if wait_post_events:
+                await page.locator(wait_post_events).first.wait_for(state="visible", timeout=10000)
+            else:
+                await wait_for(page, SETTLE, timer)  # final paint
 
         return True
- 
+
     except Exception as e:
         log.record_notice(f"An unexpected error occurred when trying to get the source page at {url}: {e}")
         return False
 
 
-def scrape_provider(cp: Provider) -> List[EtfDownload]:
+async def _open_etf(page: Page, cp: Provider, etf: ProviderEtf, timer: StepTimer | None = None) -> date | None:
+    """Open the ETF page on a page already past the provider's start URL; returns the holdings date read from it, if mapped."""
+    log.record_status(f"Opening ETF '{etf.name}' - [{etf.id}] ('{cp.name}' - [{cp.id}]) for scraping")
+    if not await open_page(page=page, url=etf.url or '', wait_pre_events=etf.wait_pre_events, wait_post_events=etf.wait_post_events, events=etf.events, timer=timer):
+        raise Exception(f"Failed to open ETF URL: {etf.url}")
+
+    found_date_from_page = None
+    mapping = etf.mapping or cp.mapping
+    if mapping:
+        map = getMappingFromJson(mapping)
+        if map.date.on_page:
+            found_date_from_page = await get_date_on_page(page=page, mapping=map)
+            if not found_date_from_page:
+                raise Exception('ETF holdings date from page could not be confirmed.')
+    return found_date_from_page
+
+
+async def scrape_etf(page: Page, cp: Provider, etf: ProviderEtf) -> EtfDownload | None:
+    last_error = None
+    for attempt in range(SCRAPE_MAX_RETRIES):
+        try:
+            trigger_download = etf.trigger_download or cp.trigger_download
+            if etf.id is None or etf.url is None or trigger_download is None:
+                raise Exception('Missing URL or trigger_download for provider ETF.')
+
+            timer = StepTimer()
+            async with domain_limit(etf.url):
+                found_date_from_page = await _open_etf(page, cp, etf, timer)
+
+                capture: dict = {}
+                file_name, data, error = await get_holdings(page=page, trigger_download=trigger_download, timer=timer, capture=capture)
+                if error:
+                    raise Exception(error)
+
+            log.record_status(f"ETF '{etf.name}' - [{etf.id}] page steps: {timer.summary()}")
+            return EtfDownload(provider=cp, etf=etf, file_name=file_name, data=data, date_from_page=found_date_from_page, timings=timer.steps, capture=capture or None)
+
+        except Exception as e:
+            last_error = e
+            if attempt < SCRAPE_MAX_RETRIES - 1:
+                log.record_notice(f"ETF '{etf.name}' - [{etf.id}] attempt {attempt + 1}/{SCRAPE_MAX_RETRIES} failed, retrying in {(attempt + 1) * SCRAPE_RETRY_DELAY_SECONDS}s... Error: {e}")
+                await asyncio.sleep((attempt + 1) * SCRAPE_RETRY_DELAY_SECONDS)
+            else:
+                log.record_error(f"Failed to scrape ETF '{etf.name}' - [{etf.id}] ('{cp.name}' - [{cp.id}]) after {SCRAPE_MAX_RETRIES} attempts: {last_error}")
+
+    return None
+
+
+# ── provider scraping ──
+
+async def _open_provider_page(browser: Browser, cp: Provider) -> tuple[BrowserContext, Page]:
+    context = await _new_browser_context(browser)
+    page = await context.new_page()
+
+    async with domain_limit(cp.url_start or ''):
+        opened = await open_page(page=page, url=cp.url_start or '', wait_pre_events=cp.wait_pre_events, wait_post_events=cp.wait_post_events, events=cp.events)
+    if not opened:
+        await context.close()
+        raise Exception(f"Failed to open provider start URL: {cp.url_start}")
+    return context, page
+
+
+@dataclass
+class _ScrapeRun:
+    work: asyncio.Queue
+    results: asyncio.Queue
+    alive: int
+    started: list[int] = field(default_factory=list)
+    skipped: int = 0
+
+    def worker_lost(self) -> None:
+        """A worker can no longer scrape; when it was the last one, nobody is left to take the remaining ETFs."""
+        self.alive -= 1
+        if not self.alive:
+            while not self.work.empty():
+                self.work.get_nowait()
+                self.work.task_done()
+                self.skipped += 1
+
+
+async def _scrape_worker(browser: Browser, cp: Provider, worker_no: int, run: _ScrapeRun) -> None:
+    # The context is only created for the first ETF that cannot be fetched directly over HTTP.
+    # Workers stay on the queue until every ETF is done, so one handed back by a failed worker is always picked up.
+    context: BrowserContext | None = None
+    page: Page | None = None
+    try:
+        while True:
+            etf = await run.work.get()
+            try:
+                if can_fetch_direct(cp, etf):
+                    download = await asyncio.to_thread(fetch_direct, cp, etf)
+                    if download:
+                        run.started.append(worker_no)
+                        await run.results.put(download)
+                        continue
+
+                if page is None:
+                    try:
+                        context, page = await _open_provider_page(browser, cp)
+                        run.started.append(worker_no)
+                    except Exception:
+                        # Leave the ETF for a worker whose context did open.
+                        run.work.put_nowait(etf)
+                        raise
+
+                download = await scrape_etf(page=page, cp=cp, etf=etf)
+                if download:
+                    await run.results.put(download)
+
+            finally:
+                run.work.task_done()
+
+    except Exception as e:
+        log.record_error(f"Scrape worker {worker_no} for provider '{cp.name}' - [{cp.id}] stopped: {e}")
+        run.worker_lost()
+
+    finally:
+        if context:
+            await context.close()
+
+
+async def _all_done(run: _ScrapeRun) -> None:
+    await run.work.join()
+    await run.results.put(None)
+
+
+async def scrape_provider_async(browser: Browser, cp: Provider) -> AsyncIterator[EtfDownload]:
+    """Scrape all ETFs of a provider on the shared browser with up to SCRAPE_WORKERS contexts, yielding downloads as they complete."""
     if cp.id is None or cp.url_start is None:
         raise Exception('Missing URL for provider.')
 
-    etf_list = fetch_by_provider_id(cp.id)
-    log.record_status(f"Scraping {len(etf_list)} ETFs from provider '{cp.name}'")
+    etf_list = await asyncio.to_thread(fetch_by_provider_id, cp.id)
+    if not etf_list:
+        return
+
+    workers = max(1, min(SCRAPE_WORKERS, len(etf_list)))
+    log.record_status(f"Scraping {len(etf_list)} ETFs from provider '{cp.name}' with {workers} contexts")
 
-    downloads: List[EtfDownload] = []
+    # Workers pull from one shared queue; an ETF left behind by a failed worker is picked up by the others.
+    run = _ScrapeRun(work=asyncio.Queue(), results=asyncio.Queue(), alive=workers)
+    for etf in etf_list:
+        run.work.put_nowait(etf)
+
+    tasks = [asyncio.create_task(_scrape_worker(browser, cp, i, run)) for i in range(workers)]
+    tasks.append(asyncio.create_task(_all_done(run)))
+    try:
+        while (item := await run.results.get()) is not None:
+            yield item
 
-    with Stealth().use_sync(sync_playwright()) as p:
-        browser = p.chromium.launch(headless=True, args=CHROME_LAUNCH_ARGS)
-        context = browser.new_context(
-            user_agent=REAL_USER_AGENT,
-            viewport={'width': 1920, 'height': 1080},
-            accept_downloads=True
-        )
-        page = context.new_page()
+        if run.skipped:
+            log.record_error(f"Skipped {run.skipped} ETFs of provider '{cp.name}' - [{cp.id}] - no scrape worker could open the provider page.")
 
-        if not open_page(page=page, url=cp.url_start, wait_pre_events=cp.wait_pre_events, wait_post_events=cp.wait_post_events, events=cp.events):
+        if not run.started:
             raise Exception(f"Failed to open provider start URL: {cp.url_start}")
 
-        for etf in etf_list:
-            last_error = None
-            for attempt in range(SCRAPE_MAX_RETRIES):
-                try:
-                    trigger_download = etf.trigger_download or cp.trigger_download
-                    if etf.id is None or etf.url is None or trigger_download is None:
-                        raise Exception('Missing URL or trigger_download for provider ETF.')
+    finally:
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
 
-                    log.record_status(f"Opening ETF '{etf.name}' - [{etf.id}] ('{cp.name}' - [{cp.id}]) for scraping")
-                    if not open_page(page=page, url=etf.url, wait_pre_events=etf.wait_pre_events, wait_post_events=etf.wait_post_events, events=etf.events):
-                        raise Exception(f"Failed to open ETF URL: {etf.url}")
 
-                    found_date_from_page = None
-                    mapping = etf.mapping or cp.mapping
-                    if mapping:
-                        map = getMappingFromJson(mapping)
-                        if map.date.on_page:
-                            found_date_from_page = get_date_on_page(page=page, mapping=map)
-                            if not found_date_from_page:
-                                raise Exception('ETF holdings date from page could not be confirmed.')
+async def _scrape_provider_into(cp: Provider, results: queue.Queue) -> None:
+    async with stealth_playwright() as p:
+        browser = await launch_browser(p)
+        try:
+            async for d in scrape_provider_async(browser, cp):
+                results.put(d)
+        finally:
+            await browser.close()
 
-                    file_name, data, error = get_holdings(page=page, trigger_download=trigger_download)
-                    if error:
-                        raise Exception(error)
 
-                    downloads.append(EtfDownload(provider=cp, etf=etf, file_name=file_name, data=data, date_from_page=found_date_from_page))
-                    break
+def _run_scrape_loop(loop: asyncio.AbstractEventLoop, task: asyncio.Task, results: queue.Queue) -> None:
+    try:
+        loop.run_until_complete(task)
+    except asyncio.CancelledError:
+        pass
+    except Exception as e:
+        results.put(e)
+    finally:
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+        results.put(_SCRAPE_DONE)
 
-                except Exception as e:
-                    last_error = e
-                    if attempt < SCRAPE_MAX_RETRIES - 1:
-                        log.record_notice(f"ETF '{etf.name}' - [{etf.id}] attempt {attempt + 1}/{SCRAPE_MAX_RETRIES} failed, retrying in {(attempt + 1) * SCRAPE_RETRY_DELAY_SECONDS}s... Error: {e}")
-                        time.sleep((attempt + 1) * SCRAPE_RETRY_DELAY_SECONDS)
-                    else:
-                        log.record_error(f"Failed to scrape ETF '{etf.name}' - [{etf.id}] ('{cp.name}' - [{cp.id}]) after {SCRAPE_MAX_RETRIES} attempts: {last_error}")
 
-        context.close()
-        browser.close()
+def scrape_provider(cp: Provider) -> Iterator[EtfDownload]:
+    """scrape_provider_async on a browser of its own, yielding downloads as they complete.
+    The event loop runs in a background thread, so the caller stores each ETF while the rest are still scraping."""
+    if cp.id is None or cp.url_start is None:
+        raise Exception('Missing URL for provider.')
 
-    return downloads
+    results: queue.Queue = queue.Queue()
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(_scrape_provider_into(cp, results))
+    thread = threading.Thread(target=_run_scrape_loop, args=(loop, task, results), name=f"scrape-{cp.id}", daemon=True)
+    thread.start()
+
+    try:
+        while (item := results.get()) is not _SCRAPE_DONE:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    finally:
+        # Reached on normal completion and when the consumer stops iterating early.
+        if thread.is_alive():
+            try:
+                loop.call_soon_threadsafe(task.cancel)
+            except RuntimeError:
+                pass  # the loop closed in the meantime
+        thread.join()
+
+
+# ── single pages ──
+
+async def _scrape_provider_etf(cp: Provider, etf: ProviderEtf, trigger_download: dict) -> EtfDownload:
+    async with stealth_playwright() as p:
+        browser = await launch_browser(p)
+        context = await _new_browser_context(browser)
+        page = await context.new_page()
+
+        if not await open_page(page=page, url=cp.url_start or '', wait_pre_events=cp.wait_pre_events, wait_post_events=cp.wait_post_events, events=cp.events):
+            raise Exception(f"Failed to open provider start URL: {cp.url_start}")
+
+        found_date_from_page = await _open_etf(page, cp, etf)
+
+        file_name, data, error = await get_holdings(page=page, trigger_download=trigger_download)
+        await context.close()
+        await browser.close()
+
+    if error:
+        raise Exception(f"Failed to download holdings: {error}")
+
+    return EtfDownload(provider=cp, etf=etf, file_name=file_name, data=data, date_from_page=found_date_from_page)
 
 
 def scrape_provider_etf(cp: Provider, etf: ProviderEtf) -> EtfDownload:
@@ -265,76 +481,44 @@ def scrape_provider_etf(cp: Provider, etf: ProviderEtf) -> EtfDownload:
     if etf.id is None or etf.url is None or trigger_download is None:
         raise Exception('Missing URL or trigger_download for provider ETF.')
 
-    with Stealth().use_sync(sync_playwright()) as p:
-        browser = p.chromium.launch(headless=True, args=CHROME_LAUNCH_ARGS)
-        context = browser.new_context(
-            user_agent=REAL_USER_AGENT,
-            viewport={'width': 1920, 'height': 1080},
-            accept_downloads=True
-        )
-        page = context.new_page()
+    return asyncio.run(_scrape_provider_etf(cp, etf, trigger_download))
 
-        if not open_page(page=page, url=cp.url_start, wait_pre_events=cp.wait_pre_events, wait_post_events=cp.wait_post_events, events=cp.events):
-            raise Exception(f"Failed to open provider start URL: {cp.url_start}")
 
-        log.record_status(f"Opening ETF '{etf.name}' - [{etf.id}] ('{cp.name}' - [{cp.id}]) for scraping")
-        if not open_page(page=page, url=etf.url, wait_pre_events=etf.wait_pre_events, wait_post_events=etf.wait_post_events, events=etf.events):
-            raise Exception(f"Failed to open ETF URL: {etf.url}")
+async def _scrape_categorizer(etf: CategorizeEtfProtocol) -> CategorizeEtfDownload:
+    download: CategorizeEtfDownload = CategorizeEtfDownload(etf=etf)
+    open_browser: OpenBrowser = OpenBrowser(browser=None, context=None, page=None)
 
-        found_date_from_page = None
-        mapping = etf.mapping or cp.mapping
-        if mapping:
-            map = getMappingFromJson(mapping)
-            if map.date.on_page:
-                found_date_from_page = get_date_on_page(page=page, mapping=map)
-                if not found_date_from_page:
-                    raise Exception('ETF holdings date from page could not be confirmed.')
+    async with stealth_playwright() as p:
+        open_browser.browser = await launch_browser(p)
+        open_browser.context = await _new_browser_context(open_browser.browser)
+        open_browser.page = await open_browser.context.new_page()
 
-        file_name, data, error = get_holdings(page=page, trigger_download=trigger_download)
-        context.close()
-        browser.close()
+        if etf.id == None or etf.url == None or etf.trigger_download == None:
+            raise Exception('Missing URL or Trigger Method for categorizer etf.')
 
-    if error:
-        raise Exception(f"Failed to download holdings: {error}")
+        if await open_page(page=open_browser.page, url=etf.url, wait_pre_events=etf.wait_pre_events, wait_post_events=etf.wait_post_events, events=etf.events):
+            if etf.mapping:
+                map = getMappingFromJson(etf.mapping)
+                if map.date.on_page:
+                    download.date_from_page = await get_date_on_page(page=open_browser.page, mapping=map)
+            file_name, data, error = await get_holdings(page=open_browser.page, trigger_download=etf.trigger_download)
+            if file_name and data:
+                download.file_name = file_name
+                download.data = data
+            if error:
+                raise Exception(error)
 
-    return EtfDownload(provider=cp, etf=etf, file_name=file_name, data=data, date_from_page=found_date_from_page)
+        await open_browser.context.close()
+        await open_browser.browser.close()
+
+        return download
 
 
 def scrape_categorizer(etf: CategorizeEtfProtocol) -> CategorizeEtfDownload:
     last_error = None
     for attempt in range(SCRAPE_MAX_RETRIES):
         try:
-            download: CategorizeEtfDownload = CategorizeEtfDownload(etf=etf)
-            open_browser: OpenBrowser = OpenBrowser(browser=None, context=None, page=None)
-
-            with Stealth().use_sync(sync_playwright()) as p:
-                open_browser.browser = p.chromium.launch(headless=True, args=CHROME_LAUNCH_ARGS)
-                open_browser.context = open_browser.browser.new_context(
-                    user_agent=REAL_USER_AGENT,
-                    viewport={'width': 1920, 'height': 1080},
-                    accept_downloads=True
-                )
-                open_browser.page = open_browser.context.new_page()
-
-                if etf.id == None or etf.url == None or etf.trigger_download == None:
-                    raise Exception('Missing URL or Trigger Method for categorizer etf.')
-
-                if open_page(page=open_browser.page, url=etf.url, wait_pre_events=etf.wait_pre_events, wait_post_events=etf.wait_post_events, events=etf.events):
-                    if etf.mapping:
-                        map = getMappingFromJson(etf.mapping)
-                        if map.date.on_page:
-                            download.date_from_page = get_date_on_page(page=open_browser.page, mapping=map)
-                    file_name, data, error = get_holdings(page=open_browser.page, trigger_download=etf.trigger_download)
-                    if file_name and data:
-                        download.file_name = file_name
-                        download.data = data
-                    if error:
-                        raise Exception(error)
-
-                open_browser.context.close()
-                open_browser.browser.close()
-
-                return download
+            return asyncio.run(_scrape_categorizer(etf))
 
         except Exception as e:
             last_error = e
@@ -343,4 +527,3 @@ def scrape_categorizer(etf: CategorizeEtfProtocol) -> CategorizeEtfDownload:
                 time.sleep((attempt + 1) * SCRAPE_RETRY_DELAY_SECONDS)
 
     raise Exception(f"Failed to extract URLs and subsequent files from categorizer ETF links after {SCRAPE_MAX_RETRIES} attempts: {last_error}")
-
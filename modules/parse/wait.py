@@ -0,0 +1,182 @@
+import log
+import re
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Iterator
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
+
+# Event-driven waits for the scraper pages. A wait is configured in the provider / ETF `events` JSON:
+#   per event:        {"name": "click", "selector": "#tab", "wait": {"for": "selector", "selector": "#holdings", "timeout": 8000}}
+#   standalone step:  {"name": "wait", "for": "response", "url": "**/holdings*"}
+#   before download:  trigger_download = {"selector": "#csv", "wait": {"for": "download_ready"}}
+# Supported "for": selector, response, url, load, download_ready, dom_stable, sleep.
+# Every wait is bounded by its timeout; a fixed sleep of `fallback` ms is used only when the wait itself fails.
+
+WAIT_KINDS = {'selector', 'response', 'url', 'load', 'download_ready', 'dom_stable', 'sleep'}
+
+DEFAULT_TIMEOUT_MS = 10000
+DEFAULT_FALLBACK_MS = 1000
+DOM_QUIET_MS = 300
+DOM_STABLE_TIMEOUT_MS = 2500
+
+# Resolves true once the DOM has had no mutations for `quiet` ms, false when `timeout` ms pass first.
+DOM_STABLE_JS = """
+([quiet, timeout]) => new Promise(resolve => {
+    let timer = null;
+    let cap = null;
+    const observer = new MutationObserver(() => { clearTimeout(timer); timer = setTimeout(() => done(true), quiet); });
+    const done = (stable) => { observer.disconnect(); clearTimeout(timer); clearTimeout(cap); resolve(stable); };
+    observer.observe(document, { subtree: true, childList: true, attributes: true, characterData: true });
+    timer = setTimeout(() => done(true), quiet);
+    cap = setTimeout(() => done(false), timeout);
+})
+"""
+
+# Resolves once the first element matching the selector is visible and not disabled.
+DOWNLOAD_READY_JS = """
+(selector) => {
+    let el = null;
+    try { el = document.querySelector(selector); } catch (e) { return true; }  // not a CSS selector - visibility was checked already
+    if (!el || el.disabled || el.getAttribute('aria-disabled') === 'true') return false;
+    const rect = el.getBoundingClientRect();
+    return rect.width > 0 && rect.height > 0;
+}
+"""
+
+
+@dataclass
+class WaitSpec:
+    kind: str
+    selector: str | None = None
+    url: str | None = None
+    regex: bool = False
+    state: str = 'visible'
+    quiet: int = DOM_QUIET_MS
+    timeout: int = DEFAULT_TIMEOUT_MS
+    fallback: int = DEFAULT_FALLBACK_MS
+
+    def url_matcher(self) -> str | re.Pattern:
+        if self.url is None:
+            raise Exception(f"Wait '{self.kind}' requires a 'url' pattern.")
+        return re.compile(self.url) if self.regex else self.url
+
+
+# Replaces the fixed 1-2 second "final paint" sleeps when nothing more specific is configured.
+SETTLE = WaitSpec(kind='dom_stable', timeout=DOM_STABLE_TIMEOUT_MS, fallback=DEFAULT_FALLBACK_MS)
+
+
+def parse_wait(raw: dict | None, default: WaitSpec | None = None, selector: str | None = None) -> WaitSpec | None:
+    """Build a WaitSpec from its JSON config; `selector` is used when a selector-based wait does not name one."""
+    if not raw:
+        return default
+
+    kind = raw.get('for', 'dom_stable')
+    if kind not in WAIT_KINDS:
+        raise NotImplementedError(f"Unsupported wait: {kind}")
+
+    return WaitSpec(
+        kind=kind,
+        selector=raw.get('selector', selector),
+        url=raw.get('url'),
+        regex=bool(raw.get('regex', False)),
+        state=raw.get('state', 'visible'),
+        quiet=int(raw.get('quiet', DOM_QUIET_MS)),
+        timeout=int(raw.get('timeout', DOM_STABLE_TIMEOUT_MS if kind == 'dom_stable' else DEFAULT_TIMEOUT_MS)),
+        fallback=int(raw.get('fallback', DEFAULT_FALLBACK_MS)),
+    )
+
+
+@dataclass
+class StepTimer:
+    steps: list[tuple[str, int]] = field(default_factory=list)
+    fallback_ms: int = 0
+
+    @contextmanager
+    def step(self, label: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps.append((label, int((time.perf_counter() - start) * 1000)))
+
+    @property
+    def total_ms(self) -> int:
+        return sum(ms for _, ms in self.steps)
+
+    def summary(self) -> str:
+        steps = ", ".join(f"{label} {ms}ms" for label, ms in self.steps)
+        return f"{self.total_ms}ms total, {self.fallback_ms}ms in fallback sleeps ({steps})"
+
+
+def event_label(index: int, event: dict) -> str:
+    return f"event[{index}] {event.get('name', '')}"
+
+
+# ── waits ──
+
+async def wait_for(page: Page, spec: WaitSpec, timer: StepTimer | None = None) -> bool:
+    """Wait on the page per spec. Returns False (after the fallback sleep) when the condition was not met in time."""
+    try:
+        if spec.kind == 'sleep':
+            await page.wait_for_timeout(spec.timeout)
+        elif spec.kind == 'selector':
+            await page.locator(spec.selector or '').first.wait_for(state=spec.state, timeout=spec.timeout)
+        elif spec.kind == 'url':
+            await page.wait_for_url(spec.url_matcher(), timeout=spec.timeout)
+        elif spec.kind == 'response':
+            await page.wait_for_event('response', predicate=_response_predicate(spec), timeout=spec.timeout)
+        elif spec.kind == 'load':
+            await page.wait_for_load_state(spec.state if spec.state != 'visible' else 'load', timeout=spec.timeout)
+        elif spec.kind == 'download_ready':
+            await page.wait_for_function(DOWNLOAD_READY_JS, arg=spec.selector, timeout=spec.timeout)
+        elif spec.kind == 'dom_stable':
+            if not await page.evaluate(DOM_STABLE_JS, [spec.quiet, spec.timeout]):
+                log.record_notice(f"Page DOM still changing after {spec.timeout}ms, continuing.")
+        return True
+
+    except Exception as e:
+        log.record_notice(f"Wait '{spec.kind}' did not complete ({e}), falling back to a {spec.fallback}ms sleep.")
+        await _fallback_sleep(page, spec, timer)
+        return False
+
+
+async def perform(page: Page, action: Callable[[], Awaitable[None]], spec: WaitSpec | None, timer: StepTimer | None = None) -> None:
+    """Run a page action followed by its wait. Response waits are armed before the action so a fast reply is not missed."""
+    if spec is None:
+        await action()
+        return
+
+    if spec.kind != 'response':
+        await action()
+        await wait_for(page, spec, timer)
+        return
+
+    acted = False
+    try:
+        async with page.expect_response(_response_predicate(spec), timeout=spec.timeout):
+            await action()
+            acted = True
+    except PlaywrightTimeoutError as e:
+        if not acted:
+            raise
+        log.record_notice(f"Wait 'response' did not complete ({e}), falling back to a {spec.fallback}ms sleep.")
+        await _fallback_sleep(page, spec, timer)
+
+
+# ── helpers ──
+
+def _response_predicate(spec: WaitSpec) -> Callable:
+    matcher = spec.url_matcher()
+    if isinstance(matcher, re.Pattern):
+        return lambda response: bool(matcher.search(response.url))
+    # Playwright-style glob: '*' within a path segment, '**' across segments.
+    pattern = re.compile('^' + re.escape(matcher).replace(r'\*\*', '.*').replace(r'\*', '[^/]*') + '$')
+    return lambda response: bool(pattern.match(response.url))
+
+
+async def _fallback_sleep(page: Page, spec: WaitSpec, timer: StepTimer | None) -> None:
+    if spec.fallback > 0:
+        await page.wait_for_timeout(spec.fallback)
+        if timer:
+            timer.fallback_ms += spec.fallback
@@ -0,0 +1,106 @@
+import log
+import sys
+from datetime import datetime
+from threading import Lock
+from modules.object.ticker import fetch_for_index
+
+# FMP exchange codes of US listings - a bare holdings symbol in a US ETF refers to one of these.
+US_EXCHANGES = {'NASDAQ', 'NYSE', 'AMEX', 'NYSEARCA', 'CBOE', 'BATS', 'OTC', 'PNK'}
+
+MISS = 0  # not indexed, or ambiguous - resolve through the API
+
+
+class TickerIndex:
+    """Process-wide lookup of known tickers: US symbol, (symbol, exchange) and ISIN to ticker id.
+
+    Values are ints: the ticker id, or minus the id when the ticker is marked invalid; keys are interned strings.
+    Loaded once, then refreshed incrementally from ticker.created_at. Shared by all resolver threads.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._loaded_at: datetime | None = None
+        self._by_symbol: dict[str, int] = {}
+        self._by_listing: dict[str, int] = {}
+        self._by_isin: dict[str, int] = {}
+        self._listing_of: dict[int, str] = {}
+        self._seen: set[int] = set()
+
+    # ── load ──
+
+    def refresh(self) -> None:
+        """Load the index on first use, afterwards only tickers created since the last load."""
+        with self._lock:
+            since = self._loaded_at
+            rows = fetch_for_index(since)
+            for id, created_at, symbol, exchange, isin, invalid in rows:
+                self._add(id, symbol, exchange, isin, invalid is not None)
+                if self._loaded_at is None or created_at > self._loaded_at:
+                    self._loaded_at = created_at
+            if since is None:
+                log.record_status(f"Ticker index loaded: {len(self._listing_of)} tickers, {len(self._by_symbol)} US symbols, {len(self._by_isin)} ISINs.")
+
+    def add(self, id: int, symbol: str, exchange: str | None, isin: str | None, invalid: bool) -> None:
+        with self._lock:
+            self._add(id, symbol, exchange, isin, invalid)
+
+    def _add(self, id: int, symbol: str, exchange: str | None, isin: str | None, invalid: bool) -> None:
+        value = -id if invalid else id
+        symbol = sys.intern(symbol)
+        listing = sys.intern(f"{symbol}|{exchange or ''}")
+
+        previous = self._by_listing.get(listing)
+        self._by_listing[listing] = value
+        self._listing_of[id] = listing
+
+        if exchange in US_EXCHANGES:
+            self._set_unique(self._by_symbol, symbol, value, previous)
+        if isin:
+            self._set_unique(self._by_isin, sys.intern(isin), value, previous)
+
+    @staticmethod
+    def _set_unique(index: dict[str, int], key: str, value: int, previous: int | None) -> None:
+        # A key shared by two different tickers is ambiguous and left to the API.
+        current = index.get(key)
+        if current is None or current == previous or abs(current) == abs(value):
+            index[key] = value
+        else:
+            index[key] = MISS
+
+    # ── lookup ──
+
+    def by_symbol(self, symbol: str) -> int:
+        return self._by_symbol.get(symbol, MISS)
+
+    def by_listing(self, symbol: str, exchange: str | None) -> int:
+        return self._by_listing.get(f"{symbol}|{exchange or ''}", MISS)
+
+    def by_isin(self, isin: str) -> int:
+        return self._by_isin.get(isin, MISS)
+
+    def listing_of(self, id: int) -> tuple[str, str | None] | None:
+        listing = self._listing_of.get(id)
+        if listing is None:
+            return None
+        symbol, exchange = listing.split('|', 1)
+        return symbol, exchange or None
+
+    # ── tickers answered from the index this run (their daily ticker_value still needs a refresh) ──
+
+    def mark_seen(self, id: int) -> None:
+        with self._lock:
+            self._seen.add(id)
+
+    def take_seen(self) -> list[int]:
+        with self._lock:
+            seen, self._seen = sorted(self._seen), set()
+            return seen
+
+
+def to_ticker_id(value: int) -> int | None:
+    """Index value to resolver result: the id for valid tickers, None for invalid ones."""
+    return value if value > 0 else None
+
+
+# Create the single instance of TickerIndex
+ticker_index = TickerIndex()
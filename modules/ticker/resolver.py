@@ -1,5 +1,8 @@
 import re
 import log
+import threading
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date, timedelta
 from typing import Any
 from zoneinfo import ZoneInfo
@@ -10,9 +13,17 @@ from modules.object.ticker import Ticker, upsert_by_symbol, update_invalid, upda
 from modules.object.ticker_value import TickerValue, upsert as _upsert_tv
 from modules.object import categorize_ticker as _cat_ticker
 from modules.calc import esg as _esg
+from modules.ticker.index import MISS, TickerIndex, ticker_index, to_ticker_id
 
 _VALUE_DATE_CUT_OFF_HOUR = 17
 
+# Concurrent lookups for resolve_many misses; the FMP throttle still bounds the request rate.
+RESOLVE_WORKERS = 8
+
+def _canonical(key: str | None) -> str:
+    return (key or '').strip().upper()
+
+
 def populate_esg(ticker_id: int, full_symbol: str) -> None:
     try:
         disclosure, rating = api_stocks.fetch_esg_data(full_symbol)
@@ -22,6 +33,21 @@ def populate_esg(ticker_id: int, full_symbol: str) -> None:
         log.record_notice(f"Failed to store ESG for '{full_symbol}': {e}")
 
 
+def populate_esg_many(tickers: list[tuple[int, str]]) -> int:
+    """populate_esg for (ticker_id, full_symbol) pairs, with the ESG calls run concurrently. Returns the count stored."""
+    esg = api_stocks.fetch_esg_data_many([full_symbol for _, full_symbol in tickers])
+    stored = 0
+    for ticker_id, full_symbol in tickers:
+        try:
+            disclosure, rating = esg.get(full_symbol, ({}, {}))
+            esg_qualified, esg_factors = _esg.qualify(disclosure, rating)
+            update_esg_data(ticker_id, esg_qualified, esg_factors)
+            stored += 1
+        except Exception as e:
+            log.record_notice(f"Failed to store ESG for '{full_symbol}': {e}")
+    return stored
+
+
 class TickerResolver:
 
     POPULATE_TICKER          = 'ticker'
@@ -34,6 +60,13 @@ class TickerResolver:
         self._symbol_cache: dict[str, Any] = {}
         self._isin_cache:   dict[str, Any] = {}
         self._exchange_suffix_map: dict[str, str] = {}
+        # resolve_many resolves misses on a thread pool; the caches and the suffix map are written under this lock.
+        self._lock = threading.Lock()
+        # Known tickers are answered from the shared index instead of the API (ticker table only).
+        self._index: TickerIndex | None = None
+        if populate == TickerResolver.POPULATE_TICKER:
+            ticker_index.refresh()
+            self._index = ticker_index
 
     def set_classification(self, style_type: str, cap_type: str) -> None:
         self.style_type = style_type
@@ -50,30 +83,103 @@ class TickerResolver:
             return self._resolve_by_symbol(symbol)
         return self._resolve_non_us(symbol, isin, name)
 
+    def resolve_many(self, region: str, df: pd.DataFrame) -> pd.Series:
+        """Resolve every row of a holdings frame (ticker / isin / name columns) in one pass.
+
+        Rows are deduplicated to one lookup per symbol or ISIN; cache hits are answered directly and the misses
+        are resolved concurrently (API calls stay under the shared throttle). Returns a Series aligned to df.index.
+        """
+        def value(row: Any, column: str) -> str | None:
+            v = row.get(column)
+            return None if v is None or pd.isna(v) or str(v).strip() == '' else str(v)
+
+        row_keys: list[tuple[str, str | None]] = []
+        lookups: dict[tuple[str, str | None], tuple[str | None, str | None, str | None]] = {}
+        for row in df.to_dict('records'):
+            symbol, isin, name = value(row, 'ticker'), value(row, 'isin'), value(row, 'name')
+            if region != 'US' and isin:
+                key = ('isin', isin)
+            else:
+                key = ('symbol', symbol)
+            row_keys.append(key)
+            lookups.setdefault(key, (symbol, isin, name))
+
+        results: dict[tuple[str, str | None], Any] = {}
+        misses: list[tuple[str, str | None]] = []
+        for key in lookups:
+            kind, k = key
+            cache = self._isin_cache if kind == 'isin' else self._symbol_cache
+            if k is None:
+                results[key] = None
+            elif k in cache:
+                results[key] = cache[k]
+            else:
+                misses.append(key)
+
+        if misses:
+            # One lookup per canonical symbol / ISIN, so spellings of the same one are not resolved (and populated) twice.
+            groups: dict[tuple[str, str], list[tuple[str, str | None]]] = {}
+            for key in misses:
+                groups.setdefault((key[0], _canonical(key[1])), []).append(key)
+            firsts = [min(keys, key=lambda k: k[1] != canonical) for (_, canonical), keys in groups.items()]
+
+            profiles = self._prefetch_profiles(region, [lookups[key][0] for key in firsts])
+            with ThreadPoolExecutor(max_workers=min(RESOLVE_WORKERS, len(firsts))) as executor:
+                resolved = list(executor.map(lambda key: self._resolve_miss(region, lookups[key], profiles), firsts))
+
+            for keys, first, result in zip(groups.values(), firsts, resolved):
+                for key in keys:
+                    results[key] = result
+                    if key != first and key[1] is not None:
+                        self._store(self._isin_cache if key[0] == 'isin' else self._symbol_cache, key[1], result)
+
+        return pd.Series([results[key] for key in row_keys], index=df.index, dtype=object)
+
+    def _prefetch_profiles(self, region: str, symbols: list[str | None]) -> dict[str, dict | str]:
+        """US symbols the index cannot answer, fetched with multi-symbol profile calls instead of one call each."""
+        if region != 'US':
+            return {}
+        wanted = [s for s in symbols if s and not (self._index and self._index.by_symbol(s) != MISS)]
+        return api_stocks.get_stock_profiles(wanted) if len(wanted) > 1 else {}
+
+    def _resolve_miss(self, region: str, lookup: tuple[str | None, str | None, str | None], profiles: dict[str, dict | str]) -> Any:
+        symbol, isin, name = lookup
+        if symbol and symbol in profiles:
+            return self._resolve_by_symbol(symbol, profiles[symbol])
+        return self.resolve(region, symbol, isin, name)
+
     def get_full_symbol(self, ticker: Ticker) -> str:
         if ticker.exchange and not self._exchange_suffix_map:
-            for e in api_stocks.fetch_available_exchanges():
-                code = e.get('exchange')
-                suffix = e.get('symbolSuffix', '')
-                if code:
-                    self._exchange_suffix_map[code] = '' if suffix == 'N/A' else suffix
+            with self._lock:
+                if not self._exchange_suffix_map:
+                    suffixes = {}
+                    for e in api_stocks.fetch_available_exchanges():
+                        code = e.get('exchange')
+                        suffix = e.get('symbolSuffix', '')
+                        if code:
+                            suffixes[code] = '' if suffix == 'N/A' else suffix
+                    self._exchange_suffix_map = suffixes
         suffix = self._exchange_suffix_map.get(ticker.exchange, '') if ticker.exchange else ''
         return f"{ticker.symbol}{suffix}" if suffix else ticker.symbol
 
-    def _resolve_by_symbol(self, symbol: str | None) -> Any:
+    def _resolve_by_symbol(self, symbol: str | None, profile: dict | str | None = None) -> Any:
+        """`profile` is an already fetched get_stock_profile result (batch prefetch); fetched here when None."""
         if not symbol:
             return None
         if symbol in self._symbol_cache:
             return self._symbol_cache[symbol]
+        if self._index and (value := self._index.by_symbol(symbol)) != MISS:
+            return self._from_index(self._symbol_cache, symbol, value)
 
-        profile = api_stocks.get_stock_profile(symbol)
+        if profile is None:
+            profile = api_stocks.get_stock_profile(symbol)
         if not isinstance(profile, dict):
             log.record_notice(f"No stocks data provider profile for symbol '{symbol}': {profile}")
-            self._symbol_cache[symbol] = None
+            self._store(self._symbol_cache, symbol, None)
             return None
 
         result = self._populate(profile)
-        self._symbol_cache[symbol] = result
+        self._store(self._symbol_cache, symbol, result)
         return result
 
     def _resolve_non_us(self, symbol: str | None, isin: str | None, name: str | None = None) -> Any:
@@ -87,31 +193,35 @@ class TickerResolver:
             return None
         if isin in self._isin_cache:
             return self._isin_cache[isin]
+        if self._index and (value := self._index.by_isin(isin)) != MISS:
+            return self._from_index(self._isin_cache, isin, value)
 
         search_result = api_stocks.search_by_isin(isin)
         if not search_result:
             log.record_notice(f"No stocks data provider search result for ISIN '{isin}'")
-            self._isin_cache[isin] = None
+            self._store(self._isin_cache, isin, None)
             return None
         symbol_full = search_result.get('symbol')
         if not symbol_full:
-            self._isin_cache[isin] = None
+            self._store(self._isin_cache, isin, None)
             return None
         symbol = re.split(r'[\s.]', symbol_full)[0]
 
         if symbol in self._symbol_cache:
             result = self._symbol_cache[symbol]
-            self._isin_cache[isin] = result
+            self._store(self._isin_cache, isin, result)
             return result
+        if self._index and (value := self._index.by_listing(symbol, search_result.get('exchange'))) != MISS:
+            return self._from_index(self._isin_cache, isin, value)
 
         profile = api_stocks.get_stock_profile(symbol_full)
         if not isinstance(profile, dict):
             log.record_notice(f"No stocks data provider profile for symbol '{symbol}' (ISIN '{isin}'): {profile}")
-            self._isin_cache[isin] = None
+            self._store(self._isin_cache, isin, None)
             return None
 
         result = self._populate(profile)
-        self._isin_cache[isin] = result
+        self._store(self._isin_cache, isin, result)
         return result
 
     def _resolve_by_symbol_search(self, symbol: str | None, name: str | None = None) -> Any:
@@ -135,6 +245,8 @@ class TickerResolver:
             api_name = candidate.get('name', '')
             if name and api_name and not tu.names_match(name, api_name):
                 continue
+            if self._index and (value := self._index.by_listing(re.split(r'[\s.]', fmp_symbol_full)[0], candidate.get('exchange'))) != MISS:
+                return self._from_index(self._symbol_cache, cache_key, value)
             profile = api_stocks.get_stock_profile(fmp_symbol_full)
             if not isinstance(profile, dict):
                 continue
@@ -151,7 +263,19 @@ class TickerResolver:
         if result is None:
             log.record_notice(f"No verified stocks data provider match for non-US symbol '{symbol}'")
 
-        self._symbol_cache[cache_key] = result
+        self._store(self._symbol_cache, cache_key, result)
+        return result
+
+    def _store(self, cache: dict[str, Any], key: str, result: Any) -> None:
+        with self._lock:
+            cache[key] = result
+
+    def _from_index(self, cache: dict[str, Any], key: str, value: int) -> int | None:
+        result = to_ticker_id(value)
+        self._store(cache, key, result)
+        if result is not None and self._index:
+            # Skipped the profile call, so today's ticker_value is refreshed once at the end of the run.
+            self._index.mark_seen(result)
         return result
 
     def _populate(self, profile: dict) -> int | None:
@@ -182,21 +306,11 @@ class TickerResolver:
         )
         ticker_id, is_new = upsert_by_symbol(ticker)
 
-        if profile.get('exchange') == 'CRYPTO':
-            update_invalid(ticker_id, 'Crypto')
-            return None
-
-        name = profile.get('companyName')
-        if not name:
-            update_invalid(ticker_id, 'Missing details')
-            return None
-        if tu.is_unwanted_names(name):
-            update_invalid(ticker_id, 'Fund or ETF')
-            return None
-
-        market_cap = profile.get('marketCap')
-        if not market_cap:
-            update_invalid(ticker_id, 'Missing market cap')
+        invalid = self._invalid_reason(profile)
+        if self._index:
+            self._index.add(ticker_id, bare_symbol, exchange, ticker.isin, invalid is not None)
+        if invalid:
+            update_invalid(ticker_id, invalid)
             return None
 
         self._store_ticker_value(ticker_id, profile)
@@ -205,6 +319,19 @@ class TickerResolver:
             populate_esg(ticker_id, full_symbol)
         return ticker_id
 
+    @staticmethod
+    def _invalid_reason(profile: dict) -> str | None:
+        if profile.get('exchange') == 'CRYPTO':
+            return 'Crypto'
+        name = profile.get('companyName')
+        if not name:
+            return 'Missing details'
+        if tu.is_unwanted_names(name):
+            return 'Fund or ETF'
+        if not profile.get('marketCap'):
+            return 'Missing market cap'
+        return None
+
     def _populate_category_ticker(self, profile: dict) -> int | None:
         full_symbol = profile.get('symbol')
         if not full_symbol:
@@ -227,6 +354,33 @@ class TickerResolver:
             "factors":    factors,
         })
 
+    def refresh_ticker_values(self) -> int:
+        """Store today's price / market cap for the known tickers answered from the index this run. Returns the count."""
+        if not self._index:
+            return 0
+
+        ids = self._index.take_seen()
+        if not ids:
+            return 0
+
+        full_symbols: dict[int, str] = {}
+        for ticker_id in ids:
+            listing = self._index.listing_of(ticker_id)
+            if listing is not None:
+                symbol, exchange = listing
+                full_symbols[ticker_id] = self.get_full_symbol(Ticker(symbol=symbol, exchange=exchange))
+
+        # Batch quotes carry the same price / marketCap fields as the profile, a hundred symbols per call.
+        quotes = api_stocks.get_batch_quotes(list(full_symbols.values()))
+        refreshed = 0
+        for ticker_id, full_symbol in full_symbols.items():
+            quote = quotes.get(full_symbol)
+            if quote:
+                self._store_ticker_value(ticker_id, quote)
+                refreshed += 1
+        log.record_status(f"Refreshed ticker values for {refreshed}/{len(ids)} known tickers.")
+        return refreshed
+
     def _store_ticker_value(self, ticker_id: int, profile: dict) -> None:
         try:
             price = profile.get('price')
@@ -61,6 +61,8 @@ if __name__ == '__main__':
                 if s.error:
                     etf_rows.append(f"| {etf_id} | {region} | {s.etf_name} | — | — | — | _error_ |")
                     problem_details.append((s.etf_name, [f"Error: {s.error}"]))
+                elif s.skipped:
+                    etf_rows.append(f"| {etf_id} | {region} | {s.etf_name} | — | — | — | _skipped: {s.skipped}_ |")
                 else:
                     etf_rows.append(f"| {etf_id} | {region} | {s.etf_name} | {s.holdings} | {s.tickers} | {s.problems} | {s.match_pct:.1f}% |")
                     if s.problem_tickers:
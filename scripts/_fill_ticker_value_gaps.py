@@ -5,7 +5,7 @@ from modules.object.provider_etf_holding import fetch_valid_ticker_ids_in_holdin
 from modules.object.ticker import fetch_by_ids
 from modules.object.ticker_value import TickerValue, upsert_bulk
 from modules.ticker.resolver import TickerResolver
-from modules.core.api_stocks import get_stock_historic_prices, get_stock_historic_market_cap
+from modules.core.api_stocks import get_stock_historic_prices, get_stock_historic_market_cap, get_bulk_eod, api_rate_limiter
 from modules.core.db import db_pool_instance
 from psycopg.errors import Error
 
@@ -84,6 +84,58 @@ def fill_gap(ticker_id: int, fmp_symbol: str, gap_start: date, gap_end: date) ->
     return len(items)
 
 
+def gap_days(gaps: list[tuple[date, date]]) -> set[date]:
+    return {gap_start + timedelta(days=i) for gap_start, gap_end in gaps for i in range((gap_end - gap_start).days + 1) if (gap_start + timedelta(days=i)).weekday() < 5}
+
+
+def fill_from_bulk(pending: dict[int, tuple[str, list[tuple[date, date]]]]) -> tuple[dict[int, int], dict[int, list[tuple[date, date]]]]:
+    """
+    Fill gaps with prices from one bulk end-of-day file per missing date instead of a price call per ticker and gap.
+    Market cap still comes from the historical market-cap call, one per gap.
+    Returns rows filled per ticker, and the gaps left for the per-symbol fallback: any gap with a weekday the bulk
+    files did not serve (failed call, or no row for the ticker), or whose market cap could not be fetched.
+    """
+    days_by_ticker = {ticker_id: gap_days(gaps) for ticker_id, (_, gaps) in pending.items()}
+    closes: dict[int, dict[date, float]] = {ticker_id: {} for ticker_id in pending}
+    missed: dict[int, set[date]] = {ticker_id: set() for ticker_id in pending}
+    for day in sorted(set().union(*days_by_ticker.values())):
+        rows = get_bulk_eod(day)
+        if rows is not None and not rows:
+            continue  # market holiday
+        for ticker_id, days in days_by_ticker.items():
+            if day not in days:
+                continue
+            row = rows.get(pending[ticker_id][0].upper()) if rows is not None else None
+            if row is None or not row.get('close'):
+                missed[ticker_id].add(day)
+            else:
+                closes[ticker_id][day] = float(row['close'])
+
+    filled: dict[int, int] = {}
+    fallback: dict[int, list[tuple[date, date]]] = {}
+    for ticker_id, (symbol, gaps) in pending.items():
+        items = []
+        for gap_start, gap_end in gaps:
+            if any(gap_start <= d <= gap_end for d in missed[ticker_id]):
+                fallback.setdefault(ticker_id, []).append((gap_start, gap_end))
+                continue
+            price_by_date = {d: close for d, close in closes[ticker_id].items() if gap_start <= d <= gap_end}
+            if not price_by_date:
+                continue
+            mc_raw = get_stock_historic_market_cap(symbol, gap_start, gap_end)
+            if isinstance(mc_raw, str):
+                fallback.setdefault(ticker_id, []).append((gap_start, gap_end))
+                continue
+            mc_by_date = {date.fromisoformat(row["date"]): float(row["marketCap"]) for row in mc_raw}
+            items.extend(TickerValue(ticker_id=ticker_id, value_date=d, stock_price=price_by_date[d], market_cap=mc_by_date[d])
+                         for d in price_by_date.keys() & mc_by_date.keys())
+        if items:
+            upsert_bulk(items)
+        filled[ticker_id] = len(items)
+
+    return filled, fallback
+
+
 if __name__ == "__main__":
     resolver = TickerResolver(TickerResolver.POPULATE_TICKER)
     end_date = date.today()
@@ -91,9 +143,7 @@ if __name__ == "__main__":
     tickers = fetch_by_ids(ticker_ids)
     print(f"Checking {len(tickers)} tickers for gaps between {FILL_START_DATE} and {end_date} (min gap: {MIN_GAP_DAYS} days).\n")
 
-    total_filled = 0
-    tickers_filled = 0
-
+    pending: dict[int, tuple[str, list[tuple[date, date]]]] = {}
     for ticker in tickers:
         assert ticker.id is not None
 
@@ -104,17 +154,28 @@ if __name__ == "__main__":
             continue
 
         full_symbol = resolver.get_full_symbol(ticker)
-
         print(f"[{full_symbol}] {len(gaps)} gap(s) found:")
-        ticker_filled = 0
         for gap_start, gap_end in gaps:
             print(f"  {gap_start} → {gap_end} ({(gap_end - gap_start).days + 1} days)")
-            filled = fill_gap(ticker.id, full_symbol, gap_start, gap_end)
-            ticker_filled += filled
-            print(f"  Filled {filled} rows.")
+        pending[ticker.id] = (full_symbol, gaps)
+
+    filled_by_ticker: dict[int, int] = {}
+    per_symbol = {ticker_id: gaps for ticker_id, (_, gaps) in pending.items()}
+
+    # Bulk files pay off once they cost less quota than the per-symbol price calls (one per gap; market cap is fetched per gap either way).
+    bulk_calls = len(set().union(*(gap_days(gaps) for _, gaps in pending.values()))) if pending else 0
+    if 0 < bulk_calls * api_rate_limiter.weight('eod-bulk') < sum(len(gaps) for _, gaps in pending.values()):
+        print(f"\nFilling from {bulk_calls} bulk end-of-day files.")
+        filled_by_ticker, per_symbol = fill_from_bulk(pending)
 
-        if ticker_filled > 0:
-            total_filled += ticker_filled
-            tickers_filled += 1
+    for ticker_id, gaps in sorted(per_symbol.items()):
+        full_symbol = pending[ticker_id][0]
+        print(f"[{full_symbol}] filling per symbol:")
+        for gap_start, gap_end in gaps:
+            filled = fill_gap(ticker_id, full_symbol, gap_start, gap_end)
+            filled_by_ticker[ticker_id] = filled_by_ticker.get(ticker_id, 0) + filled
+            print(f"  Filled {filled} rows.")
 
+    total_filled = sum(filled_by_ticker.values())
+    tickers_filled = sum(1 for filled in filled_by_ticker.values() if filled > 0)
     print(f"\nDone. Filled {total_filled} rows across {tickers_filled} tickers.")
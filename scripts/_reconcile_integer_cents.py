@@ -0,0 +1,60 @@
+import atexit
+import sys
+from datetime import date
+from modules.bt.object.exit import cleanup
+from modules.core.db import db_pool_instance_bt
+from modules.bt import orchestrator
+from modules.bt.object import account, fund_holding
+from modules.bt.actions import account_update
+from modules.bt.calc.price_store import PriceStore
+from modules.bt.calc.account_state import AccountState
+from modules.bt.calc.simulator import Simulator
+
+# Runs the account simulation twice in memory, with Decimal and with integer-cent trading, over the fund targets
+# already in the back-test DB, and compares the resulting books row by row. Nothing is written.
+# Usage: python -m scripts._reconcile_integer_cents [start end]   (ISO dates; the orchestrator's range by default)
+
+atexit.register(cleanup)
+
+
+def simulate(accounts, start: date, end: date, prices: PriceStore, integer_cents: bool) -> dict[int, AccountState]:
+    account_update.INTEGER_CENTS = integer_cents
+    states = {a.id: AccountState.load(a.id) for a in accounts}
+    Simulator(accounts, start, end, prices, states, progress=False).run(persist=False)
+    return states
+
+
+def books(state: AccountState) -> dict[str, list]:
+    return {
+        'trades': [(t.trade_date, t.symbol, t.side, t.quantity, t.price, t.commission, t.total_amount) for t in state.pending_trades],
+        'ledger': [(e.transaction_date, e.entry_type, e.amount, e.description) for e in state.pending_ledger],
+        'holdings': [(h.holding_date, h.symbol, h.quantity, h.cost_basis, h.market_value, h.weight_percentage) for h in state.pending_holdings],
+        'performance': [(p.performance_date, p.cash_balance, p.total_value, p.daily_return) for p in state.pending_performance],
+    }
+
+
+if __name__ == '__main__':
+    start, end = (date.fromisoformat(sys.argv[1]), date.fromisoformat(sys.argv[2])) if len(sys.argv) > 2 else (orchestrator.START_DATE, orchestrator.END_DATE)
+    db_pool_instance_bt.configure('backtest')
+    db_pool_instance_bt.warm_up()
+
+    accounts = [a for a in account.fetch_all() if a.id is not None]
+    prices = PriceStore.load(fund_holding.fetch_symbols_between(start, end), start, end)
+    decimal_states = simulate(accounts, start, end, prices, integer_cents=False)
+    cents_states = simulate(accounts, start, end, prices, integer_cents=True)
+
+    mismatches = 0
+    for a in accounts:
+        expected, actual = books(decimal_states[a.id]), books(cents_states[a.id])
+        for table, rows in expected.items():
+            diffs = [(x, y) for x, y in zip(rows, actual[table]) if x != y]
+            if len(rows) != len(actual[table]) or diffs:
+                mismatches += 1
+                print(f"Account {a.id} {table}: {len(rows)} vs {len(actual[table])} rows, {len(diffs)} differ")
+                for x, y in diffs[:5]:
+                    print(f"    decimal {x}\n    cents   {y}")
+            else:
+                print(f"Account {a.id} {table}: {len(rows)} rows match")
+
+    print("Integer-cent books match the Decimal books to the cent." if not mismatches else f"{mismatches} tables differ.")
+    sys.exit(1 if mismatches else 0)
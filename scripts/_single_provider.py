@@ -24,15 +24,7 @@ if __name__ == '__main__':
                         map = provider.getMappingFromJson(mapping)
                         full_rows = load(etf_name=d.etf.name, file_format=file_format, mapping=map, file_name=d.file_name, raw_data=d.data)
                         df = map_data(full_rows=full_rows, file_name=d.file_name, date_from_page=d.date_from_page, mapping=map)
-                        df['ticker_id'] = df.apply(
-                            lambda row: resolver.resolve(
-                                region=d.etf.region,
-                                symbol=row.get('ticker'),
-                                isin=row.get('isin'),
-                                name=row.get('name'),
-                            ),
-                            axis=1
-                        )
+                        df['ticker_id'] = resolver.resolve_many(d.etf.region, df)
                         df = df[df['ticker_id'].notna()]
                         print(f"{d.etf.name}\t{d.file_name}")
                         print(df.head())
@@ -36,15 +36,7 @@ if __name__ == '__main__':
             map_obj = provider.getMappingFromJson(mapping)
             full_rows = load(etf_name=etf.name, file_format=file_format, mapping=map_obj, file_name=d.file_name, raw_data=d.data)
             df = map_data(full_rows=full_rows, file_name=d.file_name, date_from_page=d.date_from_page, mapping=map_obj)
-            df['ticker_id'] = df.apply(
-                lambda row: resolver.resolve(
-                    region=etf.region,
-                    symbol=row.get('ticker'),
-                    isin=row.get('isin'),
-                    name=row.get('name'),
-                ),
-                axis=1
-            )
+            df['ticker_id'] = resolver.resolve_many(etf.region, df)
             df = df[df['ticker_id'].notna()]
             print(f"{etf.name}\t{d.file_name}")
             print(df.head())
@@ -34,15 +34,7 @@ if __name__ == '__main__':
         df = map_data(full_rows=full_rows, file_name=filename, date_from_page=None, mapping=mapping)
 
         resolver = TickerResolver(TickerResolver.POPULATE_TICKER)
-        df['ticker_id'] = df.apply(
-            lambda row: resolver.resolve(
-                region=etf.region,
-                symbol=row.get('ticker'),
-                isin=row.get('isin'),
-                name=row.get('name'),
-            ),
-            axis=1
-        )
+        df['ticker_id'] = resolver.resolve_many(etf.region, df)
 
         print(df.head())
         print("... ------------ ...")
@@ -5,6 +5,7 @@ from datetime import datetime, timezone
 from modules.object.exit import cleanup
 from modules.core.db import db_pool_instance
 from modules.core import sender
+from modules.core.response_cache import response_cache
 from modules.calc.model_fund import results_to_string
 from modules.cron import categorize_downloader, etf_downloader, best_ideas_generator, funds_update, esg_update, benchmark_generator
 
@@ -16,6 +17,8 @@ atexit.register(cleanup)
 if __name__ == '__main__':
     try:
         print("Starting cron service")
+        db_pool_instance.configure('cron')
+        db_pool_instance.warm_up()
         print(f"DB connection pool started with {db_pool_instance.get_max_connections()} connections.")
         
         ENV_TYPE = os.environ.get("ENV_TYPE")
@@ -91,6 +94,9 @@ if __name__ == '__main__':
                 message_actions += f"{results_to_string(r)}\n"
                 message_actions += BREAKER_LINE
 
+        message_actions += f"{response_cache.summary()}\n"
+        message_actions += f"{db_pool_instance.metrics_summary()}\n"
+
         end = datetime.now(timezone.utc)
         message_full = f"Activated at {start_time.strftime("%H:%M:%S")}\nCompleted at {end.strftime("%H:%M:%S")}.\n\n"
         sender.send_admin(subject="Best Ideas Cron Completed", message=message_full + message_actions)
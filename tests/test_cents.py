@@ -0,0 +1,66 @@
+import random
+from datetime import date
+from decimal import Decimal
+import pytest
+from modules.bt.actions import account_update
+from modules.bt.calc.account_state import AccountState
+from modules.bt.calc.model_fund import FundHolding
+from modules.bt.object import account_holding as ah
+
+# cents.rebalance against the Decimal branch of execute_minimal_rebalance on generated books: the quotes and cash
+# the rebalance reads are patched in, so no database is needed. Both paths must return the same trades and ledger
+# entries. scripts/_reconcile_integer_cents.py does the same comparison over a whole run on the back-test DB.
+
+EVAL_DATE = date(2024, 3, 15)
+SYMBOLS = [f"S{i}" for i in range(12)]
+CASES = 200
+
+
+def _price(rnd: random.Random) -> Decimal:
+    return Decimal(str(round(rnd.uniform(1, 400), rnd.choice([2, 3, 4]))))
+
+
+def _case(rnd: random.Random, rebalance_mode: str) -> tuple[dict, list[ah.AsOfQuote], Decimal]:
+    """The execute_minimal_rebalance arguments of a random day, with the quotes and cash balance it reads."""
+    symbols = rnd.sample(SYMBOLS, rnd.randrange(1, len(SYMBOLS)))
+    held = [s for s in symbols if rnd.random() < 0.6]
+    quotes = [ah.AsOfQuote(
+        symbol=s,
+        sync_date=EVAL_DATE,
+        stock_price=_price(rnd) if rnd.random() > 0.05 else None,   # falls back to last_nonzero_price
+        last_nonzero_price=_price(rnd),
+        quantity=Decimal(rnd.randrange(0, 300)) if s in held else None,
+    ) for s in symbols]
+    cash = Decimal(str(round(rnd.uniform(-3000, 60000), 2)))
+
+    holdings = [ah.AccountHolding(1, EVAL_DATE, s, Decimal(1), Decimal(0)) for s in held]
+    targets = [s for s in symbols if rnd.random() < 0.7]
+    weights = {s: rnd.uniform(0.02, 0.3) for s in targets}
+    fund_holdings = [FundHolding(1, s, EVAL_DATE, k + 1, None, rnd.random(), weights[s]) for k, s in enumerate(targets)]
+    candidates = account_update.identify_position_change_needs(1, fund_holdings, holdings)
+
+    args = dict(account_id=1, candidates=candidates, eval_date=EVAL_DATE, account_holdings=holdings,
+                symbol_weights=weights, rebalance_mode=rebalance_mode, is_fund_update_day=rnd.random() < 0.5)
+    return args, quotes, cash
+
+
+def _rebalance(monkeypatch, integer_cents: bool, args: dict) -> tuple[list, list]:
+    monkeypatch.setattr(account_update, 'INTEGER_CENTS', integer_cents)
+    state = AccountState(1)
+    trades = account_update.execute_minimal_rebalance(**args, state=state)
+    return trades, state.pending_ledger
+
+
+@pytest.mark.parametrize('rebalance_mode', ['on_change', 'full', 'none'])
+def test_integer_cents_match_decimal(monkeypatch, rebalance_mode):
+    rnd = random.Random(rebalance_mode)
+    traded = 0
+    for _ in range(CASES):
+        args, quotes, cash = _case(rnd, rebalance_mode)
+        monkeypatch.setattr(account_update, '_as_of_quotes', lambda *a, **k: quotes)
+        monkeypatch.setattr(account_update, '_cash_balance', lambda *a, **k: cash)
+
+        expected = _rebalance(monkeypatch, False, args)
+        assert _rebalance(monkeypatch, True, args) == expected
+        traded += len(expected[0])
+    assert traded, "no case traded"